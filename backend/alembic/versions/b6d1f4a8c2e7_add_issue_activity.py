@@ -0,0 +1,46 @@
+"""Add comment_count and last_activity_at to issue
+
+Revision ID: b6d1f4a8c2e7
+Revises: a9c3e7f1b2d4
+Create Date: 2026-10-18 21:05:33.402716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d1f4a8c2e7'
+down_revision: Union[str, Sequence[str], None] = 'a9c3e7f1b2d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('issue', sa.Column('comment_count', sa.Integer(), server_default=sa.text('0'), nullable=False))
+    op.add_column('issue', sa.Column('last_activity_at', sa.DateTime(timezone=True), nullable=True))
+    # Backfill from the existing comments (CASE rather than greatest(), which
+    # SQLite lacks)
+    op.execute(
+        "UPDATE issue SET "
+        "comment_count = (SELECT count(*) FROM comment WHERE comment.issue_id = issue.id), "
+        "last_activity_at = CASE "
+        "WHEN (SELECT max(comment.created_at) FROM comment WHERE comment.issue_id = issue.id) "
+        "> coalesce(issue.updated_at, issue.created_at) "
+        "THEN (SELECT max(comment.created_at) FROM comment WHERE comment.issue_id = issue.id) "
+        "ELSE coalesce(issue.updated_at, issue.created_at) END"
+    )
+    with op.batch_alter_table('issue') as batch_op:
+        batch_op.alter_column('last_activity_at', existing_type=sa.DateTime(timezone=True), nullable=False)
+    op.create_index('ix_issue_project_id_last_activity_at', 'issue', ['project_id', 'last_activity_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_issue_project_id_last_activity_at', table_name='issue')
+    with op.batch_alter_table('issue') as batch_op:
+        batch_op.drop_column('last_activity_at')
+        batch_op.drop_column('comment_count')
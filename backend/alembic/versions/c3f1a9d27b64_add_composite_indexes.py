@@ -0,0 +1,41 @@
+"""Add composite indexes for hot queries
+
+Revision ID: c3f1a9d27b64
+Revises: a5adc00d5a7f
+Create Date: 2026-10-18 09:12:44.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f1a9d27b64'
+down_revision: Union[str, Sequence[str], None] = 'a5adc00d5a7f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep the oldest row of any duplicated membership before enforcing uniqueness
+    op.execute(
+        "DELETE FROM projectmember WHERE id NOT IN "
+        "(SELECT MIN(id) FROM projectmember GROUP BY project_id, user_id)"
+    )
+    op.create_unique_constraint('uq_projectmember_project_id_user_id', 'projectmember', ['project_id', 'user_id'])
+    op.create_index('ix_projectmember_user_id_project_id', 'projectmember', ['user_id', 'project_id'], unique=False)
+    op.create_index('ix_issue_project_id_status_priority', 'issue', ['project_id', 'status', 'priority'], unique=False)
+    op.create_index('ix_issue_assignee_id_status', 'issue', ['assignee_id', 'status'], unique=False)
+    op.create_index('ix_comment_issue_id_id', 'comment', ['issue_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_comment_issue_id_id', table_name='comment')
+    op.drop_index('ix_issue_assignee_id_status', table_name='issue')
+    op.drop_index('ix_issue_project_id_status_priority', table_name='issue')
+    op.drop_index('ix_projectmember_user_id_project_id', table_name='projectmember')
+    op.drop_constraint('uq_projectmember_project_id_user_id', 'projectmember', type_='unique')
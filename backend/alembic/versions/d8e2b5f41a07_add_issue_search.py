@@ -0,0 +1,89 @@
+"""Add full-text search index for issues
+
+Revision ID: d8e2b5f41a07
+Revises: c3f1a9d27b64
+Create Date: 2026-10-18 14:03:27.190452
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8e2b5f41a07'
+down_revision: Union[str, Sequence[str], None] = 'c3f1a9d27b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Copied from app.db.search as of this revision, so later edits there do not
+# change what this migration runs
+POSTGRES_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION issue_search_document(issue_id integer, title text, description text)
+    RETURNS tsvector AS $$
+        SELECT setweight(to_tsvector('english', coalesce(title, '')), 'A')
+            || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+            || setweight(to_tsvector('english', coalesce(
+                (SELECT string_agg(body, ' ') FROM comment WHERE comment.issue_id = $1), '')), 'C')
+    $$ LANGUAGE sql STABLE
+    """,
+    """
+    CREATE OR REPLACE FUNCTION issue_search_vector_trigger() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := issue_search_document(NEW.id, NEW.title, NEW.description);
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER issue_search_vector_update
+    BEFORE INSERT OR UPDATE OF title, description ON issue
+    FOR EACH ROW EXECUTE FUNCTION issue_search_vector_trigger()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION comment_search_vector_trigger() RETURNS trigger AS $$
+    BEGIN
+        UPDATE issue SET search_vector = issue_search_document(id, title, description)
+        WHERE id IN (
+            SELECT issue_id FROM (SELECT NEW.issue_id UNION SELECT OLD.issue_id) AS changed (issue_id)
+            WHERE issue_id IS NOT NULL
+        );
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER comment_search_vector_update
+    AFTER INSERT OR UPDATE OF body, issue_id OR DELETE ON comment
+    FOR EACH ROW EXECUTE FUNCTION comment_search_vector_trigger()
+    """,
+]
+
+POSTGRES_DROP_DDL = [
+    "DROP TRIGGER IF EXISTS comment_search_vector_update ON comment",
+    "DROP FUNCTION IF EXISTS comment_search_vector_trigger()",
+    "DROP TRIGGER IF EXISTS issue_search_vector_update ON issue",
+    "DROP FUNCTION IF EXISTS issue_search_vector_trigger()",
+    "DROP FUNCTION IF EXISTS issue_search_document(integer, text, text)",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('issue', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    for statement in POSTGRES_DDL:
+        op.execute(statement)
+    # Backfill before indexing; the triggers keep it current from here on
+    op.execute("UPDATE issue SET search_vector = issue_search_document(id, title, description)")
+    op.create_index('ix_issue_search_vector', 'issue', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_issue_search_vector', table_name='issue', postgresql_using='gin')
+    for statement in POSTGRES_DROP_DDL:
+        op.execute(statement)
+    op.drop_column('issue', 'search_vector')
@@ -0,0 +1,44 @@
+"""Add issuestat counters table
+
+Revision ID: e4b7c9a1f352
+Revises: d8e2b5f41a07
+Create Date: 2026-10-18 15:21:09.734118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b7c9a1f352'
+down_revision: Union[str, Sequence[str], None] = 'd8e2b5f41a07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('issuestat',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('priority', sa.String(), nullable=False),
+    sa.Column('assignee_id', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['project_id'], ['project.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('project_id', 'status', 'priority', 'assignee_id', name='uq_issuestat_key')
+    )
+    # Backfill from the existing issues
+    op.execute(
+        "INSERT INTO issuestat (project_id, status, priority, assignee_id, count) "
+        "SELECT project_id, coalesce(status, 'open'), coalesce(priority, 'medium'), coalesce(assignee_id, 0), count(*) "
+        "FROM issue GROUP BY 1, 2, 3, 4"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('issuestat')
@@ -0,0 +1,50 @@
+"""Add changelog table for /sync
+
+Revision ID: f2a6d8c3e915
+Revises: e4b7c9a1f352
+Create Date: 2026-10-18 18:02:41.305527
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a6d8c3e915'
+down_revision: Union[str, Sequence[str], None] = 'e4b7c9a1f352'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('changelog',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('entity', sa.String(), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('changed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_changelog_project_id_id', 'changelog', ['project_id', 'id'], unique=False)
+    op.create_index('ix_changelog_entity_entity_id_id', 'changelog', ['entity', 'entity_id', 'id'], unique=False)
+    op.create_index(op.f('ix_changelog_changed_at'), 'changelog', ['changed_at'], unique=False)
+    # One entry per existing row, so a sync from 0 sees everything
+    op.execute(
+        "INSERT INTO changelog (project_id, entity, entity_id, changed_at) "
+        "SELECT id, 'project', id, CURRENT_TIMESTAMP FROM project "
+        "UNION ALL SELECT project_id, 'member', id, CURRENT_TIMESTAMP FROM projectmember "
+        "UNION ALL SELECT project_id, 'issue', id, CURRENT_TIMESTAMP FROM issue "
+        "UNION ALL SELECT issue.project_id, 'comment', comment.id, CURRENT_TIMESTAMP "
+        "FROM comment JOIN issue ON issue.id = comment.issue_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_changelog_changed_at'), table_name='changelog')
+    op.drop_index('ix_changelog_entity_entity_id_id', table_name='changelog')
+    op.drop_index('ix_changelog_project_id_id', table_name='changelog')
+    op.drop_table('changelog')
@@ -1,9 +1,27 @@
 from fastapi import APIRouter
-from app.api.api_v1.endpoints import auth, users, projects, issues, comments
+from app.api.api_v1.endpoints import auth, users, projects, issues, comments, sync
+from app.api.async_routes import asyncify_router
+from app.core.config import settings
 
-api_router = APIRouter()
-api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
-api_router.include_router(users.router, prefix="/users", tags=["users"])
-api_router.include_router(projects.router, prefix="/projects", tags=["projects"])
-api_router.include_router(issues.router, prefix="/issues", tags=["issues"])
-api_router.include_router(comments.router, prefix="/comments", tags=["comments"])
+def build_api_router(async_db: bool = settings.ASYNC_DB) -> APIRouter:
+    """
+    Assemble the v1 API, on the async engine when `async_db` is set.
+    """
+    router = APIRouter()
+    if async_db:
+        router.include_router(auth.async_router, prefix="/auth", tags=["auth"])
+        router.include_router(asyncify_router(users.router), prefix="/users", tags=["users"])
+        router.include_router(asyncify_router(projects.router), prefix="/projects", tags=["projects"])
+        router.include_router(asyncify_router(issues.router), prefix="/issues", tags=["issues"])
+        router.include_router(asyncify_router(comments.router), prefix="/comments", tags=["comments"])
+        router.include_router(asyncify_router(sync.router), prefix="/sync", tags=["sync"])
+    else:
+        router.include_router(auth.router, prefix="/auth", tags=["auth"])
+        router.include_router(users.router, prefix="/users", tags=["users"])
+        router.include_router(projects.router, prefix="/projects", tags=["projects"])
+        router.include_router(issues.router, prefix="/issues", tags=["issues"])
+        router.include_router(comments.router, prefix="/comments", tags=["comments"])
+        router.include_router(sync.router, prefix="/sync", tags=["sync"])
+    return router
+
+api_router = build_api_router()
@@ -1,7 +1,10 @@
 from datetime import timedelta
-from typing import Any
+from typing import Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.api import deps
 from app.core import security
@@ -11,32 +14,92 @@ from app.schemas import user as user_schema
 
 router = APIRouter()
 
-@router.post("/login", response_model=user_schema.Token)
-def login_access_token(
-    db: Session = Depends(deps.get_db),
-    form_data: OAuth2PasswordRequestForm = Depends()
-) -> Any:
+def token_claims(user: User) -> Optional[dict]:
     """
-    OAuth2 compatible token login, get an access token for future requests
+    Principal fields embedded in the access token, see TOKEN_EMBED_PRINCIPAL.
     """
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not security.verify_password(form_data.password, user.password_hash):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Incorrect email or password",
-        )
-    
+    if not settings.TOKEN_EMBED_PRINCIPAL:
+        return None
+    return {"role": user.role}
+
+def get_user_by_email(db: Session, email: str) -> Optional[User]:
+    """
+    Load a user, then end the transaction so the pooled connection is not
+    held while the password waits for the hashing executor.
+    """
+    user = db.query(User).filter(User.email == email).first()
+    if user is not None:
+        db.expunge(user)
+    db.rollback()
+    return user
+
+def save_password_hash(db: Session, user_id: int, password_hash: str) -> None:
+    db.query(User).filter(User.id == user_id).update({"password_hash": password_hash})
+    db.commit()
+
+async def authenticate(password: str, user: Optional[User]) -> Optional[str]:
+    """
+    Check a login password on the hashing executor.
+
+    Returns a replacement hash when the stored one used another bcrypt cost.
+    """
+    incorrect = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Incorrect email or password",
+    )
+    if not user:
+        raise incorrect
+    try:
+        verified, new_hash = await security.verify_password_async(password, user.password_hash)
+    except security.PasswordHashingBusy:
+        raise password_hashing_busy()
+    if not verified:
+        raise incorrect
+    return new_hash
+
+async def hash_password(password: str) -> str:
+    try:
+        return await security.get_password_hash_async(password)
+    except security.PasswordHashingBusy:
+        raise password_hashing_busy()
+
+def password_hashing_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many concurrent logins, please retry",
+        headers={"Retry-After": "1"},
+    )
+
+def issue_token(user: User) -> dict:
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = security.create_access_token(
-        subject=user.id, expires_delta=access_token_expires
+        subject=user.id, expires_delta=access_token_expires, claims=token_claims(user)
     )
     return {
         "access_token": access_token,
         "token_type": "bearer",
     }
 
+# Both routers are async so that bcrypt waits on the hashing executor rather
+# than holding a request thread; the sync router moves its queries to the
+# threadpool explicitly.
+
+@router.post("/login", response_model=user_schema.Token)
+async def login_access_token(
+    db: Session = Depends(deps.get_db),
+    form_data: OAuth2PasswordRequestForm = Depends()
+) -> Any:
+    """
+    OAuth2 compatible token login, get an access token for future requests
+    """
+    user = await run_in_threadpool(get_user_by_email, db, form_data.username)
+    new_hash = await authenticate(form_data.password, user)
+    if new_hash:
+        await run_in_threadpool(save_password_hash, db, user.id, new_hash)
+    return issue_token(user)
+
 @router.post("/signup", response_model=user_schema.User)
-def create_user(
+async def create_user(
     *,
     db: Session = Depends(deps.get_db),
     user_in: user_schema.UserCreate,
@@ -44,7 +107,7 @@ def create_user(
     """
     Create new user.
     """
-    user = db.query(User).filter(User.email == user_in.email).first()
+    user = await run_in_threadpool(get_user_by_email, db, user_in.email)
     if user:
         raise HTTPException(
             status_code=400,
@@ -54,10 +117,64 @@ def create_user(
     user = User(
         email=user_in.email,
         name=user_in.name,
-        password_hash=security.get_password_hash(user_in.password),
+        password_hash=await hash_password(user_in.password),
+        role=user_in.role,
+    )
+
+    def save() -> User:
+        db.add(user)
+        db.commit()
+        return user
+
+    return await run_in_threadpool(save)
+
+# Async mode
+async_router = APIRouter()
+
+@async_router.post("/login", response_model=user_schema.Token)
+async def login_access_token_async(
+    db: AsyncSession = Depends(deps.get_async_db),
+    form_data: OAuth2PasswordRequestForm = Depends()
+) -> Any:
+    """
+    OAuth2 compatible token login, get an access token for future requests
+    """
+    result = await db.execute(select(User).where(User.email == form_data.username))
+    user = result.scalars().first()
+    # Release the connection before waiting on the hashing executor
+    if user is not None:
+        db.expunge(user)
+    await db.rollback()
+    new_hash = await authenticate(form_data.password, user)
+    if new_hash:
+        await db.execute(update(User).where(User.id == user.id).values(password_hash=new_hash))
+        await db.commit()
+    return issue_token(user)
+
+@async_router.post("/signup", response_model=user_schema.User)
+async def create_user_async(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    user_in: user_schema.UserCreate,
+) -> Any:
+    """
+    Create new user.
+    """
+    result = await db.execute(select(User).where(User.email == user_in.email))
+    existing = result.scalars().first()
+    await db.rollback()
+    if existing:
+        raise HTTPException(
+            status_code=400,
+            detail="The user with this username already exists in the system.",
+        )
+
+    user = User(
+        email=user_in.email,
+        name=user_in.name,
+        password_hash=await hash_password(user_in.password),
         role=user_in.role,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
     return user
@@ -1,11 +1,13 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from app.api import deps
+from app.api.etag import etag_matches, make_etag, not_modified, set_etag
+from app.api.pagination import paginate, NEXT_CURSOR_HEADER
+from app.api.serialization import FastJSONResponse, dump_many
 from app.models.comment import Comment
 from app.models.issue import Issue
-from app.models.project import ProjectMember
-from app.models.user import User
 from app.schemas import comment as comment_schema
 
 router = APIRouter()
@@ -13,29 +15,43 @@ router = APIRouter()
 @router.get("/issue/{issue_id}", response_model=List[comment_schema.Comment])
 def read_comments(
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     issue_id: int,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: deps.Principal = Depends(deps.get_current_principal),
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
 ) -> Any:
     """
-    Retrieve comments for a specific issue.
+    Retrieve comments for a specific issue, oldest first.
+    The cursor for the next page is returned in the X-Next-Cursor header.
     """
-    issue = db.query(Issue).filter(Issue.id == issue_id).first()
-    if not issue:
+    project_id = db.query(Issue.project_id).filter(Issue.id == issue_id).scalar()
+    if project_id is None:
         raise HTTPException(status_code=404, detail="Issue not found")
         
     # Check access to project
-    member = db.query(ProjectMember).filter(
-        ProjectMember.project_id == issue.project_id,
-        ProjectMember.user_id == current_user.id
-    ).first()
-    if not member:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-        
-    comments = db.query(Comment).filter(Comment.issue_id == issue_id).offset(skip).limit(limit).all()
-    return comments
+    deps.require_project_member(db, project_id, current_user)
+
+    # Comments are append-only, so their count and newest id version the list;
+    # both come from the (issue_id, id) index without touching the rows
+    count, newest = db.query(func.count(Comment.id), func.max(Comment.id)).filter(
+        Comment.issue_id == issue_id
+    ).one()
+    etag = make_etag("comments", issue_id, count, newest)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    comments, next_cursor = paginate(
+        db.query(Comment).filter(Comment.issue_id == issue_id),
+        [Comment.id], skip=skip, limit=limit, cursor=cursor,
+    )
+    response = FastJSONResponse(dump_many(comment_schema.Comment, comments))
+    set_etag(response, etag)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response
 
 @router.post("/issue/{issue_id}", response_model=comment_schema.Comment)
 def create_comment(
@@ -43,22 +59,17 @@ def create_comment(
     db: Session = Depends(deps.get_db),
     issue_id: int,
     comment_in: comment_schema.CommentCreate,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: deps.Principal = Depends(deps.get_current_principal),
 ) -> Any:
     """
     Create new comment.
     """
-    issue = db.query(Issue).filter(Issue.id == issue_id).first()
-    if not issue:
+    project_id = db.query(Issue.project_id).filter(Issue.id == issue_id).scalar()
+    if project_id is None:
         raise HTTPException(status_code=404, detail="Issue not found")
         
     # Check access to project
-    member = db.query(ProjectMember).filter(
-        ProjectMember.project_id == issue.project_id,
-        ProjectMember.user_id == current_user.id
-    ).first()
-    if not member:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    deps.require_project_member(db, project_id, current_user)
 
     comment = Comment(
         **comment_in.model_dump(),
@@ -67,5 +78,4 @@ def create_comment(
     )
     db.add(comment)
     db.commit()
-    db.refresh(comment)
     return comment
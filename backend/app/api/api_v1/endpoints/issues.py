@@ -1,43 +1,77 @@
-from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Any, List, Optional, Set
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.api import deps
+from app.api.counting import CountMode, count_issues
+from app.api.events import event_stream, issue_topic, last_event_id
+from app.api.etag import etag_matches, make_etag, not_modified, set_etag
+from app.api.pagination import paginate
+from app.api.serialization import FastJSONResponse, dump_many, extractor
+from app.db.search import search_issues
+from app.models.comment import Comment
 from app.models.issue import Issue, IssueStatus, IssuePriority
 from app.models.project import Project, ProjectMember
 from app.models.user import User
+from app.schemas import comment as comment_schema
 from app.schemas import issue as issue_schema
+from app.schemas import user as user_schema
 
 router = APIRouter()
 
+# Sort option -> (seek keys, descending). Keys end in Issue.id so they are unique.
+ISSUE_SORT_KEYS = {
+    issue_schema.IssueSort.ID: ([Issue.id], False),
+    issue_schema.IssueSort.NEWEST: ([Issue.id], True),
+    issue_schema.IssueSort.TITLE: ([Issue.title, Issue.id], False),
+    issue_schema.IssueSort.ACTIVE: ([Issue.last_activity_at, Issue.id], True),
+}
+
 @router.get("/", response_model=issue_schema.IssueListResponse)
 def read_issues(
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
+    db: Session = Depends(deps.get_read_db),
+    current_user: deps.Principal = Depends(deps.get_current_principal),
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
     project_id: Optional[int] = None,
     status: Optional[IssueStatus] = None,
     priority: Optional[IssuePriority] = None,
     assignee_id: Optional[int] = None,
+    q: Optional[str] = Query(None, min_length=1, max_length=200),
+    sort: Optional[issue_schema.IssueSort] = None,
+    cursor: Optional[str] = None,
+    count: CountMode = CountMode.EXACT,
 ) -> Any:
     """
     Retrieve issues with pagination.
+
+    `q` searches titles, descriptions and comments; results are ordered by
+    relevance unless another `sort` is given. Pass `cursor` (the `next_cursor`
+    of the previous page) instead of `skip` for keyset pagination, which
+    relevance ordering does not support. `count` picks how `total` is
+    computed: `exact` (memoized until issues in the visible projects change),
+    `estimate`, or `none` to skip it and rely on `has_more`.
     """
+    if sort is None:
+        sort = issue_schema.IssueSort.RELEVANCE if q else issue_schema.IssueSort.ID
+    if sort == issue_schema.IssueSort.RELEVANCE:
+        if not q:
+            raise HTTPException(status_code=400, detail="sort=relevance requires q")
+        if cursor is not None:
+            raise HTTPException(status_code=400, detail="cursor is not supported with sort=relevance")
+
     query = db.query(Issue)
     
     if project_id:
         # Check access to project
-        member = db.query(ProjectMember).filter(
-            ProjectMember.project_id == project_id,
-            ProjectMember.user_id == current_user.id
-        ).first()
-        if not member:
-            raise HTTPException(status_code=403, detail="Not enough permissions")
-        query = query.filter(Issue.project_id == project_id)
+        deps.require_project_member(db, project_id, current_user)
+        project_ids = [project_id]
     else:
         # Filter issues from projects user is a member of
-        user_project_ids = db.query(ProjectMember.project_id).filter(ProjectMember.user_id == current_user.id).subquery()
-        query = query.filter(Issue.project_id.in_(user_project_ids))
+        project_ids = [
+            p for (p,) in db.query(ProjectMember.project_id).filter(ProjectMember.user_id == current_user.id)
+        ]
+    query = query.filter(Issue.project_id.in_(project_ids))
 
     if status:
         query = query.filter(Issue.status == status)
@@ -45,34 +79,44 @@ def read_issues(
         query = query.filter(Issue.priority == priority)
     if assignee_id:
         query = query.filter(Issue.assignee_id == assignee_id)
+    if q:
+        query, rank = search_issues(query, q)
 
-    total = query.count()
-    issues = query.offset(skip).limit(limit).all()
+    total = count_issues(
+        db, query, project_ids, (status, priority, assignee_id), count, memoize=not q
+    )
+    if sort == issue_schema.IssueSort.RELEVANCE:
+        issues = query.order_by(rank.desc(), Issue.id).offset(skip).limit(limit + 1).all()
+        has_more, next_cursor = len(issues) > limit, None
+        issues = issues[:limit]
+    else:
+        keys, descending = ISSUE_SORT_KEYS[sort]
+        issues, next_cursor = paginate(
+            query, keys, skip=skip, limit=limit, cursor=cursor, descending=descending
+        )
+        has_more = next_cursor is not None
     
-    return {
-        "items": issues,
+    return FastJSONResponse({
+        "items": dump_many(issue_schema.Issue, issues),
         "total": total,
         "skip": skip,
-        "limit": limit
-    }
+        "limit": limit,
+        "has_more": has_more,
+        "next_cursor": next_cursor,
+    })
 
 @router.post("/", response_model=issue_schema.Issue)
 def create_issue(
     *,
     db: Session = Depends(deps.get_db),
     issue_in: issue_schema.IssueCreate,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: deps.Principal = Depends(deps.get_current_principal),
 ) -> Any:
     """
     Create new issue.
     """
     # Check project access
-    member = db.query(ProjectMember).filter(
-        ProjectMember.project_id == issue_in.project_id,
-        ProjectMember.user_id == current_user.id
-    ).first()
-    if not member:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    deps.require_project_member(db, issue_in.project_id, current_user)
 
     issue = Issue(
         **issue_in.model_dump(),
@@ -80,40 +124,214 @@ def create_issue(
     )
     db.add(issue)
     db.commit()
-    db.refresh(issue)
     return issue
 
+@router.post("/batch", response_model=issue_schema.IssueBatchResponse)
+def create_issues_batch(
+    *,
+    db: Session = Depends(deps.get_db),
+    batch_in: issue_schema.IssueBatchCreate,
+    current_user: deps.Principal = Depends(deps.get_current_principal),
+) -> Any:
+    """
+    Create many issues in one transaction.
+
+    Membership is checked once per distinct project and all rows are written
+    in one flush, which SQLAlchemy batches into multi-row INSERT ... RETURNING
+    on Postgres. Items that fail a check are reported in their result; the
+    others are still created.
+    """
+    items = batch_in.items
+    members = deps.get_memberships(db, {item.project_id for item in items}, current_user.id)
+    assignees = existing_user_ids(db, {item.assignee_id for item in items})
+
+    results = []
+    created = []
+    for index, item in enumerate(items):
+        if not members[item.project_id]:
+            results.append(batch_error(index, 403, "Not enough permissions"))
+        elif item.assignee_id is not None and item.assignee_id not in assignees:
+            results.append(batch_error(index, 404, "Assignee not found"))
+        else:
+            created.append((index, Issue(**item.model_dump(), reporter_id=current_user.id)))
+
+    db.add_all([issue for _, issue in created])
+    db.commit()
+    for index, issue in created:
+        results.append(batch_ok(index, issue))
+    return {"results": sorted(results, key=lambda r: r.index)}
+
+@router.patch("/batch", response_model=issue_schema.IssueBatchResponse)
+def update_issues_batch(
+    *,
+    db: Session = Depends(deps.get_db),
+    batch_in: issue_schema.IssueBatchUpdate,
+    current_user: deps.Principal = Depends(deps.get_current_principal),
+) -> Any:
+    """
+    Update many issues in one transaction.
+
+    Issues are loaded with one query and membership is checked once per
+    distinct project; rows changing the same columns are written together by
+    one executemany UPDATE in a single flush. Items that fail a check are
+    reported in their result.
+    """
+    items = batch_in.items
+    issues = {
+        issue.id: issue
+        for issue in db.query(Issue).filter(Issue.id.in_({item.id for item in items}))
+    }
+    members = deps.get_memberships(db, {issue.project_id for issue in issues.values()}, current_user.id)
+    assignees = existing_user_ids(db, {item.assignee_id for item in items})
+
+    results = []
+    updated = []
+    for index, item in enumerate(items):
+        issue = issues.get(item.id)
+        if issue is None:
+            results.append(batch_error(index, 404, "Issue not found"))
+        elif not members[issue.project_id]:
+            results.append(batch_error(index, 403, "Not enough permissions"))
+        elif not deps.check_issue_permission(db, issue, current_user, "update"):
+            results.append(batch_error(
+                index, 403, "You can only update issues you reported unless you are a project maintainer"
+            ))
+        elif item.assignee_id is not None and item.assignee_id not in assignees:
+            results.append(batch_error(index, 404, "Assignee not found"))
+        else:
+            for field, value in item.model_dump(exclude_unset=True, exclude={"id"}).items():
+                setattr(issue, field, value)
+            updated.append((index, issue))
+
+    db.commit()
+    for index, issue in updated:
+        results.append(batch_ok(index, issue))
+    return {"results": sorted(results, key=lambda r: r.index)}
+
+def issue_etag(issue_id: int, created_at, updated_at, comment_count, last_activity_at) -> str:
+    # updated_at is set from Python, with microseconds, by every ORM update;
+    # new comments move comment_count and last_activity_at
+    return make_etag("issue", issue_id, created_at, updated_at, comment_count, last_activity_at)
+
+def existing_user_ids(db: Session, user_ids: Set[Optional[int]]) -> Set[int]:
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return set()
+    return {user_id for (user_id,) in db.query(User.id).filter(User.id.in_(user_ids))}
+
+def batch_ok(index: int, issue: Issue) -> issue_schema.IssueBatchResult:
+    return issue_schema.IssueBatchResult(
+        index=index, status_code=200, issue=issue_schema.Issue.model_validate(issue)
+    )
+
+def batch_error(index: int, status_code: int, error: str) -> issue_schema.IssueBatchResult:
+    return issue_schema.IssueBatchResult(index=index, status_code=status_code, error=error)
+
 @router.get("/{id}", response_model=issue_schema.Issue)
 def read_issue(
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     id: int,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: deps.Principal = Depends(deps.get_current_principal),
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
 ) -> Any:
     """
     Get issue by ID.
+    Conditional requests are answered from the issue's timestamps alone.
     """
+    if if_none_match:
+        version = (
+            db.query(
+                Issue.project_id, Issue.created_at, Issue.updated_at, Issue.comment_count, Issue.last_activity_at
+            ).filter(Issue.id == id).first()
+        )
+        if not version:
+            raise HTTPException(status_code=404, detail="Issue not found")
+        deps.require_project_member(db, version.project_id, current_user)
+        etag = issue_etag(
+            id, version.created_at, version.updated_at, version.comment_count, version.last_activity_at
+        )
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
     issue = db.query(Issue).filter(Issue.id == id).first()
     if not issue:
         raise HTTPException(status_code=404, detail="Issue not found")
         
     # Check access to project
-    member = db.query(ProjectMember).filter(
-        ProjectMember.project_id == issue.project_id,
-        ProjectMember.user_id == current_user.id
-    ).first()
-    if not member:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-        
+    deps.require_project_member(db, issue.project_id, current_user)
+
+    set_etag(response, issue_etag(
+        issue.id, issue.created_at, issue.updated_at, issue.comment_count, issue.last_activity_at
+    ))
     return issue
 
+@router.get("/{id}/detail", response_model=issue_schema.IssueDetail)
+def read_issue_detail(
+    *,
+    db: Session = Depends(deps.get_read_db),
+    id: int,
+    current_user: deps.Principal = Depends(deps.get_current_principal),
+    include: List[issue_schema.IssueDetailInclude] = Query([]),
+    comment_limit: int = Query(50, ge=1, le=100),
+    member_limit: int = Query(100, ge=1, le=500),
+) -> Any:
+    """
+    Get an issue with what its page shows: reporter and assignee, the
+    caller's role in the project and, when asked for with `include`, the
+    first page of comments with their authors and the members it can be
+    assigned to. Every user is read in one batch, so the response takes at
+    most five queries (issue, membership, comments, members, users).
+    """
+    issue = db.query(Issue).filter(Issue.id == id).first()
+    if not issue:
+        raise HTTPException(status_code=404, detail="Issue not found")
+    member = deps.require_project_member(db, issue.project_id, current_user)
+
+    comments = members = None
+    content = dict.fromkeys(issue_schema.IssueDetail.model_fields)
+    content.update(issue=dump_many(issue_schema.Issue, [issue])[0], role=member.role)
+    user_ids = {issue.reporter_id, issue.assignee_id}
+    if issue_schema.IssueDetailInclude.COMMENTS in include:
+        comments, content["comments_next_cursor"] = paginate(
+            db.query(Comment).filter(Comment.issue_id == id), [Comment.id], limit=comment_limit,
+        )
+        user_ids.update(comment.author_id for comment in comments)
+    if issue_schema.IssueDetailInclude.MEMBERS in include:
+        members, content["members_next_cursor"] = paginate(
+            db.query(ProjectMember.id, ProjectMember.user_id, ProjectMember.role)
+            .filter(ProjectMember.project_id == issue.project_id),
+            [ProjectMember.id], limit=member_limit,
+        )
+        user_ids.update(row.user_id for row in members)
+
+    summarize = extractor(user_schema.UserSummary)
+    users = {
+        user.id: summarize(user)
+        for user in db.query(User.id, User.email, User.name).filter(User.id.in_(user_ids - {None}))
+    }
+    content["reporter"] = users.get(issue.reporter_id)
+    content["assignee"] = users.get(issue.assignee_id)
+    if comments is not None:
+        content["comments"] = [
+            {**comment, "author": users.get(comment["author_id"])}
+            for comment in dump_many(comment_schema.Comment, comments)
+        ]
+    if members is not None:
+        content["members"] = [
+            {"user_id": row.user_id, "role": row.role, "user": users[row.user_id]}
+            for row in members if row.user_id in users
+        ]
+    return FastJSONResponse(content)
+
 @router.patch("/{id}", response_model=issue_schema.Issue)
 def update_issue(
     *,
     db: Session = Depends(deps.get_db),
     id: int,
     issue_in: issue_schema.IssueUpdate,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: deps.Principal = Depends(deps.get_current_principal),
 ) -> Any:
     """
     Update an issue.
@@ -123,12 +341,7 @@ def update_issue(
         raise HTTPException(status_code=404, detail="Issue not found")
         
     # Check access to project
-    member = db.query(ProjectMember).filter(
-        ProjectMember.project_id == issue.project_id,
-        ProjectMember.user_id == current_user.id
-    ).first()
-    if not member:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    deps.require_project_member(db, issue.project_id, current_user)
 
     # Check if user has permission to update this issue
     if not deps.check_issue_permission(db, issue, current_user, "update"):
@@ -143,5 +356,26 @@ def update_issue(
         
     db.add(issue)
     db.commit()
-    db.refresh(issue)
     return issue
+
+@router.get("/{id}/events", response_class=StreamingResponse)
+def stream_issue_events(
+    *,
+    db: Session = Depends(deps.get_read_db),
+    id: int,
+    current_user: deps.Principal = Depends(deps.get_current_principal),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+) -> Any:
+    """
+    Server-sent events for one issue: its updates and new comments.
+    Reconnecting with Last-Event-ID replays what was missed, or sends a
+    `reset` event when that is no longer known.
+    """
+    since = last_event_id(last_event_id_header)
+    project_id = db.query(Issue.project_id).filter(Issue.id == id).scalar()
+    if project_id is None:
+        raise HTTPException(status_code=404, detail="Issue not found")
+    deps.require_project_member(db, project_id, current_user)
+    # The stream may stay open for hours; give the connection back now
+    db.close()
+    return event_stream([issue_topic(id)], since)
@@ -1,7 +1,17 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from app.api import deps
+from app.api.events import event_stream, last_event_id, project_topic
+from app.api.etag import etag_matches, make_etag, not_modified, set_etag
+from app.api.export import MEDIA_TYPES, ExportFormat, ExportResource, export_project
+from app.api.loading import schema_loader_options
+from app.api.pagination import paginate, NEXT_CURSOR_HEADER
+from app.api.serialization import FastJSONResponse, dump_many
+from app.db.issue_stats import UNASSIGNED
+from app.models.issue_stat import IssueStat
 from app.models.project import Project, ProjectMember, Role
 from app.models.user import User
 from app.schemas import project as project_schema
@@ -10,67 +20,100 @@ router = APIRouter()
 
 @router.get("/", response_model=List[project_schema.Project])
 def read_projects(
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
+    db: Session = Depends(deps.get_read_db),
+    current_user: deps.Principal = Depends(deps.get_current_principal),
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
 ) -> Any:
     """
     Retrieve projects current user belongs to.
     """
-    # For simplicity, returning all projects for now explicitly joined or owned
-    # In a real app, you might want to filter by membership:
-    # return db.query(Project).join(ProjectMember).filter(ProjectMember.user_id == current_user.id).all()
-    
-    # Returning all projects for MVP visibility or specific logic
-    memberships = db.query(ProjectMember).filter(ProjectMember.user_id == current_user.id).all()
-    project_ids = [m.project_id for m in memberships]
-    projects = db.query(Project).filter(Project.id.in_(project_ids)).offset(skip).limit(limit).all()
-    return projects
+    projects = (
+        db.query(Project)
+        .join(ProjectMember, ProjectMember.project_id == Project.id)
+        .filter(ProjectMember.user_id == current_user.id)
+        .order_by(Project.id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    return FastJSONResponse(dump_many(project_schema.Project, projects))
 
 @router.post("/", response_model=project_schema.Project)
 def create_project(
     *,
     db: Session = Depends(deps.get_db),
     project_in: project_schema.ProjectCreate,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: deps.Principal = Depends(deps.get_current_principal),
 ) -> Any:
     """
     Create new project.
     """
-    project = db.query(Project).filter(Project.key == project_in.key).first()
-    if project:
-        raise HTTPException(
-            status_code=400,
-            detail="The project with this key already exists.",
-        )
-        
     project = Project(
         name=project_in.name,
         key=project_in.key,
         description=project_in.description,
     )
-    db.add(project)
-    db.commit()
-    db.refresh(project)
-    
-    # Add creator as maintainer
-    member = ProjectMember(
-        project_id=project.id,
+    # Add creator as maintainer; both rows are written in one transaction
+    project.members.append(ProjectMember(
         user_id=current_user.id,
         role=Role.MAINTAINER.value
-    )
-    db.add(member)
-    db.commit()
+    ))
+    db.add(project)
+    try:
+        db.commit()
+    except IntegrityError:
+        # The unique key index rejects duplicates, including concurrent creates
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="The project with this key already exists.",
+        )
+    deps.invalidate_membership(db, project.id, current_user.id)
     
     return project
 
+def read_issue_stats(db: Session, project_ids: List[int]) -> List[project_schema.ProjectIssueStats]:
+    """
+    Issue counts of `project_ids` from the issuestat counters, in input order.
+    """
+    stats = {
+        project_id: project_schema.ProjectIssueStats(project_id=project_id)
+        for project_id in project_ids
+    }
+    rows = db.query(IssueStat).filter(IssueStat.project_id.in_(project_ids), IssueStat.count > 0)
+    for row in rows:
+        project = stats[row.project_id]
+        project.total += row.count
+        project.by_status[row.status] = project.by_status.get(row.status, 0) + row.count
+        project.by_priority[row.priority] = project.by_priority.get(row.priority, 0) + row.count
+        if row.assignee_id == UNASSIGNED:
+            project.unassigned += row.count
+        else:
+            project.by_assignee[row.assignee_id] = project.by_assignee.get(row.assignee_id, 0) + row.count
+    return list(stats.values())
+
+@router.get("/stats", response_model=List[project_schema.ProjectIssueStats])
+def read_projects_stats(
+    db: Session = Depends(deps.get_read_db),
+    current_user: deps.Principal = Depends(deps.get_current_principal),
+) -> Any:
+    """
+    Issue counts for every project the current user belongs to.
+    """
+    project_ids = [
+        p for (p,) in db.query(ProjectMember.project_id).filter(ProjectMember.user_id == current_user.id)
+    ]
+    return read_issue_stats(db, project_ids)
+
 @router.get("/{id}", response_model=project_schema.Project)
 def read_project(
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     id: int,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: deps.Principal = Depends(deps.get_current_principal),
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
 ) -> Any:
     """
     Get project by ID.
@@ -80,14 +123,13 @@ def read_project(
         raise HTTPException(status_code=404, detail="Project not found")
         
     # Check access
-    member = db.query(ProjectMember).filter(
-        ProjectMember.project_id == id,
-        ProjectMember.user_id == current_user.id
-    ).first()
-    
-    if not member:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-        
+    deps.require_project_member(db, id, current_user)
+
+    # Projects have no update timestamp; the row is small, so version it by content
+    etag = make_etag("project", project.id, project.name, project.key, project.description, project.created_at)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return project
 
 @router.post("/{id}/members", response_model=project_schema.ProjectMember)
@@ -96,35 +138,19 @@ def add_project_member(
     db: Session = Depends(deps.get_db),
     id: int,
     member_in: project_schema.ProjectMemberCreate,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: deps.Principal = Depends(deps.get_current_principal),
 ) -> Any:
     """
     Add a member to the project.
     """
     # Check if current user is maintainer
-    current_member = db.query(ProjectMember).filter(
-        ProjectMember.project_id == id,
-        ProjectMember.user_id == current_user.id
-    ).first()
-    
-    if not current_member or current_member.role != Role.MAINTAINER.value:
+    if not deps.check_project_maintainer(db, id, current_user):
          raise HTTPException(status_code=403, detail="Only maintainers can add members")
 
-    project = db.query(Project).filter(Project.id == id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-        
-    target_user = db.query(User).filter(User.id == member_in.user_id).first()
+    # A maintainer's project exists; duplicates are rejected by the unique constraint
+    target_user = db.query(User.id).filter(User.id == member_in.user_id).first()
     if not target_user:
         raise HTTPException(status_code=404, detail="User not found")
-        
-    existing_member = db.query(ProjectMember).filter(
-        ProjectMember.project_id == id,
-        ProjectMember.user_id == member_in.user_id
-    ).first()
-    
-    if existing_member:
-        raise HTTPException(status_code=400, detail="User is already a member")
 
     member = ProjectMember(
         project_id=id,
@@ -132,8 +158,12 @@ def add_project_member(
         role=member_in.role
     )
     db.add(member)
-    db.commit()
-    db.refresh(member)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="User is already a member")
+    deps.invalidate_membership(db, id, member_in.user_id)
     return member
 
 @router.patch("/{id}", response_model=project_schema.Project)
@@ -142,7 +172,7 @@ def update_project(
     db: Session = Depends(deps.get_db),
     id: int,
     project_in: project_schema.ProjectUpdate,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: deps.Principal = Depends(deps.get_current_principal),
 ) -> Any:
     """
     Update a project. Only maintainers can update.
@@ -152,12 +182,7 @@ def update_project(
         raise HTTPException(status_code=404, detail="Project not found")
         
     # Check if current user is maintainer
-    current_member = db.query(ProjectMember).filter(
-        ProjectMember.project_id == id,
-        ProjectMember.user_id == current_user.id
-    ).first()
-    
-    if not current_member or current_member.role != Role.MAINTAINER.value:
+    if not deps.check_project_maintainer(db, id, current_user):
         raise HTTPException(status_code=403, detail="Only maintainers can update projects")
     
     # Update project fields
@@ -174,58 +199,121 @@ def update_project(
         
     db.add(project)
     db.commit()
-    db.refresh(project)
     return project
 
 @router.get("/{id}/members", response_model=List[project_schema.ProjectMemberWithUser])
 def get_project_members(
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     id: int,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: deps.Principal = Depends(deps.get_current_principal),
     skip: int = 0,
-    limit: int = 10,
+    limit: int = Query(10, ge=1, le=500),
+    cursor: Optional[str] = None,
 ) -> Any:
     """
     Get all members of a project with user details.
-    Excludes current user and supports pagination.
+    Excludes current user and supports skip/limit or cursor pagination;
+    the cursor for the next page is returned in the X-Next-Cursor header.
     """
     # Check if current user is project member
-    member = db.query(ProjectMember).filter(
-        ProjectMember.project_id == id,
-        ProjectMember.user_id == current_user.id
-    ).first()
-    
-    if not member:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    deps.require_project_member(db, id, current_user)
     
     # Get project members excluding current user with pagination
-    members = db.query(ProjectMember).filter(
-        ProjectMember.project_id == id,
-        ProjectMember.user_id != current_user.id  # Exclude current user
-    ).offset(skip).limit(limit).all()
-    
-    return members
+    members, next_cursor = paginate(
+        db.query(ProjectMember).options(
+            *schema_loader_options(ProjectMember, project_schema.ProjectMemberWithUser)
+        ).filter(
+            ProjectMember.project_id == id,
+            ProjectMember.user_id != current_user.id  # Exclude current user
+        ),
+        [ProjectMember.id], skip=skip, limit=limit, cursor=cursor,
+    )
+    response = FastJSONResponse(dump_many(project_schema.ProjectMemberWithUser, members))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response
 
 @router.get("/{id}/my-membership", response_model=project_schema.ProjectMember)
 def get_my_project_membership(
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     id: int,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: deps.Principal = Depends(deps.get_current_principal),
 ) -> Any:
     """
     Get current user's membership in the project.
     """
-    member = db.query(ProjectMember).filter(
-        ProjectMember.project_id == id,
-        ProjectMember.user_id == current_user.id
-    ).first()
+    member = deps.get_membership(db, id, current_user.id)
     
     if not member:
         raise HTTPException(status_code=404, detail="Not a member of this project")
     
     return member
 
+@router.get("/{id}/export")
+def export_project_data(
+    *,
+    db: Session = Depends(deps.get_stream_db),
+    id: int,
+    current_user: deps.Principal = Depends(deps.get_current_principal),
+    format: ExportFormat = ExportFormat.NDJSON,
+    resource: ExportResource = ExportResource.ALL,
+    gzip: bool = False,
+) -> Any:
+    """
+    Stream all issues and/or comments of a project as NDJSON or CSV.
+    NDJSON lines carry a "type" field; CSV exports one resource at a time.
+    """
+    if format == ExportFormat.CSV and resource == ExportResource.ALL:
+        raise HTTPException(status_code=400, detail="CSV export needs resource=issues or resource=comments")
 
+    project = db.query(Project).filter(Project.id == id).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    deps.require_project_member(db, id, current_user)
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="{project.key}-{resource.value}.{format.value}"',
+    }
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        export_project(db, id, format, resource, compress=gzip),
+        media_type=MEDIA_TYPES[format],
+        headers=headers,
+    )
 
+@router.get("/{id}/events", response_class=StreamingResponse)
+def stream_project_events(
+    *,
+    db: Session = Depends(deps.get_read_db),
+    id: int,
+    current_user: deps.Principal = Depends(deps.get_current_principal),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+) -> Any:
+    """
+    Server-sent events for the project's issues (`issue.created`,
+    `issue.updated`). Reconnecting with Last-Event-ID replays what was
+    missed, or sends a `reset` event when that is no longer known.
+    """
+    since = last_event_id(last_event_id_header)
+    if not db.query(Project.id).filter(Project.id == id).first():
+        raise HTTPException(status_code=404, detail="Project not found")
+    deps.require_project_member(db, id, current_user)
+    # The stream may stay open for hours; give the connection back now
+    db.close()
+    return event_stream([project_topic(id)], since)
+
+@router.get("/{id}/stats", response_model=project_schema.ProjectIssueStats)
+def read_project_stats(
+    *,
+    db: Session = Depends(deps.get_read_db),
+    id: int,
+    current_user: deps.Principal = Depends(deps.get_current_principal),
+) -> Any:
+    """
+    Issue counts of a project by status, priority and assignee.
+    """
+    deps.require_project_member(db, id, current_user)
+    return read_issue_stats(db, [id])[0]
@@ -0,0 +1,77 @@
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.api import deps
+from app.api.serialization import FastJSONResponse, dump_many
+from app.db.changelog import safe_watermark
+from app.models.change_log import ChangeLog
+from app.models.comment import Comment
+from app.models.issue import Issue
+from app.models.project import Project, ProjectMember
+from app.schemas import comment as comment_schema
+from app.schemas import issue as issue_schema
+from app.schemas import project as project_schema
+from app.schemas import sync as sync_schema
+
+router = APIRouter()
+
+# Change log entity -> (model, response schema, response field)
+SYNCED = {
+    "project": (Project, project_schema.Project, "projects"),
+    "member": (ProjectMember, project_schema.ProjectMember, "memberships"),
+    "issue": (Issue, issue_schema.Issue, "issues"),
+    "comment": (Comment, comment_schema.Comment, "comments"),
+}
+
+@router.get("/", response_model=sync_schema.SyncResponse)
+def sync(
+    db: Session = Depends(deps.get_read_db),
+    current_user: deps.Principal = Depends(deps.get_current_principal),
+    since: int = Query(0, ge=0),
+    project_id: Optional[int] = None,
+    limit: int = Query(1000, ge=1, le=5000),
+) -> Any:
+    """
+    Projects, memberships, issues and comments of the caller's projects
+    changed since the `since` cursor (0 for everything), as they are now.
+    Rows changed several times appear once; rows that no longer exist are
+    listed under `deleted`. Pass the returned `cursor` next time, at once
+    while `has_more` is set.
+    """
+    if project_id is not None:
+        deps.require_project_member(db, project_id, current_user)
+        project_ids = [project_id]
+    else:
+        project_ids = [
+            p for (p,) in db.query(ProjectMember.project_id).filter(ProjectMember.user_id == current_user.id)
+        ]
+
+    watermark = safe_watermark(db)
+    entries = (
+        db.query(ChangeLog.id, ChangeLog.entity, ChangeLog.entity_id)
+        .filter(ChangeLog.project_id.in_(project_ids), ChangeLog.id > since, ChangeLog.id <= watermark)
+        .order_by(ChangeLog.id)
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    # A page that ends early skips the other projects' entries up to the watermark too
+    cursor = entries[-1].id if has_more else max(since, watermark)
+
+    changed: Dict[str, Set[int]] = defaultdict(set)
+    for entry in entries:
+        changed[entry.entity].add(entry.entity_id)
+
+    content: Dict[str, Any] = {"cursor": cursor, "has_more": has_more, "deleted": {}, "resync_projects": []}
+    for entity, (model, schema, field) in SYNCED.items():
+        ids = changed.get(entity, set())
+        rows = db.query(model).filter(model.id.in_(ids)).order_by(model.id).all() if ids else []
+        content[field] = dump_many(schema, rows)
+        content["deleted"][field] = sorted(ids - {row.id for row in rows})
+        if entity == "member" and since:
+            content["resync_projects"] = sorted(
+                row.project_id for row in rows if row.user_id == current_user.id
+            )
+    return FastJSONResponse(content)
@@ -1,7 +1,8 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.orm import Session
 from app.api import deps
+from app.api.pagination import paginate, NEXT_CURSOR_HEADER
 from app.schemas import user as user_schema
 from app.models import User
 
@@ -18,14 +19,21 @@ def read_user_me(
 
 @router.get("/", response_model=List[user_schema.User])
 def read_users(
-    db: Session = Depends(deps.get_db),
+    response: Response,
+    db: Session = Depends(deps.get_read_db),
     skip: int = 0,
-    limit: int = 10,
-    current_user: User = Depends(deps.get_current_user),
+    limit: int = Query(10, ge=1, le=500),
+    cursor: Optional[str] = None,
+    current_user: deps.Principal = Depends(deps.get_current_principal),
 ) -> Any:
     """
     Retrieve all users with pagination.
+    The cursor for the next page is returned in the X-Next-Cursor header.
     """
-    users = db.query(User).offset(skip).limit(limit).all()
+    users, next_cursor = paginate(
+        db.query(User), [User.id], skip=skip, limit=limit, cursor=cursor
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return users
 
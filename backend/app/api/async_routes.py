@@ -0,0 +1,93 @@
+"""
+Async mode for the sync endpoint modules.
+
+Every sync endpoint is wrapped in a coroutine that takes an AsyncSession and
+runs the original handler body through `AsyncSession.run_sync`. The ORM code is
+unchanged, but its I/O is awaited on the event loop by the asyncio driver, so a
+request no longer pins an anyio worker thread for its whole lifetime.
+"""
+import inspect
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import APIRouter, Depends
+from fastapi.params import Depends as DependsParam
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+
+from app.api import deps
+
+# Sync dependency -> async replacement injected into wrapped endpoints
+ASYNC_DEPENDENCIES: Dict[Callable, Callable] = {
+    deps.get_db: deps.get_async_db,
+    deps.get_read_db: deps.get_async_read_db,
+    deps.get_current_user: deps.get_current_user_async,
+    deps.get_current_principal: deps.get_current_principal_async,
+}
+
+def asyncify_endpoint(endpoint: Callable, response_model: Any = None) -> Callable:
+    """
+    Build an async endpoint that runs `endpoint` on the request's AsyncSession.
+
+    The response model is validated inside the greenlet as well, so lazy
+    relationship loads during serialization still hit the database safely.
+    """
+    if inspect.iscoroutinefunction(endpoint):
+        return endpoint
+
+    signature = inspect.signature(endpoint)
+    db_param: Optional[str] = None
+    parameters = []
+    for param in signature.parameters.values():
+        dependency = param.default
+        if isinstance(dependency, DependsParam) and dependency.dependency in ASYNC_DEPENDENCIES:
+            if dependency.dependency in (deps.get_db, deps.get_read_db):
+                db_param = param.name
+            param = param.replace(default=Depends(ASYNC_DEPENDENCIES[dependency.dependency]))
+        parameters.append(param)
+
+    adapter = TypeAdapter(response_model) if response_model is not None else None
+
+    def run(db, kwargs: Dict[str, Any]) -> Any:
+        if db_param is not None:
+            kwargs[db_param] = db
+        result = endpoint(**kwargs)
+        if adapter is not None and not isinstance(result, Response):
+            result = adapter.validate_python(result, from_attributes=True)
+        return result
+
+    async def async_endpoint(**kwargs: Any) -> Any:
+        if db_param is None:
+            # May still do blocking work (e.g. on a get_stream_db session)
+            return await run_in_threadpool(run, None, kwargs)
+        db = kwargs[db_param]
+        return await db.run_sync(run, kwargs)
+
+    async_endpoint.__name__ = endpoint.__name__
+    async_endpoint.__doc__ = endpoint.__doc__
+    async_endpoint.__signature__ = signature.replace(parameters=parameters)
+    return async_endpoint
+
+def asyncify_router(router: APIRouter) -> APIRouter:
+    """
+    Copy a sync router, replacing each endpoint with its async wrapper.
+    """
+    async_router = APIRouter()
+    for route in router.routes:
+        if not isinstance(route, APIRoute):
+            async_router.routes.append(route)
+            continue
+        async_router.add_api_route(
+            route.path,
+            asyncify_endpoint(route.endpoint, route.response_model),
+            response_model=route.response_model,
+            status_code=route.status_code,
+            methods=route.methods,
+            name=route.name,
+            summary=route.summary,
+            description=route.description,
+            responses=route.responses,
+            response_class=route.response_class,
+        )
+    return async_router
@@ -0,0 +1,96 @@
+import json
+import threading
+from collections import defaultdict
+from enum import Enum
+from typing import Dict, Hashable, Iterable, Optional, Sequence
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Query, Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.issue import Issue
+
+class CountMode(str, Enum):
+    EXACT = "exact"        # COUNT(*), memoized until an issue in the projects changes
+    ESTIMATE = "estimate"  # planner row estimate; exact (memoized) where unavailable
+    NONE = "none"          # no total, clients rely on has_more
+
+_counts = TTLCache(maxsize=settings.ISSUE_COUNT_CACHE_SIZE, ttl=settings.ISSUE_COUNT_CACHE_TTL)
+
+# Bumped after every commit that touches issues of a project. Cache keys embed the
+# versions of the projects they cover, so a bump makes older entries unreachable.
+_project_versions: Dict[int, int] = defaultdict(int)
+_versions_lock = threading.Lock()
+
+def invalidate_issue_counts(project_ids: Iterable[int]) -> None:
+    """
+    Drop memoized issue counts for `project_ids`.
+
+    Called automatically after commits that change Issue rows through the ORM;
+    bulk statements that bypass the unit of work must call it themselves.
+    """
+    with _versions_lock:
+        for project_id in project_ids:
+            _project_versions[project_id] += 1
+
+def count_issues(
+    db: Session,
+    query: Query,
+    project_ids: Sequence[int],
+    filters: Hashable,
+    mode: CountMode,
+    memoize: bool = True,
+) -> Optional[int]:
+    """
+    Total for an issue listing restricted to `project_ids` plus `filters`.
+
+    Pass `memoize=False` for listings that depend on more than the issue rows
+    (e.g. search, which also matches comments) and so are not invalidated here.
+    """
+    if mode == CountMode.NONE:
+        return None
+    if mode == CountMode.ESTIMATE and db.get_bind().dialect.name == "postgresql":
+        return _planner_estimate(db, query)
+    if not memoize:
+        return query.order_by(None).count()
+
+    project_ids = tuple(sorted(set(project_ids)))
+    with _versions_lock:
+        versions = tuple(_project_versions[p] for p in project_ids)
+    key = (project_ids, versions, filters)
+    total = _counts.get(key)
+    if total is None:
+        total = query.order_by(None).count()
+        _counts.set(key, total)
+    return total
+
+def _planner_estimate(db: Session, query: Query) -> int:
+    """
+    Row estimate of the top plan node, read from `EXPLAIN (FORMAT JSON)`.
+    """
+    statement = query.statement.compile(
+        dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True}
+    )
+    plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}").scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+@event.listens_for(Session, "after_flush")
+def _collect_issue_changes(session: Session, flush_context) -> None:
+    changed = session.info.setdefault("issue_count_projects", set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Issue):
+            history = inspect(obj).attrs.project_id.history
+            changed.update(p for p in (*history.added, *history.unchanged, *history.deleted) if p)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    changed = session.info.pop("issue_count_projects", None)
+    if changed:
+        invalidate_issue_counts(changed)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session: Session) -> None:
+    session.info.pop("issue_count_projects", None)
@@ -1,11 +1,17 @@
-from typing import Generator, Optional
+import time
+from typing import AsyncGenerator, Dict, Generator, Iterable, NamedTuple, Optional, Union
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.db import replicas
+from app.db.session import SessionLocal, AsyncSessionLocal
 from app.models import User
+from app.models.project import ProjectMember, Role
 from app.schemas import user as user_schema
 
 reusable_oauth2 = OAuth2PasswordBearer(
@@ -19,34 +25,282 @@ def get_db() -> Generator:
     finally:
         db.close()
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(reusable_oauth2)
-) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+async def get_async_db() -> AsyncGenerator:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def get_stream_db() -> Generator:
+    """
+    Sync session in both modes, for responses that keep reading from a
+    server-side cursor while they stream. It is closed after the response
+    has been sent.
+    """
+    try:
+        db = SessionLocal()
+        yield db
+    finally:
+        db.close()
+
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+def decode_token(token: str) -> user_schema.TokenData:
+    """
+    Verify a bearer token and return its claims.
+    """
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        token_data = user_schema.TokenData(id=payload.get("sub"))
+        token_data = user_schema.TokenData(
+            id=payload.get("sub"), role=payload.get("role"), exp=payload.get("exp")
+        )
         if token_data.id is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-        
-    user = db.query(User).filter(User.id == int(token_data.id)).first()
+    return token_data
+
+def decode_token_subject(token: str) -> int:
+    """
+    Decode a bearer token and return the user id it was issued for.
+    """
+    return int(decode_token(token).id)
+
+def get_current_user(
+    db: Session = Depends(get_db),
+    token: str = Depends(reusable_oauth2)
+) -> User:
+    user_id = decode_token_subject(token)
+    db.info["user_id"] = user_id
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is None:
+        raise credentials_exception
+    return user
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(reusable_oauth2)
+) -> User:
+    user_id = decode_token_subject(token)
+    db.info["user_id"] = user_id
+    user = await db.get(User, user_id)
     if user is None:
         raise credentials_exception
     return user
 
+class Principal(NamedTuple):
+    """
+    The authenticated caller: all most endpoints need instead of the User row.
+    """
+    id: int
+    role: str
+
+# token -> (Principal, user generation). Entries never outlive the token, and
+# bumping a user's generation invalidates every cached token of that user.
+_principals = TTLCache(maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL)
+# user id -> generation, only for users changed or deleted since startup. An
+# entry may lapse once every token issued before the change has expired.
+_principal_generations = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=max(settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60, settings.PRINCIPAL_CACHE_TTL),
+)
+
+def invalidate_principal(user_id: int) -> None:
+    _principal_generations.set(user_id, _principal_generations.get(user_id, 0) + 1)
+
+def _cached_principal(token: str) -> Optional[Principal]:
+    entry = _principals.get(token)
+    if entry is not None:
+        principal, generation = entry
+        if generation == _principal_generations.get(principal.id, 0):
+            return principal
+    return None
+
+def _cache_principal(token: str, principal: Principal, generation: int, exp: Optional[int]) -> None:
+    ttl = exp - time.time() if exp is not None else None
+    _principals.set(token, (principal, generation), ttl=ttl)
+
+def get_current_principal(
+    db: Session = Depends(get_db),
+    token: str = Depends(reusable_oauth2)
+) -> Principal:
+    """
+    Resolve the caller without loading the User row.
+
+    Tokens carrying a `role` claim need no query at all; older tokens, and
+    tokens of users changed or deleted since this process started, cost one
+    `SELECT id, role` the first time they are seen.
+    """
+    principal = _resolve_principal(db, token)
+    # Lets a write on this session pin the user's reads to the primary
+    db.info["user_id"] = principal.id
+    return principal
+
+def _resolve_principal(db: Session, token: str) -> Principal:
+    principal = _cached_principal(token)
+    if principal is not None:
+        return principal
+    token_data = decode_token(token)
+    user_id = int(token_data.id)
+    generation = _principal_generations.get(user_id, 0)
+    role = token_data.role
+    # Once the user was changed or deleted, a role claim may be stale: check the row
+    if role is None or generation:
+        row = db.query(User.id, User.role).filter(User.id == user_id).first()
+        if row is None:
+            raise credentials_exception
+        role = row.role
+    principal = Principal(user_id, role)
+    _cache_principal(token, principal, generation, token_data.exp)
+    return principal
+
+def require_admin(principal: Principal = Depends(get_current_principal)) -> Principal:
+    """
+    The caller, if they hold the global maintainer role; 403 otherwise.
+    """
+    if principal.role != user_schema.UserRole.MAINTAINER:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return principal
+
+async def get_current_principal_async(
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(reusable_oauth2)
+) -> Principal:
+    principal = await _resolve_principal_async(db, token)
+    db.info["user_id"] = principal.id
+    return principal
+
+async def _resolve_principal_async(db: AsyncSession, token: str) -> Principal:
+    principal = _cached_principal(token)
+    if principal is not None:
+        return principal
+    token_data = decode_token(token)
+    user_id = int(token_data.id)
+    generation = _principal_generations.get(user_id, 0)
+    role = token_data.role
+    if role is None or generation:
+        result = await db.execute(select(User.id, User.role).where(User.id == user_id))
+        row = result.first()
+        if row is None:
+            raise credentials_exception
+        role = row.role
+    principal = Principal(user_id, role)
+    _cache_principal(token, principal, generation, token_data.exp)
+    return principal
+
+def get_read_db(
+    primary: Session = Depends(get_db),
+    principal: Principal = Depends(get_current_principal),
+) -> Generator:
+    """
+    Session for read-only endpoints: on a replica when one is configured and
+    healthy and the caller has not just written, otherwise the request's
+    primary session.
+    """
+    replica = replicas.replica_set.choose(principal.id)
+    if replica is None:
+        yield primary
+        return
+    db = SessionLocal(bind=replica.engine, info={"replica": replica.name})
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db(
+    primary: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(get_current_principal_async),
+) -> AsyncGenerator:
+    replica = replicas.replica_set.choose(principal.id)
+    if replica is None or replica.async_engine is None:
+        yield primary
+        return
+    async with AsyncSessionLocal(bind=replica.async_engine, info={"replica": replica.name}) as db:
+        yield db
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target: User) -> None:
+    invalidate_principal(target.id)
+
+class Membership(NamedTuple):
+    id: int
+    project_id: int
+    user_id: int
+    role: str
+
+# Process-wide cache of (project_id, user_id) -> Membership. Only positive
+# lookups are cached, so a member added in another worker is seen at once;
+# the TTL bounds how long a change made elsewhere can go unnoticed.
+_memberships = TTLCache(maxsize=settings.MEMBERSHIP_CACHE_SIZE, ttl=settings.MEMBERSHIP_CACHE_TTL)
+
+def get_membership(db: Session, project_id: int, user_id: int) -> Optional[Membership]:
+    """
+    Resolve a user's membership in a project.
+
+    Results are memoized on the session for the rest of the request and
+    members are cached process-wide, so a request issues at most one
+    membership query however many checks it makes.
+    """
+    return get_memberships(db, [project_id], user_id)[project_id]
+
+def get_memberships(db: Session, project_ids: Iterable[int], user_id: int) -> Dict[int, Optional[Membership]]:
+    """
+    Resolve a user's memberships in several projects with at most one query.
+    """
+    memo = db.info.setdefault("memberships", {})
+    resolved: Dict[int, Optional[Membership]] = {}
+    missing = []
+    for project_id in set(project_ids):
+        key = (project_id, user_id)
+        if key in memo:
+            resolved[project_id] = memo[key]
+            continue
+        member = _memberships.get(key)
+        if member is None:
+            missing.append(project_id)
+        else:
+            resolved[project_id] = memo[key] = member
+
+    if missing:
+        rows = db.query(
+            ProjectMember.id, ProjectMember.project_id, ProjectMember.user_id, ProjectMember.role
+        ).filter(
+            ProjectMember.project_id.in_(missing),
+            ProjectMember.user_id == user_id
+        ).all()
+        found = {row.project_id: Membership(*row) for row in rows}
+        for project_id in missing:
+            member = found.get(project_id)
+            if member is not None:
+                _memberships.set((project_id, user_id), member)
+            resolved[project_id] = memo[(project_id, user_id)] = member
+    return resolved
+
+def invalidate_membership(db: Session, project_id: int, user_id: int) -> None:
+    """
+    Forget a cached membership after it was written.
+    """
+    _memberships.pop((project_id, user_id))
+    db.info.get("memberships", {}).pop((project_id, user_id), None)
+
+def require_project_member(db: Session, project_id: int, user: Union[User, Principal]) -> Membership:
+    """
+    Return the user's membership in the project or fail with 403.
+    """
+    member = get_membership(db, project_id, user.id)
+    if not member:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return member
+
 def check_issue_permission(
     db: Session,
     issue,  # Issue model
-    user: User,
+    user: Union[User, Principal],
     action: str = "update"
 ) -> bool:
     """
@@ -61,13 +315,8 @@ def check_issue_permission(
     Returns:
         bool: True if user has permission, False otherwise
     """
-    from app.models.project import ProjectMember, Role
-    
     # Check if user is project member
-    member = db.query(ProjectMember).filter(
-        ProjectMember.project_id == issue.project_id,
-        ProjectMember.user_id == user.id
-    ).first()
+    member = get_membership(db, issue.project_id, user.id)
     
     if not member:
         return False
@@ -86,7 +335,7 @@ def check_issue_permission(
 def check_project_maintainer(
     db: Session,
     project_id: int,
-    user: User
+    user: Union[User, Principal]
 ) -> bool:
     """
     Check if user is a maintainer of the project.
@@ -99,13 +348,7 @@ def check_project_maintainer(
     Returns:
         bool: True if user is maintainer, False otherwise
     """
-    from app.models.project import ProjectMember, Role
-    
-    member = db.query(ProjectMember).filter(
-        ProjectMember.project_id == project_id,
-        ProjectMember.user_id == user.id,
-        ProjectMember.role == Role.MAINTAINER
-    ).first()
+    member = get_membership(db, project_id, user.id)
     
-    return member is not None
+    return member is not None and member.role == Role.MAINTAINER
 
@@ -0,0 +1,37 @@
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Response
+
+# Responses depend on the caller's access, so shared caches must not keep them;
+# browsers store them but revalidate with If-None-Match on every use.
+CACHE_CONTROL = "private, no-cache"
+
+def make_etag(*version: Any) -> str:
+    """
+    Strong ETag for a representation identified by `version`, a tuple of
+    values that changes whenever the representation does.
+    """
+    return '"' + hashlib.sha1(repr(version).encode()).hexdigest() + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches `etag` (weak comparison, RFC 9110).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+def not_modified(etag: str) -> Response:
+    """
+    Empty 304 response; returning it skips serialization entirely.
+    """
+    response = Response(status_code=304)
+    set_etag(response, etag)
+    return response
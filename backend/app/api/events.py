@@ -0,0 +1,120 @@
+"""
+Issue and comment changes as server-sent events.
+
+Committed writes through the ORM are published to the hub (app.core.events)
+on these topics:
+
+- `project:{id}`: `issue.created`, `issue.updated`
+- `issue:{id}`: the above for that issue, and `comment.created`
+
+Comment events go to the issue topic only: finding the project of a new
+comment would cost the comment endpoint another query. Each event's data is
+the row as its response schema (`issue` or `comment`), plus the `changed`
+field names for updates. Rows are read from what the flush already loaded,
+so publishing runs no SQL. Bulk statements that bypass the unit of work are
+not published.
+"""
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from starlette.responses import StreamingResponse
+
+from app.api.serialization import dumps
+from app.core.config import settings
+from app.core.events import SubscriptionOverflow, hub
+from app.models.comment import Comment
+from app.models.issue import Issue
+from app.schemas import comment as comment_schema
+from app.schemas import issue as issue_schema
+
+PendingEvent = Tuple[Tuple[str, ...], str, Dict[str, Any]]
+
+# Milliseconds EventSource waits before reconnecting
+RETRY_MS = 3000
+
+def project_topic(project_id: int) -> str:
+    return f"project:{project_id}"
+
+def issue_topic(issue_id: int) -> str:
+    return f"issue:{issue_id}"
+
+def _loaded(schema, obj) -> Dict[str, Any]:
+    # Only what the flush loaded: anything expired would need a SELECT
+    state = obj.__dict__
+    return {name: state[name] for name in schema.model_fields if name in state}
+
+@event.listens_for(Session, "after_flush")
+def _collect_events(session: Session, flush_context) -> None:
+    pending: List[PendingEvent] = session.info.setdefault("events", [])
+    for obj in session.new:
+        if isinstance(obj, Issue):
+            pending.append((
+                (project_topic(obj.project_id), issue_topic(obj.id)),
+                "issue.created",
+                {"issue": _loaded(issue_schema.Issue, obj)},
+            ))
+        elif isinstance(obj, Comment):
+            pending.append((
+                (issue_topic(obj.issue_id),),
+                "comment.created",
+                {"comment": _loaded(comment_schema.Comment, obj)},
+            ))
+    for obj in session.dirty:
+        if isinstance(obj, Issue) and session.is_modified(obj):
+            attrs = inspect(obj).attrs
+            changed = [
+                name for name in issue_schema.IssueUpdate.model_fields
+                if attrs[name].history.has_changes()
+            ]
+            if changed:
+                pending.append((
+                    (project_topic(obj.project_id), issue_topic(obj.id)),
+                    "issue.updated",
+                    {"issue": _loaded(issue_schema.Issue, obj), "changed": changed},
+                ))
+
+@event.listens_for(Session, "after_commit")
+def _publish_events(session: Session) -> None:
+    for topics, type, data in session.info.pop("events", ()):
+        hub.publish(topics, type, dumps(data).decode())
+
+@event.listens_for(Session, "after_rollback")
+def _discard_events(session: Session) -> None:
+    session.info.pop("events", None)
+
+def last_event_id(header: Optional[str]) -> Optional[int]:
+    if header is None:
+        return None
+    try:
+        return int(header)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Last-Event-ID must be an event id")
+
+def event_stream(topics: List[str], last_event_id: Optional[int]) -> StreamingResponse:
+    """
+    Stream the events of `topics`. Without a Last-Event-ID the stream starts
+    from now, which is taken before the response starts so nothing published
+    after the caller's checks is missed.
+    """
+    since = hub.last_id if last_event_id is None else last_event_id
+    return StreamingResponse(
+        _frames(topics, since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+async def _frames(topics: List[str], since: int) -> AsyncIterator[bytes]:
+    subscription = hub.subscribe(topics, since)
+    try:
+        yield f"retry: {RETRY_MS}\n\n".encode()
+        while True:
+            try:
+                event = await subscription.next(settings.EVENTS_KEEPALIVE)
+            except SubscriptionOverflow:
+                # Too far behind; the client reconnects and resumes from the replay history
+                return
+            yield b": keepalive\n\n" if event is None else event.encode()
+    finally:
+        hub.unsubscribe(subscription)
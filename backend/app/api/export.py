@@ -0,0 +1,139 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from enum import Enum
+from typing import Any, Iterable, Iterator, Mapping
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.comment import Comment
+from app.models.issue import Issue
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+# Serialized bytes buffered before a chunk is handed to the response
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+class ExportResource(str, Enum):
+    ALL = "all"            # issues then comments, NDJSON only
+    ISSUES = "issues"
+    COMMENTS = "comments"
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+ISSUE_COLUMNS = [c.name for c in Issue.__table__.columns if c.name != "search_vector"]
+COMMENT_COLUMNS = [c.name for c in Comment.__table__.columns]
+
+def _stream(db: Session, statement) -> Iterator[Mapping[str, Any]]:
+    """
+    Yield rows of a Core statement from a server-side cursor.
+
+    `yield_per` implies `stream_results`, so drivers that support it (psycopg2
+    named cursors, asyncpg) fetch in batches instead of buffering the result.
+    """
+    result = db.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    for row in result.mappings():
+        yield row
+
+def _issue_rows(db: Session, project_id: int) -> Iterator[Mapping[str, Any]]:
+    return _stream(
+        db,
+        select(*(Issue.__table__.c[name] for name in ISSUE_COLUMNS))
+        .where(Issue.project_id == project_id)
+        .order_by(Issue.id),
+    )
+
+def _comment_rows(db: Session, project_id: int) -> Iterator[Mapping[str, Any]]:
+    return _stream(
+        db,
+        select(Comment.__table__)
+        .join(Issue, Issue.id == Comment.issue_id)
+        .where(Issue.project_id == project_id)
+        .order_by(Comment.id),
+    )
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def _ndjson_lines(db: Session, project_id: int, resource: ExportResource) -> Iterator[str]:
+    sources = []
+    if resource in (ExportResource.ALL, ExportResource.ISSUES):
+        sources.append(("issue", _issue_rows(db, project_id)))
+    if resource in (ExportResource.ALL, ExportResource.COMMENTS):
+        sources.append(("comment", _comment_rows(db, project_id)))
+    for kind, rows in sources:
+        for row in rows:
+            yield json.dumps({"type": kind, **row}, default=_json_default, separators=(",", ":")) + "\n"
+
+def _csv_lines(db: Session, project_id: int, resource: ExportResource) -> Iterator[str]:
+    if resource == ExportResource.ISSUES:
+        columns, rows = ISSUE_COLUMNS, _issue_rows(db, project_id)
+    else:
+        columns, rows = COMMENT_COLUMNS, _comment_rows(db, project_id)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([
+            row[c].isoformat() if isinstance(row[c], datetime) else row[c] for c in columns
+        ])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+def _chunked(lines: Iterable[str], compress: bool) -> Iterator[bytes]:
+    """
+    Group serialized lines into chunks of about EXPORT_CHUNK_SIZE bytes,
+    optionally gzip-compressing them on the fly.
+    """
+    gzip = zlib.compressobj(wbits=31) if compress else None
+    pending, size = [], 0
+    for line in lines:
+        data = line.encode()
+        pending.append(data)
+        size += len(data)
+        if size >= EXPORT_CHUNK_SIZE:
+            chunk = b"".join(pending)
+            pending, size = [], 0
+            chunk = gzip.compress(chunk) if gzip else chunk
+            if chunk:
+                yield chunk
+    chunk = b"".join(pending)
+    if gzip:
+        chunk = gzip.compress(chunk) + gzip.flush()
+    if chunk:
+        yield chunk
+
+def export_project(
+    db: Session,
+    project_id: int,
+    fmt: ExportFormat,
+    resource: ExportResource,
+    compress: bool = False,
+) -> Iterator[bytes]:
+    """
+    Serialize a project's issues and/or comments row by row.
+
+    Rows are read as plain Core mappings rather than ORM objects, so nothing
+    accumulates in the session's identity map and memory stays flat however
+    large the project is. The caller owns `db` and must keep it open until the
+    iterator is exhausted.
+    """
+    if fmt == ExportFormat.NDJSON:
+        lines = _ndjson_lines(db, project_id, resource)
+    else:
+        lines = _csv_lines(db, project_id, resource)
+    return _chunked(lines, compress)
@@ -0,0 +1,55 @@
+import typing
+from functools import lru_cache
+from typing import Any, FrozenSet, Optional, Tuple, Type
+
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
+
+def schema_loader_options(model: Type[Any], schema: Type[BaseModel]) -> Tuple[LoaderOption, ...]:
+    """
+    Eager-loading options for serializing `model` rows through `schema`.
+
+    Every schema field named after a relationship of `model` is loaded up
+    front, recursively for nested schemas: many-to-one with a JOIN in the same
+    query, collections with one SELECT ... IN per page. Listing endpoints pass
+    these to `Query.options`, so adding a nested field to a response schema
+    cannot reintroduce a lazy load per row.
+    """
+    return _loader_options(model, schema, frozenset())
+
+@lru_cache(maxsize=None)
+def _loader_options(
+    model: Type[Any], schema: Type[BaseModel], seen: FrozenSet[Tuple[Type[Any], Type[BaseModel]]]
+) -> Tuple[LoaderOption, ...]:
+    if (model, schema) in seen:
+        return ()
+    seen = seen | {(model, schema)}
+    relationships = inspect(model).relationships
+    options = []
+    for name, field in schema.model_fields.items():
+        relationship = relationships.get(name)
+        if relationship is None:
+            continue
+        attribute = getattr(model, name)
+        option = selectinload(attribute) if relationship.uselist else joinedload(attribute)
+        nested_schema = _nested_schema(field.annotation)
+        if nested_schema is not None:
+            nested = _loader_options(relationship.mapper.class_, nested_schema, seen)
+            if nested:
+                option = option.options(*nested)
+        options.append(option)
+    return tuple(options)
+
+def _nested_schema(annotation: Any) -> Optional[Type[BaseModel]]:
+    """
+    The schema inside an annotation such as `User`, `Optional[User]` or `List[User]`.
+    """
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for argument in typing.get_args(annotation):
+        schema = _nested_schema(argument)
+        if schema is not None:
+            return schema
+    return None
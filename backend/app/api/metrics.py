@@ -0,0 +1,98 @@
+"""
+Request metrics middleware and the /metrics endpoint.
+
+Requests are labelled by route template (`/api/v1/issues/{id}`), never the raw
+path, so the number of series stays bounded; unmatched paths share one label.
+Latency runs to the last body chunk, except for streamed responses (event
+streams, exports), which can stay open for hours: theirs runs to the start
+of the response.
+"""
+import ipaddress
+import time
+from typing import Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.instrumentation import RequestDBStats, request_db_stats
+
+UNMATCHED = "<unmatched>"
+
+requests_total = metrics.counter("http_requests_total", "Requests served.", ["method", "route", "status"])
+requests_in_progress = metrics.gauge("http_requests_in_progress", "Requests being served.", ["method"])
+request_seconds = metrics.histogram(
+    "http_request_duration_seconds", "Request latency.", ["method", "route"]
+)
+request_statements = metrics.histogram(
+    "http_request_db_statements", "SQL statements per request.", ["method", "route"],
+    buckets=metrics.COUNT_BUCKETS,
+)
+request_db_seconds = metrics.histogram(
+    "http_request_db_seconds", "Time spent in SQL per request.", ["method", "route"]
+)
+
+def route_template(scope: Scope) -> str:
+    # Routes of included routers stay on their router and only know their
+    # own path; FastAPI records the full template of the matched one here
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    if context is not None:
+        return context.path
+    return getattr(scope.get("route"), "path", UNMATCHED)
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        stats = RequestDBStats()
+        token = request_db_stats.set(stats)
+        responded = None
+        streamed = False
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status, responded, streamed
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                responded = time.perf_counter()
+            elif message["type"] == "http.response.body" and message.get("more_body", False):
+                streamed = True
+            await send(message)
+
+        requests_in_progress.inc(method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            finished = responded if streamed and responded is not None else time.perf_counter()
+            elapsed = finished - started
+            requests_in_progress.dec(method)
+            request_db_stats.reset(token)
+            route = route_template(scope)
+            requests_total.inc(method, route, str(status))
+            request_seconds.observe(elapsed, method, route)
+            request_statements.observe(stats.statements, method, route)
+            request_db_seconds.observe(stats.seconds, method, route)
+
+def scrape_allowed(host: Optional[str]) -> bool:
+    networks = settings.METRICS_ALLOWED_NETWORKS
+    if not networks:
+        return True
+    try:
+        address = ipaddress.ip_address(host or "")
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(network) for network in networks)
+
+def metrics_endpoint(request: Request) -> Response:
+    if not scrape_allowed(request.client.host if request.client else None):
+        return Response(status_code=403)
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,95 @@
+"""
+Notification fan-out, run as background jobs.
+
+Flushes that add a comment or assign an issue enqueue a job (app.db.jobs)
+in the same transaction; the handlers work out who to tell in batches and
+hand the notifications to `deliver`:
+
+- `notify.comment`: the issue's reporter, assignee and earlier commenters,
+  except the comment's author.
+- `notify.assignment`: the new assignee, unless they assigned themselves or
+  the issue has been reassigned since.
+
+Delivery is a log line on the `app.notifications` logger until there is a
+mail or push channel to send through.
+"""
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, NamedTuple, Set
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.db import jobs
+from app.models.comment import Comment
+from app.models.issue import Issue
+
+logger = logging.getLogger("app.notifications")
+
+class Notification(NamedTuple):
+    user_id: int
+    issue_id: int
+    message: str
+
+def deliver(notifications: List[Notification]) -> None:
+    for notification in notifications:
+        logger.info("notify user %d about issue %d: %s", *notification)
+
+@event.listens_for(Session, "after_flush")
+def _enqueue_notifications(session: Session, flush_context) -> None:
+    comments, assignments = [], []
+    for obj in session.new:
+        if isinstance(obj, Comment):
+            comments.append({"comment_id": obj.id})
+        elif isinstance(obj, Issue) and obj.assignee_id is not None:
+            assignments.append({"issue_id": obj.id, "assignee_id": obj.assignee_id, "by": obj.reporter_id})
+    for obj in session.dirty:
+        if isinstance(obj, Issue):
+            added = inspect(obj).attrs.assignee_id.history.added
+            if added and added[0] is not None:
+                assignments.append({"issue_id": obj.id, "assignee_id": added[0], "by": session.info.get("user_id")})
+    jobs.enqueue(session, "notify.comment", comments)
+    jobs.enqueue(session, "notify.assignment", assignments)
+
+@jobs.handler("notify.comment", batch_size=100)
+def notify_comments(db: Session, payloads: List[Dict[str, Any]]) -> None:
+    comment_ids = {p["comment_id"] for p in payloads}
+    rows = (
+        db.query(Comment.id, Comment.author_id, Issue.id, Issue.title, Issue.reporter_id, Issue.assignee_id)
+        .join(Issue, Issue.id == Comment.issue_id)
+        .filter(Comment.id.in_(comment_ids))
+        .order_by(Comment.id)
+        .all()
+    )
+    if not rows:
+        return
+    commenters: Dict[int, Set[int]] = defaultdict(set)
+    for issue_id, author_id in (
+        db.query(Comment.issue_id, Comment.author_id)
+        .filter(Comment.issue_id.in_({row[2] for row in rows}))
+        .distinct()
+    ):
+        commenters[issue_id].add(author_id)
+
+    notifications = []
+    for comment_id, author_id, issue_id, title, reporter_id, assignee_id in rows:
+        recipients = ({reporter_id, assignee_id} | commenters[issue_id]) - {author_id, None}
+        notifications.extend(
+            Notification(user_id, issue_id, f"new comment on {title!r}") for user_id in sorted(recipients)
+        )
+    deliver(notifications)
+
+@jobs.handler("notify.assignment", batch_size=100)
+def notify_assignments(db: Session, payloads: List[Dict[str, Any]]) -> None:
+    issues = {
+        issue_id: (title, assignee_id)
+        for issue_id, title, assignee_id in db.query(Issue.id, Issue.title, Issue.assignee_id)
+        .filter(Issue.id.in_({p["issue_id"] for p in payloads}))
+    }
+    notifications = []
+    assignments = {(p["issue_id"], p["assignee_id"], p.get("by")) for p in payloads}
+    for issue_id, user_id, by in sorted(assignments, key=lambda a: a[:2]):
+        title, assignee_id = issues.get(issue_id, (None, None))
+        if assignee_id == user_id and user_id != by:
+            notifications.append(Notification(user_id, issue_id, f"you were assigned {title!r}"))
+    deliver(notifications)
@@ -0,0 +1,80 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import literal, tuple_
+from sqlalchemy.orm import Query
+from sqlalchemy.orm.attributes import InstrumentedAttribute
+
+# List endpoints that return a bare JSON array hand out the next cursor here
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Encode the sort-key values of the last row on a page into an opaque cursor.
+    """
+    raw = json.dumps(
+        [v.isoformat() if isinstance(v, datetime) else v for v in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, keys: Sequence[InstrumentedAttribute]) -> List[Any]:
+    """
+    Decode a cursor produced by `encode_cursor` for the given sort keys.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError(cursor)
+        decoded = []
+        for key, value in zip(keys, values):
+            python_type = key.type.python_type
+            if python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif not isinstance(value, python_type):
+                raise ValueError(cursor)
+            decoded.append(value)
+        return decoded
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def paginate(
+    query: Query,
+    keys: Sequence[InstrumentedAttribute],
+    *,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Fetch one page of `query` ordered by `keys`, which must end in a unique column.
+
+    With a cursor the page seeks past the last seen key (`WHERE (k1, k2) > (...)`),
+    so every page costs the same however deep it is. Without one the classic
+    skip/limit offset is used. Either way the returned `next_cursor` continues
+    after the page, or is None when there are no more rows.
+    """
+    query = query.order_by(*(key.desc() if descending else key.asc() for key in keys))
+    if cursor is not None:
+        if skip:
+            raise HTTPException(status_code=400, detail="skip cannot be combined with cursor")
+        values = decode_cursor(cursor, keys)
+        bound = tuple_(*(literal(value, key.type) for key, value in zip(keys, values)))
+        seek = tuple_(*keys)
+        query = query.filter(seek < bound if descending else seek > bound)
+    else:
+        query = query.offset(skip)
+
+    # One extra row tells us whether another page exists without counting
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if 0 < limit < len(rows):
+        rows = rows[:limit]
+        next_cursor = encode_cursor([getattr(rows[-1], key.key) for key in keys])
+    return rows, next_cursor
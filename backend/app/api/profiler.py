@@ -0,0 +1,126 @@
+"""
+Per-request SQL profiler (settings.SQL_PROFILER).
+
+A profiled request records every statement it runs (app.db.instrumentation)
+and gets an `X-SQL-Profile` response header summarizing them:
+
+    X-SQL-Profile: id=3f2c...; statements=14; sql_ms=6.2; repeated=1
+
+`repeated` counts statement shapes issued SQL_PROFILER_REPEAT_THRESHOLD or
+more times, the usual sign of an N+1 loop. The full profile (each statement,
+its parameter shape and time, the repeated shapes) is kept in memory and
+served by GET /debug/requests/{id}. The header reflects the statements run
+before the response started; the stored profile also covers streamed bodies.
+"""
+import re
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.metrics import route_template
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.instrumentation import ProfiledStatement, RequestDBStats, request_db_stats
+
+PROFILE_HEADER = "X-SQL-Profile"
+REQUEST_HEADER = "x-debug-sql"
+
+profiles = TTLCache(maxsize=settings.SQL_PROFILER_KEEP, ttl=settings.SQL_PROFILER_TTL)
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER = r"(?:\?|%s|\$\d+|%\(\w+\)s|:\w+)"
+# "IN (?, ?, ?)" -> "IN (?...)": expanded lists of different lengths are one shape
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+\s*\)")
+
+def statement_shape(statement: str) -> str:
+    return _PLACEHOLDER_LIST.sub("(?...)", _WHITESPACE.sub(" ", statement).strip())
+
+def repeated_statements(statements: List[ProfiledStatement], threshold: int) -> List[Dict[str, Any]]:
+    """
+    Statement shapes run at least `threshold` times, most frequent first.
+    """
+    groups: Dict[str, List[ProfiledStatement]] = defaultdict(list)
+    for entry in statements:
+        groups[statement_shape(entry.statement)].append(entry)
+    repeated = [
+        {"statement": shape, "count": len(entries), "total_ms": sum(e.seconds for e in entries) * 1000}
+        for shape, entries in groups.items() if len(entries) >= threshold
+    ]
+    return sorted(repeated, key=lambda r: -r["count"])
+
+def summary_header(profile_id: str, stats: RequestDBStats) -> str:
+    statements = stats.profile
+    repeated = repeated_statements(statements, settings.SQL_PROFILER_REPEAT_THRESHOLD)
+    sql_ms = sum(e.seconds for e in statements) * 1000
+    return f"id={profile_id}; statements={len(statements)}; sql_ms={sql_ms:.1f}; repeated={len(repeated)}"
+
+def _should_profile(scope: Scope) -> bool:
+    if settings.SQL_PROFILER == "all":
+        return True
+    if settings.SQL_PROFILER == "header":
+        return any(name == REQUEST_HEADER.encode() and value not in (b"", b"0")
+                   for name, value in scope["headers"])
+    return False
+
+class SQLProfilerMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not _should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        # Share the metrics middleware's stats when it runs outside us
+        stats = request_db_stats.get()
+        token = None
+        if stats is None:
+            stats = RequestDBStats()
+            token = request_db_stats.set(stats)
+        stats.profile = []
+        profile_id = uuid.uuid4().hex
+        status = 500
+
+        async def send_with_profile(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message)[PROFILE_HEADER] = summary_header(profile_id, stats)
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            elapsed = time.perf_counter() - started
+            statements, stats.profile = stats.profile, None
+            if token is not None:
+                request_db_stats.reset(token)
+            profiles.set(profile_id, {
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": route_template(scope),
+                "status": status,
+                "duration_ms": elapsed * 1000,
+                "statements": len(statements),
+                "sql_ms": sum(e.seconds for e in statements) * 1000,
+                "repeated": repeated_statements(statements, settings.SQL_PROFILER_REPEAT_THRESHOLD),
+                "queries": [
+                    {"engine": e.engine, "statement": e.statement, "parameters": e.parameters,
+                     "duration_ms": e.seconds * 1000}
+                    for e in statements
+                ],
+            })
+
+def read_profile(request: Request) -> Response:
+    profile = profiles.get(request.path_params["id"]) if settings.SQL_PROFILER != "off" else None
+    if profile is None:
+        return JSONResponse({"detail": "Profile not found"}, status_code=404)
+    return JSONResponse(profile)
@@ -0,0 +1,92 @@
+"""
+Opt-in fast JSON path for list endpoints.
+
+With a `response_model`, FastAPI validates every ORM row into a pydantic model
+(`from_attributes`) and then serializes that model, so a large page pays for
+two full passes. Rows loaded from our own database are already well typed, so
+list endpoints can instead read just the schema's fields off each row with a
+per-schema extractor built once, and hand plain dicts to orjson. Endpoints
+keep their `response_model` for the OpenAPI schema; returning a
+FastJSONResponse skips FastAPI's validation of it.
+
+Only use this for data the schema would accept unchanged (ORM rows, not user
+input): nothing is validated or coerced on the way out.
+"""
+import types
+import typing
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Type
+
+import orjson
+from pydantic import BaseModel
+from starlette.background import BackgroundTask
+from starlette.responses import Response
+
+Extractor = Callable[[Any], Dict[str, Any]]
+
+class FastJSONResponse(Response):
+    """
+    JSON response rendered by orjson (datetimes, enums and int keys included).
+    """
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: Any,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        background: Optional[BackgroundTask] = None,
+    ) -> None:
+        super().__init__(content, status_code, headers, self.media_type, background)
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+@lru_cache(maxsize=None)
+def extractor(schema: Type[BaseModel]) -> Extractor:
+    """
+    Function turning an object with `schema`'s attributes into a dict of
+    exactly those fields, recursing into nested schemas.
+    """
+    fields = []
+    for name, field in schema.model_fields.items():
+        default = None if field.is_required() else field.get_default(call_default_factory=True)
+        fields.append((name, default, _value_converter(field.annotation)))
+
+    def extract(obj: Any) -> Dict[str, Any]:
+        # Loaded ORM attributes live in the instance dict; reading them there
+        # skips the instrumented descriptor. Anything else (unloaded, computed)
+        # goes through getattr.
+        loaded = getattr(obj, "__dict__", {})
+        data = {}
+        for name, default, convert in fields:
+            value = loaded[name] if name in loaded else getattr(obj, name, default)
+            data[name] = value if convert is None or value is None else convert(value)
+        return data
+
+    return extract
+
+def dump_many(schema: Type[BaseModel], rows: Iterable[Any]) -> List[Dict[str, Any]]:
+    extract = extractor(schema)
+    return [extract(row) for row in rows]
+
+def _value_converter(annotation: Any) -> Optional[Callable[[Any], Any]]:
+    """
+    Converter for nested schemas (`Schema`, `Optional[Schema]`, `List[Schema]`);
+    None for scalars, which orjson serializes as they are.
+    """
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return extractor(annotation)
+    origin = typing.get_origin(annotation)
+    arguments = [a for a in typing.get_args(annotation) if a is not type(None)]
+    if origin in (list, List) and arguments:
+        convert = _value_converter(arguments[0])
+        if convert is not None:
+            return lambda values: [convert(v) for v in values]
+        return None
+    if origin in (typing.Union, types.UnionType) and len(arguments) == 1:
+        return _value_converter(arguments[0])
+    return None
@@ -14,17 +14,140 @@ class Settings(BaseSettings):
     
     SQLALCHEMY_DATABASE_URI: str | None = None
 
+    # Connection pool, per worker process. "pgbouncer" mode is for PgBouncer
+    # in transaction mode: no client-side pool (NullPool) and no named
+    # prepared statements reused across transactions.
+    DB_POOL_MODE: str = "queue"
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800  # seconds; -1 keeps connections indefinitely
+    # A round trip on every checkout. Recycling already retires connections
+    # before server-side idle timeouts, and a connection dropped anyway fails
+    # one request and invalidates the pool, so this is off by default.
+    DB_POOL_PRE_PING: bool = False
+    # anyio threads running sync endpoints; default DB_POOL_SIZE + DB_MAX_OVERFLOW
+    # so a request never holds a thread while queueing for a connection
+    THREADPOOL_SIZE: int | None = None
+    # Workers per host and the database's connection limit, for the startup
+    # check that WEB_CONCURRENCY * (DB_POOL_SIZE + DB_MAX_OVERFLOW) fits
+    WEB_CONCURRENCY: int = 1
+    DB_MAX_CONNECTIONS: int | None = None
+
+    # Read replicas for GET endpoints, as a JSON list in the environment.
+    # A user's own reads stay on the primary for REPLICA_PIN_SECONDS after
+    # they write; replicas further behind than REPLICA_MAX_LAG_SECONDS or
+    # failing the check every REPLICA_CHECK_INTERVAL seconds are skipped.
+    SQLALCHEMY_REPLICA_URIS: list[str] = []
+    REPLICA_PIN_SECONDS: float = 5
+    REPLICA_PIN_CACHE_SIZE: int = 100000
+    REPLICA_CHECK_INTERVAL: float = 5
+    REPLICA_MAX_LAG_SECONDS: float = 5
+
+    # Async mode: serve the API from an asyncio engine instead of the threadpool
+    ASYNC_DB: bool = False
+    SQLALCHEMY_ASYNC_DATABASE_URI: str | None = None
+
+    # Memoized issue-list totals (per process; the TTL bounds staleness from other workers)
+    ISSUE_COUNT_CACHE_SIZE: int = 10000
+    ISSUE_COUNT_CACHE_TTL: int = 60
+
+    # Project membership cache (per process)
+    MEMBERSHIP_CACHE_SIZE: int = 10000
+    MEMBERSHIP_CACHE_TTL: int = 60
+
+    # /sync change log. Cursors stop short of sequence gaps younger than
+    # SYNC_SETTLE_SECONDS, which may belong to transactions not yet committed;
+    # compaction only touches entries older than SYNC_COMPACT_AFTER seconds.
+    SYNC_SETTLE_SECONDS: float = 5
+    SYNC_COMPACT_AFTER: int = 3600
+
+    # Background jobs (app/db/jobs.py). Run by JOBS_WORKERS threads in each
+    # API process unless JOBS_IN_PROCESS is off, or by `python -m app.worker`.
+    # Failed jobs are retried after JOBS_RETRY_BASE * 2^(attempt - 1) seconds,
+    # at most JOBS_RETRY_MAX, until JOBS_MAX_ATTEMPTS; a claimed job whose
+    # worker died is picked up again after JOBS_LEASE_SECONDS.
+    JOBS_IN_PROCESS: bool = True
+    JOBS_WORKERS: int = 2
+    JOBS_POLL_INTERVAL: float = 1
+    JOBS_MAX_ATTEMPTS: int = 5
+    JOBS_RETRY_BASE: float = 2
+    JOBS_RETRY_MAX: float = 600
+    JOBS_LEASE_SECONDS: float = 300
+
+    # Prometheus metrics on /metrics (per process), answered only to clients
+    # in these networks (loopback and private ranges by default; an empty
+    # list allows everyone). Behind a proxy the client is the proxy.
+    METRICS_ENABLED: bool = True
+    METRICS_ALLOWED_NETWORKS: list[str] = [
+        "127.0.0.0/8", "::1/128", "10.0.0.0/8", "172.16.0.0/12", "192.168.0.0/16",
+    ]
+    # Statements at least this slow are logged (0 disables)
+    SLOW_QUERY_MS: float = 200
+    # Per-request SQL profiles: "off", "header" (requests sending X-Debug-SQL)
+    # or "all". Profiles hold statement text, so keep this off where clients
+    # are untrusted. Kept for SQL_PROFILER_TTL seconds and served to global
+    # maintainers on /debug/requests/{id}, mounted unless this starts "off".
+    SQL_PROFILER: str = "off"
+    SQL_PROFILER_REPEAT_THRESHOLD: int = 3  # identical statements per request flagged as N+1
+    SQL_PROFILER_KEEP: int = 500
+    SQL_PROFILER_TTL: int = 600
+
+    # Server-sent event streams. "memory" serves one worker; with several,
+    # run `python -m app.core.event_broker` and use "broker" so every worker
+    # sees every event. Per topic the last EVENTS_REPLAY events are kept for
+    # clients resuming with Last-Event-ID, for at most EVENTS_MAX_TOPICS topics.
+    EVENTS_BACKEND: str = "memory"
+    EVENTS_BROKER_URL: str = "tcp://127.0.0.1:8766"
+    EVENTS_CLIENT_BUFFER: int = 256  # events a slow client may fall behind before it is dropped
+    EVENTS_REPLAY: int = 100
+    EVENTS_MAX_TOPICS: int = 10000
+    EVENTS_KEEPALIVE: float = 15  # seconds between comment lines on an idle stream
+
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-super-secret-key-change-this-in-prod")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Put id and role in access tokens so requests can skip the User lookup.
+    # Changing or deleting a user makes this worker check the row again; other
+    # workers keep trusting the claim until the token expires.
+    TOKEN_EMBED_PRINCIPAL: bool = True
+    # Password hashing runs on its own executor ("thread" or "process") so a
+    # login burst cannot take the request threads; beyond MAX_PENDING running
+    # or queued hashes /auth answers 503.
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    # Verified token -> principal cache (entries never outlive the token)
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL: int = 300
 
     def __init__(self, **values):
         super().__init__(**values)
         if not self.SQLALCHEMY_DATABASE_URI:
             self.SQLALCHEMY_DATABASE_URI = f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+        if not self.SQLALCHEMY_ASYNC_DATABASE_URI:
+            self.SQLALCHEMY_ASYNC_DATABASE_URI = get_async_database_uri(self.SQLALCHEMY_DATABASE_URI)
 
     class Config:
         case_sensitive = True
 
+# Sync driver prefix -> asyncio driver prefix
+ASYNC_DRIVERS = {
+    "postgresql+psycopg2://": "postgresql+asyncpg://",
+    "postgresql://": "postgresql+asyncpg://",
+    "sqlite+pysqlite://": "sqlite+aiosqlite://",
+    "sqlite://": "sqlite+aiosqlite://",
+}
+
+def get_async_database_uri(uri: str) -> str:
+    """
+    Map a sync database URI onto the matching asyncio driver.
+    """
+    for sync_prefix, async_prefix in ASYNC_DRIVERS.items():
+        if uri.startswith(sync_prefix):
+            return async_prefix + uri[len(sync_prefix):]
+    return uri
+
 settings = Settings()
@@ -0,0 +1,78 @@
+"""
+Event broker for several workers (EVENTS_BACKEND=broker).
+
+Workers connect over TCP and send events as JSON lines; the broker numbers
+each one and sends it to every connected worker, the sender included, so all
+workers deliver the same events under the same ids. It keeps no history: it
+is a local stand-in for a real message bus, and restarting it restarts the
+ids (clients resuming across the restart get a `reset`).
+
+    PYTHONPATH=. python -m app.core.event_broker --port 8766
+"""
+import argparse
+import asyncio
+import json
+import logging
+from typing import Set
+
+logger = logging.getLogger(__name__)
+
+class EventBroker:
+    def __init__(self):
+        self.last_id = 0
+        self._workers: Set[asyncio.StreamWriter] = set()
+        self._server = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8766) -> int:
+        """
+        Start listening; returns the bound port (useful with port 0).
+        """
+        self._server = await asyncio.start_server(self._serve, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        self._server.close()
+        for writer in list(self._workers):
+            writer.close()
+        await self._server.wait_closed()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._workers.add(writer)
+        # Tells the worker it will see every event from here on
+        writer.write(json.dumps({"last_id": self.last_id}).encode() + b"\n")
+        try:
+            async for line in reader:
+                message = json.loads(line)
+                self.last_id += 1
+                message["id"] = self.last_id
+                self._broadcast(json.dumps(message).encode() + b"\n")
+        except (ConnectionError, ValueError) as exc:
+            logger.warning("dropping worker connection: %s", exc)
+        finally:
+            self._workers.discard(writer)
+            writer.close()
+
+    def _broadcast(self, line: bytes) -> None:
+        for writer in list(self._workers):
+            if writer.is_closing():
+                self._workers.discard(writer)
+            else:
+                writer.write(line)
+
+async def _main(host: str, port: int) -> None:
+    broker = EventBroker()
+    port = await broker.start(host, port)
+    logger.info("event broker listening on %s:%d", host, port)
+    await broker.serve_forever()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fan events out to every API worker.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(args.host, args.port))
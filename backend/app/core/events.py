@@ -0,0 +1,290 @@
+"""
+Pub/sub hub behind the server-sent event streams.
+
+Publishers (any thread) hand events for one or more topics to the hub's
+backend, which numbers them and delivers them back to every hub it serves:
+
+- MemoryBackend: this process only (a single worker).
+- BrokerBackend: several workers connected to app.core.event_broker, which
+  numbers events globally so Last-Event-ID means the same on every worker.
+
+Each hub keeps the last EVENTS_REPLAY events per topic. A subscriber resuming
+from a Last-Event-ID gets the newer retained events first, or a `reset` event
+when some may have been lost, after which it should refetch. Subscribers have
+a bounded buffer; one that falls EVENTS_CLIENT_BUFFER events behind is closed
+(SubscriptionOverflow) and can reconnect to resume from the replay history.
+"""
+import asyncio
+import json
+import logging
+import socket
+import threading
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+RESET = "reset"
+
+class Event(NamedTuple):
+    id: int
+    topics: Tuple[str, ...]
+    type: str
+    data: str  # JSON
+
+    def encode(self) -> bytes:
+        """
+        The event as a server-sent events frame.
+        """
+        return f"id: {self.id}\nevent: {self.type}\ndata: {self.data}\n\n".encode()
+
+class SubscriptionOverflow(Exception):
+    """
+    The subscriber fell too far behind and was dropped.
+    """
+
+class Subscription:
+    """
+    One client's view of some topics. Lives on the event loop that created
+    it; the hub hands it events through that loop.
+    """
+
+    def __init__(self, topics: Tuple[str, ...], loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.topics = topics
+        self.loop = loop
+        self.maxsize = maxsize
+        self.overflowed = False
+        self._buffer: Deque[Event] = deque()
+        self._ready = asyncio.Event()
+
+    def offer(self, event: Event) -> None:
+        if self.overflowed:
+            return
+        if len(self._buffer) >= self.maxsize:
+            self.overflowed = True
+        else:
+            self._buffer.append(event)
+        self._ready.set()
+
+    async def next(self, timeout: float) -> Optional[Event]:
+        """
+        Next event, or None when nothing arrived within `timeout` seconds.
+        Buffered events are still handed out before SubscriptionOverflow.
+        """
+        if not self._buffer and not self.overflowed:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if self._buffer:
+            return self._buffer.popleft()
+        raise SubscriptionOverflow()
+
+class MemoryBackend:
+    def __init__(self):
+        self._deliver: Optional[Callable[[Event], None]] = None
+        self._lock = threading.Lock()
+        self._last_id = 0
+
+    def attach(self, deliver: Callable[[Event], None]) -> None:
+        self._deliver = deliver
+
+    def publish(self, topics: Tuple[str, ...], type: str, data: str) -> None:
+        # Numbering and delivery under one lock keep ids in delivery order
+        with self._lock:
+            self._last_id += 1
+            self._deliver(Event(self._last_id, topics, type, data))
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+class BrokerBackend:
+    """
+    Connection to app.core.event_broker. Events are sent and received as JSON
+    lines on a plain socket; a reader thread reconnects after failures, and
+    events published while disconnected are dropped (subscribers resuming
+    across the gap get a `reset`).
+    """
+
+    def __init__(self, url: str):
+        host, _, port = url.removeprefix("tcp://").rpartition(":")
+        self.address = (host or "127.0.0.1", int(port))
+        self._deliver: Optional[Callable[[Event], None]] = None
+        self._socket: Optional[socket.socket] = None
+        self._send_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._connected = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def attach(self, deliver: Callable[[Event], None]) -> None:
+        self._deliver = deliver
+
+    def publish(self, topics: Tuple[str, ...], type: str, data: str) -> None:
+        line = json.dumps({"topics": topics, "type": type, "data": data}).encode() + b"\n"
+        with self._send_lock:
+            if self._socket is None:
+                logger.warning("event broker unavailable, dropping %s event", type)
+                return
+            try:
+                self._socket.sendall(line)
+            except OSError as exc:
+                logger.warning("event broker send failed (%s), dropping %s event", exc, type)
+
+    def start(self, timeout: float = 5) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="event-broker", daemon=True)
+        self._thread.start()
+        if not self._connected.wait(timeout):
+            logger.warning("event broker at %s:%d not reachable yet", *self.address)
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._send_lock:
+            if self._socket is not None:
+                self._socket.shutdown(socket.SHUT_RDWR)
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        delay = 0.1
+        while not self._stop.is_set():
+            try:
+                conn = socket.create_connection(self.address)
+            except OSError:
+                self._stop.wait(delay)
+                delay = min(delay * 2, 5)
+                continue
+            delay = 0.1
+            with self._send_lock:
+                self._socket = conn
+            try:
+                lines = conn.makefile("rb")
+                # The broker's hello: from here on it sends us every event
+                json.loads(lines.readline())
+                self._connected.set()
+                for line in lines:
+                    message = json.loads(line)
+                    self._deliver(Event(message["id"], tuple(message["topics"]), message["type"], message["data"]))
+            except (OSError, ValueError) as exc:
+                if not self._stop.is_set():
+                    logger.warning("event broker connection lost: %s", exc)
+            finally:
+                with self._send_lock:
+                    self._socket = None
+                self._connected.clear()
+                conn.close()
+
+class EventHub:
+    def __init__(
+        self,
+        backend=None,
+        replay: int = settings.EVENTS_REPLAY,
+        max_topics: int = settings.EVENTS_MAX_TOPICS,
+        client_buffer: int = settings.EVENTS_CLIENT_BUFFER,
+    ):
+        self.backend = backend or MemoryBackend()
+        self.backend.attach(self.deliver)
+        self.replay = replay
+        self.max_topics = max_topics
+        self.client_buffer = client_buffer
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._history: "OrderedDict[str, Deque[Event]]" = OrderedDict()
+        # Newest id no longer retained for a topic; `_floor` covers topics
+        # forgotten altogether and everything before this hub's first event
+        self._dropped: Dict[str, int] = {}
+        self._floor: Optional[int] = None
+        self.last_id = 0
+
+    def publish(self, topics: Iterable[str], type: str, data: str) -> None:
+        self.backend.publish(tuple(topics), type, data)
+
+    def deliver(self, event: Event) -> None:
+        with self._lock:
+            if self._floor is None:
+                self._floor = event.id - 1
+            self.last_id = max(self.last_id, event.id)
+            receivers: Set[Subscription] = set()
+            for topic in event.topics:
+                self._remember(topic, event)
+                receivers.update(self._subscribers.get(topic, ()))
+        for subscription in receivers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+            except RuntimeError:  # its event loop is gone
+                self.unsubscribe(subscription)
+
+    def _remember(self, topic: str, event: Event) -> None:
+        history = self._history.get(topic)
+        if history is None:
+            history = self._history[topic] = deque()
+            # Events of the topic up to the floor may have been forgotten with it
+            self._dropped[topic] = self._floor
+        self._history.move_to_end(topic)
+        if len(history) >= self.replay:
+            self._dropped[topic] = history.popleft().id
+        history.append(event)
+        while len(self._history) > self.max_topics:
+            forgotten, old = self._history.popitem(last=False)
+            self._floor = max(self._floor, old[-1].id)
+            self._dropped.pop(forgotten, None)
+
+    def subscribe(self, topics: Iterable[str], last_event_id: Optional[int] = None) -> Subscription:
+        """
+        Subscribe the running event loop to `topics`, replaying what followed
+        `last_event_id` when given.
+        """
+        topics = tuple(topics)
+        subscription = Subscription(topics, asyncio.get_running_loop(), self.client_buffer)
+        with self._lock:
+            for topic in topics:
+                self._subscribers.setdefault(topic, set()).add(subscription)
+            if last_event_id is not None:
+                for event in self._replay(topics, last_event_id):
+                    subscription.offer(event)
+        return subscription
+
+    def _replay(self, topics: Tuple[str, ...], last_event_id: int) -> List[Event]:
+        missed: Dict[int, Event] = {}
+        for topic in topics:
+            history = self._history.get(topic)
+            floor = self._dropped.get(topic, 0) if history is not None else (self._floor or 0)
+            if last_event_id < floor:
+                return [Event(self.last_id, topics, RESET, "{}")]
+            for event in history or ():
+                if event.id > last_event_id:
+                    missed[event.id] = event
+        return [missed[i] for i in sorted(missed)]
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            for topic in subscription.topics:
+                subscribers = self._subscribers.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[topic]
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len({s for subscribers in self._subscribers.values() for s in subscribers})
+
+    def start(self) -> None:
+        self.backend.start()
+
+    def stop(self) -> None:
+        self.backend.stop()
+
+def _backend_from_settings():
+    if settings.EVENTS_BACKEND == "broker":
+        return BrokerBackend(settings.EVENTS_BROKER_URL)
+    return MemoryBackend()
+
+hub = EventHub(_backend_from_settings())
@@ -1,18 +1,42 @@
+import asyncio
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, Dict, Optional, Tuple, Union
 from jose import jwt
 from passlib.context import CryptContext
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min == max == default, so hashes made with any other cost are flagged by
+# verify_and_update and rehashed on the next successful login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
 
-def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None) -> str:
+class PasswordHashingBusy(Exception):
+    """
+    More hashes are running or queued than PASSWORD_HASH_MAX_PENDING allows.
+    """
+
+_hash_executor: Optional[Executor] = None
+_hash_executor_lock = threading.Lock()
+_hash_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_MAX_PENDING)
+
+def create_access_token(
+    subject: Union[str, Any],
+    expires_delta: timedelta = None,
+    claims: Optional[Dict[str, Any]] = None,
+) -> str:
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {**(claims or {}), "exp": expire, "sub": str(subject)}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -21,3 +45,48 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+def _get_hash_executor() -> Executor:
+    global _hash_executor
+    with _hash_executor_lock:
+        if _hash_executor is None:
+            if settings.PASSWORD_HASH_EXECUTOR == "process":
+                _hash_executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+            else:
+                _hash_executor = ThreadPoolExecutor(
+                    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+                )
+        return _hash_executor
+
+def _verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+async def _run_hashing(fn, *args) -> Any:
+    """
+    Run a bcrypt call on the dedicated executor without blocking the caller.
+
+    Requests beyond PASSWORD_HASH_MAX_PENDING fail fast with
+    PasswordHashingBusy instead of piling up behind a login storm.
+    """
+    slots = _hash_slots
+    if not slots.acquire(blocking=False):
+        raise PasswordHashingBusy()
+    try:
+        future = _get_hash_executor().submit(fn, *args)
+    except BaseException:
+        slots.release()
+        raise
+    # Free the slot when the hash is done, not when the caller stops waiting:
+    # a cancelled request leaves its bcrypt call running on the executor
+    future.add_done_callback(lambda _: slots.release())
+    return await asyncio.wrap_future(future)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify off the event loop. Returns (verified, new_hash); new_hash is set
+    when the stored hash used another cost and should be replaced.
+    """
+    return await _run_hashing(_verify_and_update, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_hashing(get_password_hash, password)
@@ -0,0 +1,147 @@
+"""
+Maintenance of the change log (ChangeLog) behind /sync.
+
+Every flush that inserts, updates or deletes projects, memberships, issues or
+comments through the ORM appends one entry per row, with one INSERT on the
+same connection, so entries commit or roll back with the change. A comment's
+project comes from an issue written in the same flush, or else from its issue
+inside that INSERT; deleted comments whose issue is already gone are not
+logged. A new comment also logs its issue, whose comment_count it changed.
+
+Settings are read when used, not at import: app.models imports this module,
+and scripts such as the benchmark suite configure the environment after
+importing models.
+
+Entry ids come from the table's sequence, which concurrent transactions can
+commit out of order: an id may become visible after a higher one was already
+read. `safe_watermark` is the highest id a cursor may advance to: it stops
+before the first gap followed by an entry younger than SYNC_SETTLE_SECONDS.
+An older gap is taken to be a rolled-back transaction.
+
+`compact_changelog` deletes entries older than SYNC_COMPACT_AFTER that are
+superseded by a newer entry for the same row; every row keeps its latest
+entry, so a sync from any cursor still sees it:
+
+    PYTHONPATH=. python -m app.db.changelog [--older-than SECONDS]
+"""
+import argparse
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import bindparam, delete, event, exists, func, insert, select
+from sqlalchemy.orm import Session, aliased
+
+from app.models.change_log import ChangeLog
+from app.models.comment import Comment
+from app.models.issue import Issue
+from app.models.project import Project, ProjectMember
+
+# Model -> entity name in the log
+ENTITIES = {Project: "project", ProjectMember: "member", Issue: "issue", Comment: "comment"}
+
+def _entry(obj, issue_projects: Dict[int, int]) -> Optional[dict]:
+    entity = ENTITIES.get(type(obj))
+    if entity is None:
+        return None
+    if isinstance(obj, Comment):
+        return {
+            "entity": entity, "entity_id": obj.id,
+            "known_project_id": issue_projects.get(obj.issue_id), "issue_id": obj.issue_id,
+        }
+    project_id = obj.id if isinstance(obj, Project) else obj.project_id
+    return {"entity": entity, "entity_id": obj.id, "known_project_id": project_id, "issue_id": None}
+
+@event.listens_for(Session, "after_flush")
+def _append_changes(session: Session, flush_context) -> None:
+    changed = [*session.new, *session.deleted]
+    changed += [
+        obj for obj in session.dirty
+        if type(obj) in ENTITIES and session.is_modified(obj, include_collections=False)
+    ]
+    # Issues written in this flush, deleted ones included, know their project
+    issue_projects = {obj.id: obj.project_id for obj in changed if isinstance(obj, Issue)}
+    # A deleted comment's issue may be gone already; look those up now and
+    # skip comments whose issue no longer exists (its own entry covers them)
+    orphaned = {
+        obj.issue_id for obj in session.deleted
+        if isinstance(obj, Comment) and obj.issue_id not in issue_projects
+    }
+    if orphaned:
+        issue_projects.update(session.connection().execute(
+            select(Issue.id, Issue.project_id).where(Issue.id.in_(orphaned))
+        ).all())
+    gone = orphaned - issue_projects.keys()
+    entries = [
+        entry for entry in (_entry(obj, issue_projects) for obj in changed)
+        if entry is not None and entry["issue_id"] not in gone
+    ]
+    # New comments also change their issue's comment_count
+    entries += [
+        {"entity": "issue", "entity_id": issue_id, "known_project_id": issue_projects.get(issue_id), "issue_id": issue_id}
+        for issue_id in sorted({obj.issue_id for obj in session.new if isinstance(obj, Comment)})
+    ]
+    if not entries:
+        return
+    now = datetime.now(timezone.utc)
+    for entry in entries:
+        entry["changed_at"] = now
+    issue_project = select(Issue.project_id).where(Issue.id == bindparam("issue_id")).scalar_subquery()
+    statement = insert(ChangeLog.__table__).values(
+        project_id=func.coalesce(bindparam("known_project_id"), issue_project)
+    )
+    session.connection().execute(statement, entries)
+
+def safe_watermark(db: Session, now: Optional[datetime] = None) -> int:
+    """
+    Highest change log id no later-committing transaction can fall under.
+    """
+    from app.core.config import settings
+
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+    recent = [i for (i,) in db.query(ChangeLog.id).filter(ChangeLog.changed_at >= cutoff).order_by(ChangeLog.id)]
+    if not recent:
+        return db.query(func.max(ChangeLog.id)).scalar() or 0
+    previous = db.query(func.max(ChangeLog.id)).filter(ChangeLog.id < recent[0]).scalar()
+    watermark = recent[0] - 1 if previous is None else previous
+    for id in recent:
+        if id != watermark + 1:
+            break
+        watermark = id
+    return watermark
+
+def compact_changelog(db: Session, older_than: Optional[float] = None) -> int:
+    """
+    Delete superseded entries older than `older_than` seconds (default
+    SYNC_COMPACT_AFTER); returns how many. The caller commits.
+    """
+    if older_than is None:
+        from app.core.config import settings
+        older_than = settings.SYNC_COMPACT_AFTER
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=older_than)
+    newer = aliased(ChangeLog)
+    superseded = exists().where(
+        newer.entity == ChangeLog.entity,
+        newer.entity_id == ChangeLog.entity_id,
+        newer.id > ChangeLog.id,
+    )
+    result = db.execute(
+        delete(ChangeLog).where(ChangeLog.changed_at < cutoff, superseded),
+        execution_options={"synchronize_session": False},
+    )
+    return result.rowcount
+
+def main() -> None:
+    from app.core.config import settings
+    from app.db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Drop superseded change log entries.")
+    parser.add_argument("--older-than", type=float, default=settings.SYNC_COMPACT_AFTER,
+                        help="only entries at least this many seconds old")
+    args = parser.parse_args()
+    with SessionLocal() as db:
+        removed = compact_changelog(db, args.older_than)
+        db.commit()
+    print(f"removed {removed} change log entries")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Engine and pool hooks feeding the /metrics endpoint (app.core.metrics).
+
+`instrument_engine` counts statements and their time on an engine, both in
+total and for the request in progress (see app.api.metrics), and reports the
+engine's pool size, checked-out and overflow connections at scrape time.
+`timed_pool_class` is passed as `poolclass` to time how long checkouts wait
+for a connection, which is where an undersized pool shows up first.
+
+Statements slower than SLOW_QUERY_MS are logged, and requests being profiled
+(app.api.profiler) get every statement recorded with its parameter shape.
+"""
+import logging
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import QueuePool
+
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class ProfiledStatement(NamedTuple):
+    engine: str
+    statement: str
+    parameters: str  # shape only (types, row count), never the values
+    seconds: float
+
+class RequestDBStats:
+    """
+    Statements and SQL time of one request; the middleware sets a fresh one in
+    `request_db_stats` and the threadpool and greenlets share it by context.
+    `profile` collects the statements themselves when the request is profiled.
+    """
+    __slots__ = ("statements", "seconds", "profile")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+        self.profile: Optional[List[ProfiledStatement]] = None
+
+request_db_stats: ContextVar[Optional[RequestDBStats]] = ContextVar("request_db_stats", default=None)
+
+_engines: Dict[str, Engine] = {}
+
+def _pool_values(read) -> Dict[tuple, float]:
+    return {
+        (name,): read(engine.pool) for name, engine in _engines.items() if isinstance(engine.pool, QueuePool)
+    }
+
+statements_total = metrics.counter("db_statements_total", "SQL statements executed.", ["engine"])
+statement_seconds_total = metrics.counter(
+    "db_statement_seconds_total", "Time spent executing SQL statements.", ["engine"]
+)
+pool_checkout_seconds = metrics.histogram(
+    "db_pool_checkout_seconds", "Time waited for a pooled connection.", ["engine"]
+)
+metrics.gauge("db_pool_size", "Configured pool size.", ["engine"],
+              callback=lambda: _pool_values(lambda pool: pool.size()))
+metrics.gauge("db_pool_checked_out", "Connections currently checked out.", ["engine"],
+              callback=lambda: _pool_values(lambda pool: pool.checkedout()))
+metrics.gauge("db_pool_overflow", "Connections open beyond the pool size.", ["engine"],
+              callback=lambda: _pool_values(lambda pool: max(pool.overflow(), 0)))
+
+def _shape(parameters: Any) -> str:
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(v).__name__ for v in parameters) + ")"
+    return type(parameters).__name__
+
+def parameters_shape(parameters: Any, executemany: bool) -> str:
+    if executemany:
+        return f"{len(parameters)} x {_shape(parameters[0]) if parameters else '()'}"
+    return _shape(parameters)
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    _engines[name] = engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info["metrics_started"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finish(conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - conn.info.pop("metrics_started", time.perf_counter())
+        statements_total.inc(name)
+        statement_seconds_total.inc(name, amount=elapsed)
+        stats = request_db_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.seconds += elapsed
+            if stats.profile is not None:
+                stats.profile.append(
+                    ProfiledStatement(name, statement, parameters_shape(parameters, executemany), elapsed)
+                )
+        if settings.SLOW_QUERY_MS and elapsed * 1000 >= settings.SLOW_QUERY_MS:
+            logger.warning(
+                "slow query on %s (%.1f ms, parameters %s): %s",
+                name, elapsed * 1000, parameters_shape(parameters, executemany), statement,
+            )
+
+@lru_cache(maxsize=None)
+def _timed(base: type, name: str) -> type:
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return base._do_get(self)
+        finally:
+            pool_checkout_seconds.observe(time.perf_counter() - started, name)
+
+    return type(f"Timed{base.__name__}", (base,), {"_do_get": _do_get})
+
+def timed_pool_class(url: str, name: str, base: Optional[type] = None) -> type:
+    """
+    `base` (default: the pool class SQLAlchemy would pick for `url`), timing
+    checkouts.
+    """
+    if base is None:
+        url = make_url(url)
+        base = url.get_dialect().get_pool_class(url)
+    return _timed(base, name)
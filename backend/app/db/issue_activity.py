@@ -0,0 +1,88 @@
+"""
+Maintenance of the issue activity columns (Issue.comment_count and
+Issue.last_activity_at).
+
+Issue edits move last_activity_at through its onupdate. Every flush that adds
+or deletes comments through the ORM adjusts the count (and, for additions,
+the activity time) of their issues with one UPDATE on the same connection,
+so the columns commit or roll back with the comments. updated_at keeps
+meaning "the issue itself was edited". `rebuild_issue_activity` recomputes
+both columns from the comment table:
+
+    PYTHONPATH=. python -m app.db.issue_activity
+"""
+import argparse
+from collections import Counter
+from typing import Iterable, Optional
+
+from sqlalchemy import bindparam, event, func, select, update
+from sqlalchemy.orm import Session
+
+from app.models.comment import Comment
+from app.models.issue import Issue, utcnow
+
+@event.listens_for(Session, "after_flush")
+def _apply_comment_deltas(session: Session, flush_context) -> None:
+    added = Counter(c.issue_id for c in session.new if isinstance(c, Comment))
+    deleted = Counter(c.issue_id for c in session.deleted if isinstance(c, Comment))
+    if not added and not deleted:
+        return
+    table = Issue.__table__
+    count = table.c.comment_count + bindparam("delta")
+    for deltas, sign, values in (
+        (added, 1, {"comment_count": count, "last_activity_at": utcnow()}),
+        (deleted, -1, {"comment_count": count, "last_activity_at": table.c.last_activity_at}),
+    ):
+        if deltas:
+            statement = (
+                update(table)
+                .where(table.c.id == bindparam("issue"))
+                # A comment is activity, not an edit of the issue
+                .values(updated_at=table.c.updated_at, **values)
+            )
+            session.connection().execute(statement, [
+                {"issue": issue_id, "delta": sign * n} for issue_id, n in sorted(deltas.items())
+            ])
+
+def rebuild_issue_activity(db: Session, issue_ids: Optional[Iterable[int]] = None) -> None:
+    """
+    Recompute the activity columns of `issue_ids` (default: all issues) from
+    their comments. The caller commits.
+    """
+    table = Issue.__table__
+    comments = Comment.__table__
+    query = select(
+        table.c.id,
+        func.coalesce(table.c.updated_at, table.c.created_at),
+        select(func.count()).where(comments.c.issue_id == table.c.id).scalar_subquery(),
+        select(func.max(comments.c.created_at)).where(comments.c.issue_id == table.c.id).scalar_subquery(),
+    )
+    if issue_ids is not None:
+        query = query.where(table.c.id.in_(list(issue_ids)))
+    # last_activity_at is written from Python (see Issue) so every row stores
+    # it in the format cursors bind
+    rows = [
+        {"issue": id, "count": count, "active": max(filter(None, (edited, commented)), default=None) or utcnow()}
+        for id, edited, count, commented in db.execute(query)
+    ]
+    if rows:
+        statement = (
+            update(table)
+            .where(table.c.id == bindparam("issue"))
+            .values(comment_count=bindparam("count"), last_activity_at=bindparam("active"), updated_at=table.c.updated_at)
+        )
+        db.connection().execute(statement, rows)
+
+def main() -> None:
+    from app.db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Rebuild issue comment counts and activity times.")
+    parser.add_argument("--issue", type=int, action="append", dest="issue_ids",
+                        help="issue to rebuild (repeatable; default: all)")
+    args = parser.parse_args()
+    with SessionLocal() as db:
+        rebuild_issue_activity(db, args.issue_ids)
+        db.commit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Maintenance of the issuestat counters (IssueStat).
+
+Every flush that inserts, updates or deletes Issue rows through the ORM turns
+their (project, status, priority, assignee) changes into +1/-1 deltas and
+upserts them into issuestat on the same connection, so the counters commit
+or roll back together with the issues. Bulk statements that bypass the unit
+of work are not seen; `rebuild_issue_stats` recomputes the counters from the
+issue table to repair any drift:
+
+    PYTHONPATH=. python -m app.db.issue_stats [--project ID ...]
+"""
+import argparse
+from collections import Counter
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import delete, event, func, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.models.issue import Issue, IssuePriority, IssueStatus
+from app.models.issue_stat import IssueStat
+
+StatKey = Tuple[int, str, str, int]
+
+KEY_ATTRIBUTES = ("project_id", "status", "priority", "assignee_id")
+UNASSIGNED = 0
+
+def _normalize(project_id, status, priority, assignee_id) -> StatKey:
+    status = getattr(status, "value", status) or IssueStatus.OPEN.value
+    priority = getattr(priority, "value", priority) or IssuePriority.MEDIUM.value
+    return project_id, status, priority, assignee_id or UNASSIGNED
+
+def _old_and_new_keys(issue: Issue) -> Tuple[StatKey, StatKey]:
+    state = inspect(issue)
+    old, new = [], []
+    for name in KEY_ATTRIBUTES:
+        history = state.attrs[name].history
+        if history.added or history.deleted:
+            new.append(history.added[0] if history.added else None)
+            old.append(history.deleted[0] if history.deleted else None)
+        else:
+            # Unchanged; loads the value if it was expired
+            value = history.unchanged[0] if history.unchanged else getattr(issue, name)
+            new.append(value)
+            old.append(value)
+    return _normalize(*old), _normalize(*new)
+
+def _upsert(connection: Connection, deltas: Counter) -> None:
+    dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+    table = IssueStat.__table__
+    statement = dialect.insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=list(KEY_ATTRIBUTES),
+        set_={"count": table.c["count"] + statement.excluded["count"]},
+    )
+    connection.execute(statement, [
+        dict(zip(KEY_ATTRIBUTES, key), count=delta) for key, delta in sorted(deltas.items())
+    ])
+
+@event.listens_for(Session, "after_flush")
+def _apply_issue_stat_deltas(session: Session, flush_context) -> None:
+    deltas: Counter = Counter()
+    for issue in session.new:
+        if isinstance(issue, Issue):
+            deltas[_old_and_new_keys(issue)[1]] += 1
+    for issue in session.deleted:
+        if isinstance(issue, Issue):
+            deltas[_old_and_new_keys(issue)[0]] -= 1
+    for issue in session.dirty:
+        if isinstance(issue, Issue) and session.is_modified(issue):
+            old, new = _old_and_new_keys(issue)
+            if old != new:
+                deltas[old] -= 1
+                deltas[new] += 1
+    deltas = Counter({key: delta for key, delta in deltas.items() if delta})
+    if deltas:
+        _upsert(session.connection(), deltas)
+
+def rebuild_issue_stats(db: Session, project_ids: Optional[Iterable[int]] = None) -> None:
+    """
+    Recompute the counters of `project_ids` (default: all projects) from the
+    issue table. The caller commits.
+    """
+    table = IssueStat.__table__
+    clear = delete(table)
+    key = [
+        Issue.project_id,
+        func.coalesce(Issue.status, IssueStatus.OPEN.value),
+        func.coalesce(Issue.priority, IssuePriority.MEDIUM.value),
+        func.coalesce(Issue.assignee_id, UNASSIGNED),
+    ]
+    source = select(*key, func.count()).group_by(*key)
+    if project_ids is not None:
+        project_ids = list(project_ids)
+        clear = clear.where(table.c.project_id.in_(project_ids))
+        source = source.where(Issue.project_id.in_(project_ids))
+    db.execute(clear)
+    db.execute(table.insert().from_select([*KEY_ATTRIBUTES, "count"], source))
+
+def main() -> None:
+    from app.db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Rebuild issuestat counters from the issue table.")
+    parser.add_argument("--project", type=int, action="append", dest="project_ids",
+                        help="project to rebuild (repeatable; default: all)")
+    args = parser.parse_args()
+    with SessionLocal() as db:
+        rebuild_issue_stats(db, args.project_ids)
+        db.commit()
+
+if __name__ == "__main__":
+    main()
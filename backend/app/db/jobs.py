@@ -0,0 +1,213 @@
+"""
+Background jobs for side effects that need not delay the request.
+
+A job is a row in the `job` table, enqueued in the transaction of the write
+that causes it (usually from a flush hook), so it exists exactly when the
+write committed. Committing wakes this process's runner; other workers
+notice within JOBS_POLL_INTERVAL.
+
+Handlers are registered per kind and take a batch of payloads:
+
+    @jobs.handler("notify.comment", batch_size=100)
+    def notify_comment(db: Session, payloads: List[dict]) -> None: ...
+
+The runner claims up to `batch_size` due jobs of one kind at a time
+(FOR UPDATE SKIP LOCKED on Postgres, so workers never share a job), runs the
+handler on a fresh session and deletes the jobs in that same transaction.
+A failing batch is retried with exponential backoff until JOBS_MAX_ATTEMPTS,
+then left with status "failed" and its last error. Handlers should be
+idempotent: a worker that dies mid-batch has its jobs run again once their
+lease expires.
+"""
+import logging
+import threading
+import traceback
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import delete, event, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+class Handler(NamedTuple):
+    run: Callable[[Session, List[Dict[str, Any]]], None]
+    batch_size: int
+
+HANDLERS: Dict[str, Handler] = {}
+
+# Notified after a commit that enqueued jobs; runner threads wait on it
+# between polls. Each commit bumps `_enqueued`, so a thread that notes the
+# count before claiming cannot miss a commit made while it was busy.
+_wakeup = threading.Condition()
+_enqueued = 0
+
+def handler(kind: str, batch_size: int = 1) -> Callable:
+    """
+    Register the decorated function as the handler of `kind` jobs.
+    """
+    def register(run: Callable) -> Callable:
+        HANDLERS[kind] = Handler(run, batch_size)
+        return run
+    return register
+
+def enqueue(session: Session, kind: str, payloads: List[Dict[str, Any]], delay: float = 0) -> None:
+    """
+    Add jobs on the session's transaction. Safe to call from flush hooks.
+    """
+    if not payloads:
+        return
+    now = datetime.now(timezone.utc)
+    run_after = now + timedelta(seconds=delay)
+    session.connection().execute(insert(Job.__table__), [
+        {"kind": kind, "payload": payload, "status": "pending", "attempts": 0,
+         "run_after": run_after, "created_at": now}
+        for payload in payloads
+    ])
+    session.info["jobs_enqueued"] = True
+
+@event.listens_for(Session, "after_commit")
+def _wake_runner(session: Session) -> None:
+    global _enqueued
+    if session.info.pop("jobs_enqueued", False):
+        with _wakeup:
+            _enqueued += 1
+            _wakeup.notify_all()
+
+@event.listens_for(Session, "after_rollback")
+def _forget_jobs(session: Session) -> None:
+    session.info.pop("jobs_enqueued", None)
+
+def retry_delay(attempts: int) -> float:
+    return min(settings.JOBS_RETRY_MAX, settings.JOBS_RETRY_BASE * 2 ** (attempts - 1))
+
+class ClaimedJob(NamedTuple):
+    id: int
+    payload: Dict[str, Any]
+    attempts: int
+
+class JobRunner:
+    def __init__(self, session_factory: Optional[Callable[[], Session]] = None, workers: int = settings.JOBS_WORKERS):
+        if session_factory is None:
+            from app.db.session import SessionLocal as session_factory
+        self.session_factory = session_factory
+        self.workers = workers
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def claim(self) -> Tuple[Optional[str], List[ClaimedJob]]:
+        """
+        Mark the next batch of due jobs of one kind running; (kind, jobs).
+        """
+        now = datetime.now(timezone.utc)
+        due = or_(
+            (Job.status == "pending") & (Job.run_after <= now),
+            (Job.status == "running") & (Job.locked_until < now),
+        )
+        with self.session_factory() as db:
+            kind = db.execute(
+                select(Job.kind).where(due).order_by(Job.run_after, Job.id).limit(1)
+            ).scalar()
+            if kind is None:
+                return None, []
+            batch_size = HANDLERS[kind].batch_size if kind in HANDLERS else 1
+            ids = db.execute(
+                select(Job.id).where(due, Job.kind == kind).order_by(Job.run_after, Job.id)
+                .limit(batch_size).with_for_update(skip_locked=True)
+            ).scalars().all()
+            # The status condition again: without row locks (SQLite) another
+            # worker may have claimed some of them in the meantime
+            claimed = db.execute(
+                update(Job).where(Job.id.in_(ids), due)
+                .values(status="running", attempts=Job.attempts + 1,
+                        locked_until=now + timedelta(seconds=settings.JOBS_LEASE_SECONDS))
+                .returning(Job.id, Job.payload, Job.attempts),
+                execution_options={"synchronize_session": False},
+            ).all()
+            db.commit()
+        return kind, [ClaimedJob(*row) for row in claimed]
+
+    def run_once(self) -> bool:
+        """
+        Claim and run one batch; False when no job was due.
+        """
+        kind, claimed = self.claim()
+        if kind is None:
+            return False
+        if not claimed:
+            return True  # lost the race for this batch; look again
+        ids = [job.id for job in claimed]
+        try:
+            if kind not in HANDLERS:
+                raise LookupError(f"no handler for {kind!r} jobs")
+            with self.session_factory() as db:
+                HANDLERS[kind].run(db, [job.payload for job in claimed])
+                db.execute(delete(Job).where(Job.id.in_(ids)), execution_options={"synchronize_session": False})
+                db.commit()
+        except Exception:
+            error = traceback.format_exc()
+            logger.exception("%s job batch %s failed", kind, ids)
+            self._reschedule(claimed, error)
+        return True
+
+    def _reschedule(self, claimed: List[ClaimedJob], error: str) -> None:
+        now = datetime.now(timezone.utc)
+        with self.session_factory() as db:
+            for job in claimed:
+                if job.attempts >= settings.JOBS_MAX_ATTEMPTS:
+                    values = {"status": "failed"}
+                else:
+                    values = {"status": "pending", "run_after": now + timedelta(seconds=retry_delay(job.attempts))}
+                db.execute(
+                    update(Job).where(Job.id == job.id).values(locked_until=None, last_error=error, **values),
+                    execution_options={"synchronize_session": False},
+                )
+            db.commit()
+
+    def run_pending(self) -> int:
+        """
+        Run batches until no job is due; returns how many batches ran.
+        """
+        batches = 0
+        while self.run_once():
+            batches += 1
+        return batches
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stop.clear()
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"jobs-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        """
+        Stop after the batches being run.
+        """
+        self._stop.set()
+        with _wakeup:
+            _wakeup.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            seen = _enqueued
+            try:
+                busy = self.run_once()
+            except Exception:  # e.g. the database is unreachable; try again later
+                logger.exception("claiming jobs failed")
+                busy = False
+            if not busy:
+                with _wakeup:
+                    _wakeup.wait_for(
+                        lambda: _enqueued != seen or self._stop.is_set(), settings.JOBS_POLL_INTERVAL
+                    )
+
+job_runner = JobRunner()
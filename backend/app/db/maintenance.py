@@ -0,0 +1,44 @@
+"""
+Background jobs that repair derived data (see app/db/jobs.py):
+
+- `issue_stats.rebuild`: recompute the issuestat counters of the payloads'
+  `project_id`s, or of every project when a payload has none.
+- `search.reindex`: rebuild the search index entries of the payloads'
+  `issue_id`s.
+
+Both are normally kept current by the writes themselves; these jobs are for
+drift after bulk changes that bypass the ORM or the triggers.
+"""
+from typing import Any, Dict, List
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+from app.db import jobs
+from app.db.issue_stats import rebuild_issue_stats
+from app.db.search import _FTS_COMMENTS
+
+REINDEX = {
+    "postgresql": [
+        "UPDATE issue SET search_vector = issue_search_document(id, title, description) WHERE id IN :ids",
+    ],
+    "sqlite": [
+        "DELETE FROM issue_fts WHERE rowid IN :ids",
+        "INSERT INTO issue_fts (rowid, title, description, comments) "
+        f"SELECT id, title, description, {_FTS_COMMENTS.format('issue_ids')} "
+        "FROM (SELECT id AS issue_id, id, title, description FROM issue WHERE id IN :ids) AS issue_ids",
+    ],
+}
+
+@jobs.handler("issue_stats.rebuild", batch_size=100)
+def rebuild_issue_stats_job(db: Session, payloads: List[Dict[str, Any]]) -> None:
+    if any(p.get("project_id") is None for p in payloads):
+        rebuild_issue_stats(db)
+    else:
+        rebuild_issue_stats(db, sorted({p["project_id"] for p in payloads}))
+
+@jobs.handler("search.reindex", batch_size=500)
+def reindex_issues(db: Session, payloads: List[Dict[str, Any]]) -> None:
+    ids = sorted({p["issue_id"] for p in payloads})
+    for statement in REINDEX.get(db.get_bind().dialect.name, []):
+        db.execute(text(statement).bindparams(bindparam("ids", expanding=True)), {"ids": ids})
@@ -0,0 +1,159 @@
+"""
+Read-replica routing for read-only endpoints (SQLALCHEMY_REPLICA_URIS).
+
+`deps.get_read_db` asks the module's `replica_set` for a replica and falls
+back to the primary session when there is none to use:
+
+- replicas are used round-robin while healthy. A background thread checks
+  each one every REPLICA_CHECK_INTERVAL seconds (`SELECT 1`, plus replay
+  lag on Postgres), and a disconnect marks a replica down at once.
+- read-your-writes: after a session that knows its user (set by the
+  principal dependencies) commits a flush, that user reads from the primary
+  for REPLICA_PIN_SECONDS. The pin is per process; other workers only see
+  replicas within REPLICA_MAX_LAG_SECONDS of the primary.
+
+Replica sessions refuse to flush.
+"""
+import itertools
+import logging
+import threading
+from typing import List, Optional
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import get_async_database_uri, settings
+from app.db.instrumentation import instrument_engine
+from app.db.session import engine_options
+
+logger = logging.getLogger(__name__)
+
+# Seconds a Postgres standby is behind; 0 when it has replayed all it received
+POSTGRES_LAG = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+class Replica:
+    def __init__(self, name: str, engine: Engine, async_engine: Optional[AsyncEngine] = None):
+        self.name = name
+        self.engine = engine
+        self.async_engine = async_engine
+        self.healthy = True
+
+        @event.listens_for(engine, "handle_error")
+        def _mark_down(context) -> None:
+            if context.is_disconnect:
+                self.mark_down("disconnected")
+
+    def mark_down(self, reason: str) -> None:
+        if self.healthy:
+            logger.warning("replica %s marked down: %s", self.name, reason)
+        self.healthy = False
+
+    def check(self) -> bool:
+        try:
+            with self.engine.connect() as conn:
+                if conn.dialect.name == "postgresql":
+                    lag = conn.execute(POSTGRES_LAG).scalar() or 0
+                else:
+                    conn.execute(text("SELECT 1"))
+                    lag = 0
+        except Exception as exc:  # any failure takes it out of rotation
+            self.mark_down(str(exc).splitlines()[0])
+            return False
+        if lag > settings.REPLICA_MAX_LAG_SECONDS:
+            self.mark_down(f"{lag:.1f}s behind")
+            return False
+        if not self.healthy:
+            logger.info("replica %s back in rotation", self.name)
+        self.healthy = True
+        return True
+
+class ReplicaSet:
+    def __init__(self, replicas: List[Replica]):
+        self.replicas = replicas
+        self._next = itertools.count()
+        self._pins = TTLCache(maxsize=settings.REPLICA_PIN_CACHE_SIZE, ttl=settings.REPLICA_PIN_SECONDS)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_urls(cls, urls: List[str], async_db: bool = False) -> "ReplicaSet":
+        replicas = []
+        for n, url in enumerate(urls):
+            name = f"replica{n}"
+            engine = create_engine(url, **engine_options(url, name))
+            instrument_engine(engine, name)
+            async_engine = None
+            if async_db:
+                async_url = get_async_database_uri(url)
+                async_engine = create_async_engine(async_url, **engine_options(async_url, f"{name}-async"))
+                instrument_engine(async_engine.sync_engine, f"{name}-async")
+            replicas.append(Replica(name, engine, async_engine))
+        return cls(replicas)
+
+    def pin(self, user_id: int) -> None:
+        if self.replicas:
+            self._pins.set(user_id, True)
+
+    def choose(self, user_id: Optional[int] = None) -> Optional[Replica]:
+        """
+        Next healthy replica, or None to read from the primary.
+        """
+        if not self.replicas or (user_id is not None and self._pins.get(user_id)):
+            return None
+        start = next(self._next)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if replica.healthy:
+                return replica
+        return None
+
+    def check(self) -> None:
+        for replica in self.replicas:
+            replica.check()
+
+    def start(self) -> None:
+        """
+        Check the replicas now, then every REPLICA_CHECK_INTERVAL seconds.
+        """
+        if not self.replicas or self._thread is not None:
+            return
+        self.check()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="replica-checks", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(settings.REPLICA_CHECK_INTERVAL):
+            self.check()
+
+replica_set = ReplicaSet.from_urls(settings.SQLALCHEMY_REPLICA_URIS, async_db=settings.ASYNC_DB)
+
+@event.listens_for(Session, "after_flush")
+def _remember_write(session: Session, flush_context) -> None:
+    session.info["wrote"] = True
+
+@event.listens_for(Session, "before_flush")
+def _refuse_replica_writes(session: Session, flush_context, instances) -> None:
+    if "replica" in session.info:
+        raise RuntimeError(f"read-only session on {session.info['replica']} cannot flush")
+
+@event.listens_for(Session, "after_commit")
+def _pin_writer(session: Session) -> None:
+    if session.info.pop("wrote", False) and "user_id" in session.info:
+        replica_set.pin(session.info["user_id"])
+
+@event.listens_for(Session, "after_rollback")
+def _forget_write(session: Session) -> None:
+    session.info.pop("wrote", None)
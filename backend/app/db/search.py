@@ -0,0 +1,168 @@
+"""
+Full-text search index over issue titles, descriptions and comment bodies.
+
+Postgres keeps a weighted `issue.search_vector` tsvector (GIN indexed); SQLite,
+used for tests and development, keeps an FTS5 table keyed by issue id. On both
+the index is maintained by triggers, so every write path, including bulk
+statements that bypass the ORM, updates it incrementally.
+"""
+import re
+from typing import Optional, Tuple
+
+from sqlalchemy import DDL, Float, Integer, event, func, literal_column, text
+from sqlalchemy.orm import Query
+
+from app.models.comment import Comment
+from app.models.issue import Issue
+
+SEARCH_CONFIG = "english"
+
+# Postgres: the document is rebuilt for one issue whenever it or one of its
+# comments changes. Title ranks above description, description above comments.
+POSTGRES_DDL = [
+    f"""
+    CREATE OR REPLACE FUNCTION issue_search_document(issue_id integer, title text, description text)
+    RETURNS tsvector AS $$
+        SELECT setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A')
+            || setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')
+            || setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(
+                (SELECT string_agg(body, ' ') FROM comment WHERE comment.issue_id = $1), '')), 'C')
+    $$ LANGUAGE sql STABLE
+    """,
+    """
+    CREATE OR REPLACE FUNCTION issue_search_vector_trigger() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := issue_search_document(NEW.id, NEW.title, NEW.description);
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER issue_search_vector_update
+    BEFORE INSERT OR UPDATE OF title, description ON issue
+    FOR EACH ROW EXECUTE FUNCTION issue_search_vector_trigger()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION comment_search_vector_trigger() RETURNS trigger AS $$
+    BEGIN
+        UPDATE issue SET search_vector = issue_search_document(id, title, description)
+        WHERE id IN (
+            SELECT issue_id FROM (SELECT NEW.issue_id UNION SELECT OLD.issue_id) AS changed (issue_id)
+            WHERE issue_id IS NOT NULL
+        );
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER comment_search_vector_update
+    AFTER INSERT OR UPDATE OF body, issue_id OR DELETE ON comment
+    FOR EACH ROW EXECUTE FUNCTION comment_search_vector_trigger()
+    """,
+]
+
+POSTGRES_DROP_DDL = [
+    "DROP TRIGGER IF EXISTS comment_search_vector_update ON comment",
+    "DROP FUNCTION IF EXISTS comment_search_vector_trigger()",
+    "DROP TRIGGER IF EXISTS issue_search_vector_update ON issue",
+    "DROP FUNCTION IF EXISTS issue_search_vector_trigger()",
+    "DROP FUNCTION IF EXISTS issue_search_document(integer, text, text)",
+]
+
+_FTS_COMMENTS = "(SELECT group_concat(body, ' ') FROM comment WHERE issue_id = {0}.issue_id)"
+
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS issue_fts
+    USING fts5(title, description, comments, tokenize = 'porter unicode61')
+    """,
+    """
+    CREATE TRIGGER issue_fts_insert AFTER INSERT ON issue BEGIN
+        INSERT INTO issue_fts (rowid, title, description, comments)
+        VALUES (new.id, new.title, new.description, '');
+    END
+    """,
+    """
+    CREATE TRIGGER issue_fts_update AFTER UPDATE OF title, description ON issue BEGIN
+        UPDATE issue_fts SET title = new.title, description = new.description WHERE rowid = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER issue_fts_delete AFTER DELETE ON issue BEGIN
+        DELETE FROM issue_fts WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER comment_fts_insert AFTER INSERT ON comment BEGIN
+        UPDATE issue_fts SET comments = {_FTS_COMMENTS.format("new")} WHERE rowid = new.issue_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER comment_fts_update AFTER UPDATE OF body, issue_id ON comment BEGIN
+        UPDATE issue_fts SET comments = {_FTS_COMMENTS.format("old")} WHERE rowid = old.issue_id;
+        UPDATE issue_fts SET comments = {_FTS_COMMENTS.format("new")} WHERE rowid = new.issue_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER comment_fts_delete AFTER DELETE ON comment BEGIN
+        UPDATE issue_fts SET comments = {_FTS_COMMENTS.format("old")} WHERE rowid = old.issue_id;
+    END
+    """,
+]
+
+# Comment is created after (and dropped before) issue, so both tables exist here
+for statement in POSTGRES_DDL:
+    event.listen(Comment.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+for statement in POSTGRES_DROP_DDL:
+    event.listen(Comment.__table__, "before_drop", DDL(statement).execute_if(dialect="postgresql"))
+for statement in SQLITE_DDL:
+    event.listen(Comment.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(
+    Comment.__table__, "before_drop", DDL("DROP TABLE IF EXISTS issue_fts").execute_if(dialect="sqlite")
+)
+
+def _fts5_query(q: str) -> Optional[str]:
+    """
+    Turn free text into an FTS5 query matching all of its words.
+
+    Each word is quoted so user input can never be parsed as FTS5 syntax.
+    """
+    words = re.findall(r"\w+", q)
+    if not words:
+        return None
+    return " ".join(f'"{word}"' for word in words)
+
+def search_issues(query: Query, q: str) -> Tuple[Query, object]:
+    """
+    Restrict an Issue query to issues matching `q`.
+
+    Returns the filtered query and a relevance expression to order by
+    (higher is more relevant).
+    """
+    dialect = query.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+        query = query.filter(Issue.search_vector.op("@@")(tsquery))
+        return query, func.ts_rank_cd(Issue.search_vector, tsquery)
+
+    if dialect == "sqlite":
+        match = _fts5_query(q)
+        if match is None:
+            return query.filter(literal_column("0") == 1), literal_column("0")
+        hits = (
+            text(
+                "SELECT rowid AS issue_id, bm25(issue_fts, 10.0, 5.0, 1.0) AS score "
+                "FROM issue_fts WHERE issue_fts MATCH :match"
+            )
+            .bindparams(match=match)
+            .columns(issue_id=Integer, score=Float)
+            .subquery("search_hits")
+        )
+        query = query.join(hits, hits.c.issue_id == Issue.id)
+        # bm25() is lower for better matches
+        return query, -hits.c.score
+
+    # No index available: plain case-insensitive substring match
+    pattern = f"%{q}%"
+    query = query.filter(Issue.title.ilike(pattern) | Issue.description.ilike(pattern))
+    return query, literal_column("0")
@@ -1,6 +1,95 @@
+import logging
+import uuid
+from typing import Any, Dict, Optional
+
+from anyio import to_thread
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, QueuePool
 from app.core.config import settings
+from app.db.instrumentation import instrument_engine, timed_pool_class
+
+logger = logging.getLogger(__name__)
+
+def engine_options(url: str, name: str) -> Dict[str, Any]:
+    """
+    create_engine() keyword arguments for `url` from the DB_POOL_* settings.
+    """
+    pgbouncer = settings.DB_POOL_MODE == "pgbouncer"
+    poolclass = timed_pool_class(url, name, NullPool if pgbouncer else None)
+    options: Dict[str, Any] = {"poolclass": poolclass, "pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if issubclass(poolclass, QueuePool):
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    if pgbouncer and make_url(url).get_driver_name() == "asyncpg":
+        # psycopg2 never prepares server-side; asyncpg must not cache
+        # statements or reuse their names on another server connection
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+    return options
+
+engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, **engine_options(settings.SQLALCHEMY_DATABASE_URI, "primary"))
+instrument_engine(engine, "primary")
+# Objects keep their flushed state after commit: server-generated columns come
+# back through RETURNING (eager defaults), so responses need no refresh SELECT.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# The async engine is only built in async mode so the asyncio driver
+# (asyncpg/aiosqlite) stays an optional dependency.
+async_engine = None
+AsyncSessionLocal = None
+if settings.ASYNC_DB:
+    async_engine = create_async_engine(
+        settings.SQLALCHEMY_ASYNC_DATABASE_URI,
+        **engine_options(settings.SQLALCHEMY_ASYNC_DATABASE_URI, "async"),
+    )
+    instrument_engine(async_engine.sync_engine, "async")
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
+def pool_capacity() -> Optional[int]:
+    """
+    Connections one worker can hold at once; None without a client-side pool.
+    """
+    if settings.DB_POOL_MODE == "pgbouncer":
+        return None
+    return settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def configure_threadpool() -> int:
+    """
+    Size the anyio threadpool that runs sync endpoints to the connection pool
+    and warn about settings that queue requests where nobody sees them. Must
+    run on the event loop (at startup); returns the thread count.
+    """
+    capacity = pool_capacity()
+    threads = settings.THREADPOOL_SIZE or settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    to_thread.current_default_thread_limiter().total_tokens = threads
+    if capacity is not None and threads > capacity:
+        logger.warning(
+            "THREADPOOL_SIZE=%d exceeds the %d pooled connections: requests beyond that "
+            "hold a thread while waiting up to DB_POOL_TIMEOUT for a connection", threads, capacity,
+        )
+    elif capacity is not None and threads < capacity:
+        logger.warning(
+            "THREADPOOL_SIZE=%d is below the %d pooled connections: the rest are never used",
+            threads, capacity,
+        )
+    # Without a pool every busy thread may hold a connection
+    connections = settings.WEB_CONCURRENCY * (capacity or threads)
+    if settings.DB_MAX_CONNECTIONS and connections > settings.DB_MAX_CONNECTIONS:
+        logger.warning(
+            "%d workers x %d connections = %d exceeds DB_MAX_CONNECTIONS=%d; lower DB_POOL_SIZE/"
+            "DB_MAX_OVERFLOW or put PgBouncer in front (DB_POOL_MODE=pgbouncer)",
+            settings.WEB_CONCURRENCY, capacity or threads, connections, settings.DB_MAX_CONNECTIONS,
+        )
+    return threads
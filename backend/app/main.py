@@ -1,9 +1,32 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.api import deps
+from app.api import notifications  # noqa: F401  register job handlers
+from app.db import maintenance  # noqa: F401  register job handlers
 from app.api.api_v1.api import api_router
+from app.api.metrics import MetricsMiddleware, metrics_endpoint
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.api.profiler import PROFILE_HEADER, SQLProfilerMiddleware, read_profile
 from app.core.config import settings
+from app.core.events import hub
+from app.db.jobs import job_runner
+from app.db.replicas import replica_set
+from app.db.session import configure_threadpool
 
-app = FastAPI(title="IssueHub API", version="0.1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_threadpool()
+    replica_set.start()
+    hub.start()
+    if settings.JOBS_IN_PROCESS:
+        job_runner.start()
+    yield
+    job_runner.stop()
+    hub.stop()
+    replica_set.stop()
+
+app = FastAPI(title="IssueHub API", version="0.1.0", lifespan=lifespan)
 
 # Set all CORS enabled origins
 app.add_middleware(
@@ -12,8 +35,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, PROFILE_HEADER],
 )
 
+# Checks settings.SQL_PROFILER per request; a no-op while it is "off"
+app.add_middleware(SQLProfilerMiddleware)
+if settings.SQL_PROFILER != "off":
+    # Profiles hold statement text: admins only
+    app.add_api_route(
+        "/debug/requests/{id}", read_profile, include_in_schema=False, dependencies=[Depends(deps.require_admin)]
+    )
+
+# Outermost, so its timing covers the other middleware
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    # Answers only clients in METRICS_ALLOWED_NETWORKS
+    app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 @app.get("/")
@@ -2,3 +2,11 @@ from .user import User
 from .project import Project, ProjectMember
 from .issue import Issue
 from .comment import Comment
+from .issue_stat import IssueStat
+from .change_log import ChangeLog
+from .job import Job
+
+from app.db import search  # noqa: F401,E402  register search index DDL
+from app.db import issue_stats  # noqa: F401,E402  register counter maintenance
+from app.db import issue_activity  # noqa: F401,E402  register comment count maintenance
+from app.db import changelog  # noqa: F401,E402  register change log writes
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String
+from app.db.base_class import Base
+
+class ChangeLog(Base):
+    """
+    Append-only log of writes to project-scoped rows, numbered by `id`.
+
+    One entry per row changed, written in the same flush as the change (see
+    app/db/changelog.py); /sync reads it to send clients only what changed
+    since their cursor. Compaction drops entries superseded by a newer one
+    for the same row.
+    """
+    __table_args__ = (
+        # A caller's entries after a cursor
+        Index("ix_changelog_project_id_id", "project_id", "id"),
+        # Compaction: newer entries for the same row
+        Index("ix_changelog_entity_entity_id_id", "entity", "entity_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    project_id = Column(Integer, nullable=False)
+    entity = Column(String, nullable=False)  # "project", "member", "issue" or "comment"
+    entity_id = Column(Integer, nullable=False)
+    # Flush time, set by the application: recent entries bound the sync cursor
+    changed_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -1,9 +1,14 @@
-from sqlalchemy import Column, Integer, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, Text, ForeignKey, DateTime, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
 
 class Comment(Base):
+    __table_args__ = (
+        # Comment pages of an issue, which are ordered (and seeked) by id
+        Index("ix_comment_issue_id_id", "issue_id", "id"),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     issue_id = Column(Integer, ForeignKey("issue.id"), nullable=False)
     author_id = Column(Integer, ForeignKey("user.id"), nullable=False)
@@ -1,6 +1,8 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from app.db.base_class import Base
 
 import enum
@@ -17,7 +19,23 @@ class IssuePriority(str, enum.Enum):
     HIGH = "high"
     CRITICAL = "critical"
 
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
 class Issue(Base):
+    __table_args__ = (
+        # Project issue lists filtered by status/priority
+        Index("ix_issue_project_id_status_priority", "project_id", "status", "priority"),
+        # Assignee inbox
+        Index("ix_issue_assignee_id_status", "assignee_id", "status"),
+        # "Recently active" listings of a project
+        Index("ix_issue_project_id_last_activity_at", "project_id", "last_activity_at"),
+        # Full-text search (Postgres; SQLite uses the issue_fts table instead)
+        Index("ix_issue_search_vector", "search_vector", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
+    # Fetch the server-default created_at with RETURNING on INSERT
+    __mapper_args__ = {"eager_defaults": True}
+
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("project.id"), nullable=False)
     title = Column(String, index=True, nullable=False)
@@ -29,7 +47,21 @@ class Issue(Base):
     assignee_id = Column(Integer, ForeignKey("user.id"), nullable=True)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Set from Python, not the server: a server-side onupdate would have to be
+    # fetched back with RETURNING row by row under eager_defaults, which stops
+    # the ORM from batching UPDATEs of many issues into one executemany.
+    updated_at = Column(DateTime(timezone=True), onupdate=utcnow)
+
+    # Kept current by edits and by comment writes (see app/db/issue_activity.py).
+    # last_activity_at is a keyset sort key, so it is set from Python: SQLite
+    # stores CURRENT_TIMESTAMP in another text format than bound datetimes,
+    # and cursor seeks on it would not advance.
+    comment_count = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    last_activity_at = Column(DateTime(timezone=True), nullable=False, default=utcnow, onupdate=utcnow)
+
+    # Search document over title, description and comments, kept current by
+    # triggers (see app/db/search.py). Unused on SQLite.
+    search_vector = deferred(Column(TSVECTOR().with_variant(Text(), "sqlite")))
 
     # Relationships
     project = relationship("Project", back_populates="issues")
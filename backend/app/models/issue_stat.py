@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, UniqueConstraint
+from app.db.base_class import Base
+
+class IssueStat(Base):
+    """
+    Number of issues per (project, status, priority, assignee).
+
+    Maintained in the same transaction as the issue writes that change it
+    (see app/db/issue_stats.py), so project dashboards never scan issues.
+    """
+    __table_args__ = (
+        # Upsert target; its leading project_id also serves per-project reads
+        UniqueConstraint("project_id", "status", "priority", "assignee_id", name="uq_issuestat_key"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    project_id = Column(Integer, ForeignKey("project.id"), nullable=False)
+    status = Column(String, nullable=False)
+    priority = Column(String, nullable=False)
+    # 0 for unassigned issues: NULLs never conflict, which would break the upsert
+    assignee_id = Column(Integer, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,23 @@
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String, Text
+from app.db.base_class import Base
+
+class Job(Base):
+    """
+    A queued background job (see app/db/jobs.py). Deleted once it succeeds;
+    kept with status "failed" after its last attempt.
+    """
+    __table_args__ = (
+        # Claiming: the next due jobs, then more of the same kind
+        Index("ix_job_status_run_after", "status", "run_after"),
+        Index("ix_job_kind_status_run_after", "kind", "status", "run_after"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+    status = Column(String, nullable=False, default="pending")  # pending, running or failed
+    attempts = Column(Integer, nullable=False, default=0)
+    run_after = Column(DateTime(timezone=True), nullable=False)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
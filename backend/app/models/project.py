@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Enum, Index, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
@@ -20,6 +20,13 @@ class Project(Base):
     issues = relationship("Issue", back_populates="project", cascade="all, delete-orphan")
 
 class ProjectMember(Base):
+    __table_args__ = (
+        # One membership per user; also serves (project_id, user_id) lookups
+        UniqueConstraint("project_id", "user_id", name="uq_projectmember_project_id_user_id"),
+        # Projects visible to a user
+        Index("ix_projectmember_user_id_project_id", "user_id", "project_id"),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("project.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("user.id"), nullable=False)
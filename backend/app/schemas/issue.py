@@ -1,7 +1,10 @@
 from typing import Optional, List
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
+from enum import Enum
 from app.models.issue import IssueStatus, IssuePriority
+from app.schemas.comment import Comment
+from app.schemas.user import UserSummary
 
 # Shared properties
 class IssueBase(BaseModel):
@@ -23,6 +26,14 @@ class IssueUpdate(BaseModel):
     priority: Optional[IssuePriority] = None
     assignee_id: Optional[int] = None
 
+    # These columns are NOT NULL: they may be left out, but not cleared
+    @field_validator("title", "status", "priority")
+    @classmethod
+    def not_null(cls, value):
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
 # Properties to return to client
 class Issue(IssueBase):
     id: int
@@ -30,13 +41,72 @@ class Issue(IssueBase):
     reporter_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
+    comment_count: int = 0
+    last_activity_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
 
+class IssueSort(str, Enum):
+    ID = "id"
+    NEWEST = "-id"
+    TITLE = "title"
+    ACTIVE = "-last_activity_at"  # most recently active first
+    RELEVANCE = "relevance"  # search results only; offset pagination
+
 # Paginated response
 class IssueListResponse(BaseModel):
     items: List[Issue]
-    total: int
+    total: Optional[int] = None  # None when requested with count=none
     skip: int
     limit: int
+    has_more: bool = False
+    next_cursor: Optional[str] = None
+
+# Batch writes
+BATCH_MAX_ITEMS = 500
+
+class IssueBatchCreate(BaseModel):
+    items: List[IssueCreate] = Field(min_length=1, max_length=BATCH_MAX_ITEMS)
+
+class IssueBatchUpdateItem(IssueUpdate):
+    id: int
+
+class IssueBatchUpdate(BaseModel):
+    items: List[IssueBatchUpdateItem] = Field(min_length=1, max_length=BATCH_MAX_ITEMS)
+
+class IssueBatchResult(BaseModel):
+    index: int  # position of the item in the request
+    status_code: int
+    issue: Optional[Issue] = None
+    error: Optional[str] = None
+
+class IssueBatchResponse(BaseModel):
+    results: List[IssueBatchResult]
+
+# Everything the issue page shows, in one response
+class IssueDetailInclude(str, Enum):
+    COMMENTS = "comments"
+    MEMBERS = "members"
+
+class CommentWithAuthor(Comment):
+    author: Optional[UserSummary] = None
+
+class AssignableMember(BaseModel):
+    user_id: int
+    role: str
+    user: UserSummary
+
+class IssueDetail(BaseModel):
+    issue: Issue
+    reporter: Optional[UserSummary] = None
+    assignee: Optional[UserSummary] = None
+    role: str  # the caller's role in the issue's project
+    # With include=comments: the first page, oldest first; continue with
+    # /comments/issue/{id}?cursor=comments_next_cursor
+    comments: Optional[List[CommentWithAuthor]] = None
+    comments_next_cursor: Optional[str] = None
+    # With include=members: the project's members, the caller included;
+    # continue with /projects/{project_id}/members?cursor=members_next_cursor
+    members: Optional[List[AssignableMember]] = None
+    members_next_cursor: Optional[str] = None
@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Dict, Optional, List
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -48,6 +48,15 @@ class ProjectMemberWithUser(ProjectMemberBase):
     class Config:
         from_attributes = True
 
+# Issue counts for dashboards
+class ProjectIssueStats(BaseModel):
+    project_id: int
+    total: int = 0
+    by_status: Dict[str, int] = {}
+    by_priority: Dict[str, int] = {}
+    by_assignee: Dict[int, int] = {}  # assignee id -> issues; unassigned not included
+    unassigned: int = 0
+
 # Import User schema for type checking
 from app.schemas.user import User
 ProjectMemberWithUser.model_rebuild()
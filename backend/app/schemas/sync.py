@@ -0,0 +1,24 @@
+from typing import List
+from pydantic import BaseModel
+from app.schemas.comment import Comment
+from app.schemas.issue import Issue
+from app.schemas.project import Project, ProjectMember
+
+class SyncDeleted(BaseModel):
+    projects: List[int] = []
+    memberships: List[int] = []
+    issues: List[int] = []
+    comments: List[int] = []
+
+# Rows changed since the cursor, as they are now
+class SyncResponse(BaseModel):
+    cursor: int  # pass as `since` next time
+    has_more: bool = False
+    projects: List[Project] = []
+    memberships: List[ProjectMember] = []
+    issues: List[Issue] = []
+    comments: List[Comment] = []
+    deleted: SyncDeleted = SyncDeleted()
+    # Projects the caller joined since the cursor: their older rows are not
+    # in this response; fetch them with since=0&project_id=...
+    resync_projects: List[int] = []
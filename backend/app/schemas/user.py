@@ -34,9 +34,20 @@ class User(UserBase):
     class Config:
         from_attributes = True
 
+# Who someone is, for display next to their issues and comments
+class UserSummary(BaseModel):
+    id: int
+    email: EmailStr
+    name: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
 class Token(BaseModel):
     access_token: str
     token_type: str
 
 class TokenData(BaseModel):
     id: Optional[str] = None
+    role: Optional[str] = None
+    exp: Optional[int] = None
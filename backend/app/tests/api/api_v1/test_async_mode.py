@@ -0,0 +1,71 @@
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.tests.utils.utils import create_random_user, user_authentication_headers
+
+def test_async_project_issue_comment_flow(async_client: TestClient):
+    user = create_random_user(async_client)
+    headers = user_authentication_headers(async_client, user["email"], user["password"])
+
+    me = async_client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert me.status_code == 200
+    assert me.json()["id"] == user["id"]
+
+    p_res = async_client.post(
+        f"{settings.API_V1_STR}/projects/", headers=headers,
+        json={"name": "Async Proj", "key": "ASYNC", "description": "D"},
+    )
+    assert p_res.status_code == 200
+    project_id = p_res.json()["id"]
+
+    i_res = async_client.post(
+        f"{settings.API_V1_STR}/issues/", headers=headers,
+        json={"title": "Async issue", "project_id": project_id},
+    )
+    assert i_res.status_code == 200
+    issue_id = i_res.json()["id"]
+
+    patch = async_client.patch(
+        f"{settings.API_V1_STR}/issues/{issue_id}", headers=headers, json={"status": "in_progress"}
+    )
+    assert patch.status_code == 200
+    assert patch.json()["status"] == "in_progress"
+
+    c_res = async_client.post(
+        f"{settings.API_V1_STR}/comments/issue/{issue_id}", headers=headers, json={"body": "Async comment"}
+    )
+    assert c_res.status_code == 200
+
+    comments = async_client.get(f"{settings.API_V1_STR}/comments/issue/{issue_id}", headers=headers)
+    assert comments.status_code == 200
+    assert [c["body"] for c in comments.json()] == ["Async comment"]
+
+    issues = async_client.get(
+        f"{settings.API_V1_STR}/issues/", headers=headers, params={"project_id": project_id}
+    )
+    assert issues.status_code == 200
+    assert issues.json()["total"] == 1
+
+def test_async_permissions_and_nested_members(async_client: TestClient):
+    owner = create_random_user(async_client)
+    other = create_random_user(async_client)
+    owner_headers = user_authentication_headers(async_client, owner["email"], owner["password"])
+    other_headers = user_authentication_headers(async_client, other["email"], other["password"])
+
+    project_id = async_client.post(
+        f"{settings.API_V1_STR}/projects/", headers=owner_headers,
+        json={"name": "Async Proj 2", "key": "ASYNC2"},
+    ).json()["id"]
+
+    denied = async_client.get(f"{settings.API_V1_STR}/projects/{project_id}", headers=other_headers)
+    assert denied.status_code == 403
+
+    added = async_client.post(
+        f"{settings.API_V1_STR}/projects/{project_id}/members", headers=owner_headers,
+        json={"user_id": other["id"]},
+    )
+    assert added.status_code == 200
+
+    # ProjectMemberWithUser lazy-loads `user`; this must work inside the greenlet
+    members = async_client.get(f"{settings.API_V1_STR}/projects/{project_id}/members", headers=owner_headers)
+    assert members.status_code == 200
+    assert [m["user"]["email"] for m in members.json()] == [other["email"]]
@@ -1,5 +1,12 @@
+import asyncio
+import threading
+import pytest
 from fastapi.testclient import TestClient
+from passlib.hash import bcrypt
+from app.core import security
 from app.core.config import settings
+from app.models import User
+from app.tests.utils.utils import create_random_user, user_authentication_headers
 
 def test_signup(client: TestClient):
     response = client.post(
@@ -20,3 +27,69 @@ def test_login(client: TestClient):
     content = response.json()
     assert "access_token" in content
     assert content["token_type"] == "bearer"
+
+def test_requests_skip_user_lookup(client: TestClient, statements):
+    user = create_random_user(client)
+    headers = user_authentication_headers(client, user["email"], user["password"])
+
+    statements.clear()
+    response = client.get(f"{settings.API_V1_STR}/projects/", headers=headers)
+    assert response.status_code == 200
+    assert not [s for s in statements if 'FROM "user"' in s or "FROM user" in s]
+
+    # Endpoints that need the full row still load it
+    me = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert me.json()["id"] == user["id"]
+
+def test_invalid_token_rejected(client: TestClient):
+    response = client.get(f"{settings.API_V1_STR}/projects/", headers={"Authorization": "Bearer nope"})
+    assert response.status_code == 401
+
+def test_login_rehashes_when_cost_changes(client: TestClient, db):
+    user = create_random_user(client)
+    stored = db.query(User).filter(User.id == user["id"]).first()
+    stored.password_hash = bcrypt.using(rounds=5).hash(user["password"])
+    db.commit()
+
+    user_authentication_headers(client, user["email"], user["password"])
+
+    db.refresh(stored)
+    assert stored.password_hash.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+
+def test_login_sheds_load_when_hashing_is_saturated(client: TestClient, monkeypatch):
+    monkeypatch.setattr(security, "_hash_slots", threading.BoundedSemaphore(1))
+    security._hash_slots.acquire()
+    response = client.post(
+        f"{settings.API_V1_STR}/auth/login",
+        data={"username": "test@example.com", "password": "password123"},
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+def test_cancelled_hash_holds_its_slot_until_done(monkeypatch):
+    monkeypatch.setattr(security, "_hash_slots", threading.BoundedSemaphore(1))
+    release = threading.Event()
+
+    async def scenario() -> None:
+        task = asyncio.create_task(security._run_hashing(release.wait, 5))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # The bcrypt call is still running, so its slot is still taken
+        with pytest.raises(security.PasswordHashingBusy):
+            await security._run_hashing(release.wait, 5)
+        release.set()
+        await asyncio.sleep(0.05)
+        assert await security._run_hashing(release.wait, 5)
+
+    asyncio.run(scenario())
+
+def test_deleted_user_token_stops_working(client: TestClient, db):
+    user = create_random_user(client)
+    headers = user_authentication_headers(client, user["email"], user["password"])
+    assert client.get(f"{settings.API_V1_STR}/projects/", headers=headers).status_code == 200
+
+    db.delete(db.query(User).filter(User.id == user["id"]).first())
+    db.commit()
+    assert client.get(f"{settings.API_V1_STR}/projects/", headers=headers).status_code == 401
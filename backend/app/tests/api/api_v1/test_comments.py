@@ -1,5 +1,10 @@
+from datetime import datetime, timezone
 from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
 from app.core.config import settings
+from app.db.issue_activity import rebuild_issue_activity
+from app.models.comment import Comment
+from app.models.issue import Issue
 from app.tests.utils.utils import create_random_user, user_authentication_headers
 
 def test_create_comment(client: TestClient):
@@ -47,3 +52,82 @@ def test_read_comments(client: TestClient):
     content = response.json()
     assert len(content) == 1
     assert content[0]["body"] == "Comment 1"
+
+def test_read_comments_cursor_header(client: TestClient):
+    user = create_random_user(client)
+    headers = user_authentication_headers(client, user["email"], user["password"])
+
+    p_res = client.post(f"{settings.API_V1_STR}/projects/", headers=headers, json={"name": "C Proj 3", "key": "CP3", "description": "D"})
+    project_id = p_res.json()["id"]
+
+    i_res = client.post(f"{settings.API_V1_STR}/issues/", headers=headers, json={"title": "Issue C 3", "project_id": project_id})
+    issue_id = i_res.json()["id"]
+
+    for n in range(3):
+        client.post(f"{settings.API_V1_STR}/comments/issue/{issue_id}", headers=headers, json={"body": f"Comment {n}"})
+
+    first = client.get(f"{settings.API_V1_STR}/comments/issue/{issue_id}", headers=headers, params={"limit": 2})
+    assert [c["body"] for c in first.json()] == ["Comment 0", "Comment 1"]
+    cursor = first.headers["X-Next-Cursor"]
+
+    second = client.get(
+        f"{settings.API_V1_STR}/comments/issue/{issue_id}", headers=headers, params={"limit": 2, "cursor": cursor}
+    )
+    assert [c["body"] for c in second.json()] == ["Comment 2"]
+    assert "X-Next-Cursor" not in second.headers
+
+def test_read_comments_conditional(client: TestClient):
+    user = create_random_user(client)
+    headers = user_authentication_headers(client, user["email"], user["password"])
+    project_id = client.post(f"{settings.API_V1_STR}/projects/", headers=headers, json={"name": "C Proj 4", "key": "CP4"}).json()["id"]
+    issue_id = client.post(f"{settings.API_V1_STR}/issues/", headers=headers, json={"title": "Issue C 4", "project_id": project_id}).json()["id"]
+    url = f"{settings.API_V1_STR}/comments/issue/{issue_id}"
+
+    etag = client.get(url, headers=headers).headers["etag"]
+    assert client.get(url, headers={**headers, "If-None-Match": etag}).status_code == 304
+
+    client.post(url, headers=headers, json={"body": "New comment"})
+    response = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert [c["body"] for c in response.json()] == ["New comment"]
+    assert client.get(url, headers={**headers, "If-None-Match": response.headers["etag"]}).status_code == 304
+
+def test_comment_activity_columns(client: TestClient, db: Session):
+    user = create_random_user(client)
+    headers = user_authentication_headers(client, user["email"], user["password"])
+    project_id = client.post(f"{settings.API_V1_STR}/projects/", headers=headers, json={"name": "C Proj 5", "key": "CP5"}).json()["id"]
+    quiet, busy = (
+        client.post(f"{settings.API_V1_STR}/issues/", headers=headers, json={"title": title, "project_id": project_id}).json()["id"]
+        for title in ("Quiet", "Busy")
+    )
+    long_ago = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    db.query(Issue).filter(Issue.id.in_([quiet, busy])).update(
+        {"last_activity_at": long_ago, "updated_at": None}, synchronize_session=False
+    )
+    db.commit()
+
+    for n in range(2):
+        client.post(f"{settings.API_V1_STR}/comments/issue/{busy}", headers=headers, json={"body": f"Comment {n}"})
+    issue = client.get(f"{settings.API_V1_STR}/issues/{busy}", headers=headers).json()
+    assert issue["comment_count"] == 2
+    # Commenting is activity, not an edit
+    assert issue["updated_at"] is None
+    listed = client.get(
+        f"{settings.API_V1_STR}/issues/", headers=headers, params={"project_id": project_id, "sort": "-last_activity_at"}
+    ).json()
+    assert [i["id"] for i in listed["items"]] == [busy, quiet]
+
+    # Deleting a comment only lowers the count
+    db.expire_all()
+    active_at = db.get(Issue, busy).last_activity_at
+    db.delete(db.query(Comment).filter(Comment.issue_id == busy).first())
+    db.commit()
+    db.expire_all()
+    assert (db.get(Issue, busy).comment_count, db.get(Issue, busy).last_activity_at) == (1, active_at)
+
+    db.query(Issue).filter(Issue.id == busy).update({"comment_count": 7}, synchronize_session=False)
+    rebuild_issue_activity(db, [busy])
+    db.commit()
+    db.expire_all()
+    assert db.get(Issue, busy).comment_count == 1
+    assert db.get(Issue, quiet).last_activity_at.replace(tzinfo=timezone.utc) == long_ago
@@ -0,0 +1,204 @@
+import asyncio
+import json
+import threading
+from typing import Dict, List, Optional
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.core.event_broker import EventBroker
+from app.core.events import RESET, BrokerBackend, EventHub, SubscriptionOverflow
+from app.tests.utils.utils import create_random_user, user_authentication_headers
+
+class EventStream:
+    """
+    An SSE response read as it streams. TestClient buffers whole bodies,
+    so this drives the ASGI app directly and disconnects on exit.
+    """
+
+    def __init__(self, app, path: str, headers: Dict[str, str]):
+        self.app = app
+        self.scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": "GET", "scheme": "http", "server": ("testserver", 80),
+            "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+            "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        }
+        self.chunks: asyncio.Queue = asyncio.Queue()
+        self.disconnected = asyncio.Event()
+        self.buffer = ""
+        self.requested = False
+
+    async def receive(self):
+        if not self.requested:
+            self.requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await self.disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message):
+        await self.chunks.put(message)
+
+    async def __aenter__(self):
+        self.task = asyncio.create_task(self.app(self.scope, self.receive, self.send))
+        start = await asyncio.wait_for(self.chunks.get(), 5)
+        self.status = start["status"]
+        return self
+
+    async def __aexit__(self, *exc):
+        self.disconnected.set()
+        await asyncio.wait_for(self.task, 5)
+
+    async def next_event(self) -> Dict[str, str]:
+        while True:
+            while "\n\n" in self.buffer:
+                frame, self.buffer = self.buffer.split("\n\n", 1)
+                fields = dict(line.split(": ", 1) for line in frame.split("\n") if not line.startswith(":"))
+                if "event" in fields:
+                    return fields
+            message = await asyncio.wait_for(self.chunks.get(), 5)
+            self.buffer += message.get("body", b"").decode()
+
+def events_path(resource: str, id: int) -> str:
+    return f"{settings.API_V1_STR}/{resource}/{id}/events"
+
+def test_issue_and_comment_events(client: TestClient):
+    user = create_random_user(client)
+    headers = user_authentication_headers(client, user["email"], user["password"])
+    project = client.post(
+        f"{settings.API_V1_STR}/projects/", headers=headers,
+        json={"name": "Events Proj", "key": "EVENTS", "description": "D"},
+    ).json()
+    issue = client.post(
+        f"{settings.API_V1_STR}/issues/", headers=headers,
+        json={"title": "Watched", "project_id": project["id"]},
+    ).json()
+
+    async def scenario() -> Optional[str]:
+        async with EventStream(client.app, events_path("projects", project["id"]), headers) as project_stream, \
+                EventStream(client.app, events_path("issues", issue["id"]), headers) as issue_stream:
+            assert project_stream.status == issue_stream.status == 200
+            await asyncio.to_thread(
+                client.patch, f"{settings.API_V1_STR}/issues/{issue['id']}", headers=headers,
+                json={"status": "in_progress"},
+            )
+            await asyncio.to_thread(
+                client.post, f"{settings.API_V1_STR}/comments/issue/{issue['id']}", headers=headers,
+                json={"body": "On it"},
+            )
+            updated = await project_stream.next_event()
+            assert updated["event"] == "issue.updated"
+            data = json.loads(updated["data"])
+            assert data["changed"] == ["status"]
+            assert data["issue"]["id"] == issue["id"] and data["issue"]["status"] == "in_progress"
+
+            assert (await issue_stream.next_event())["id"] == updated["id"]
+            commented = await issue_stream.next_event()
+            assert commented["event"] == "comment.created"
+            assert json.loads(commented["data"])["comment"]["body"] == "On it"
+            return updated["id"]
+
+    last_seen = asyncio.run(scenario())
+
+    # Missed while disconnected: replayed on reconnect
+    client.post(
+        f"{settings.API_V1_STR}/issues/", headers=headers,
+        json={"title": "Created offline", "project_id": project["id"]},
+    )
+
+    async def resume() -> None:
+        resume_headers = {**headers, "Last-Event-ID": last_seen}
+        async with EventStream(client.app, events_path("projects", project["id"]), resume_headers) as stream:
+            created = await stream.next_event()
+            assert created["event"] == "issue.created"
+            assert json.loads(created["data"])["issue"]["title"] == "Created offline"
+
+    asyncio.run(resume())
+
+def test_event_stream_checks_access(client: TestClient):
+    owner = create_random_user(client)
+    owner_headers = user_authentication_headers(client, owner["email"], owner["password"])
+    project = client.post(
+        f"{settings.API_V1_STR}/projects/", headers=owner_headers,
+        json={"name": "Private Events", "key": "PRIVEVT", "description": "D"},
+    ).json()
+    other = create_random_user(client)
+    other_headers = user_authentication_headers(client, other["email"], other["password"])
+
+    assert client.get(events_path("projects", project["id"]), headers=other_headers).status_code == 403
+    assert client.get(events_path("projects", 999999), headers=owner_headers).status_code == 404
+    assert client.get(events_path("issues", 999999), headers=owner_headers).status_code == 404
+    response = client.get(
+        events_path("projects", project["id"]), headers={**owner_headers, "Last-Event-ID": "abc"}
+    )
+    assert response.status_code == 400
+
+def test_hub_replay_and_overflow():
+    hub = EventHub(replay=2, max_topics=2, client_buffer=2)
+
+    async def scenario() -> None:
+        for n in range(3):
+            hub.publish(["a"], "tick", json.dumps(n))
+        # Event 1 fell out of the replay history: the client has to refetch
+        (reset,) = [await hub.subscribe(["a"], 0).next(1)]
+        assert reset.type == RESET and reset.id == 3
+        assert [(await hub.subscribe(["a"], 1).next(1)).id] == [2]
+
+        # Topics beyond max_topics are forgotten, oldest first
+        hub.publish(["b"], "tick", "0")
+        hub.publish(["c"], "tick", "0")
+        assert (await hub.subscribe(["a"], 2).next(1)).type == RESET
+
+        slow = hub.subscribe(["c"])
+        for n in range(3):
+            hub.publish(["c"], "tick", json.dumps(n))
+        await asyncio.sleep(0)
+        assert [(await slow.next(1)).data for _ in range(2)] == ["0", "1"]
+        try:
+            await slow.next(1)
+        except SubscriptionOverflow:
+            pass
+        else:
+            raise AssertionError("a slow subscriber should be dropped")
+
+    asyncio.run(scenario())
+
+def test_hub_resets_topics_that_were_forgotten():
+    hub = EventHub(replay=10, max_topics=1, client_buffer=10)
+
+    async def scenario() -> None:
+        for n in range(5):
+            hub.publish(["a"], "tick", json.dumps(n))
+        hub.publish(["b"], "tick", "0")
+        hub.publish(["a"], "tick", "5")
+        # Events 4 and 5 went with the evicted history of "a"
+        reset = await hub.subscribe(["a"], 3).next(1)
+        assert reset.type == RESET and reset.id == 7
+        assert [(await hub.subscribe(["a"], 6).next(1)).id] == [7]
+
+    asyncio.run(scenario())
+
+def test_broker_fans_out_to_every_worker():
+    loop = asyncio.new_event_loop()
+    broker = EventBroker()
+    port = loop.run_until_complete(broker.start(port=0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    workers: List[EventHub] = [EventHub(BrokerBackend(f"tcp://127.0.0.1:{port}")) for _ in range(2)]
+    try:
+        for worker in workers:
+            worker.start()
+
+        async def scenario() -> None:
+            subscriptions = [worker.subscribe(["issue:1"]) for worker in workers]
+            workers[0].publish(["issue:1"], "issue.updated", "{}")
+            workers[1].publish(["issue:1"], "comment.created", "{}")
+            for subscription in subscriptions:
+                received = [await subscription.next(5) for _ in range(2)]
+                assert [(e.id, e.type) for e in received] == [(1, "issue.updated"), (2, "comment.created")]
+
+        asyncio.run(scenario())
+    finally:
+        for worker in workers:
+            worker.stop()
+        asyncio.run_coroutine_threadsafe(broker.close(), loop).result(5)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
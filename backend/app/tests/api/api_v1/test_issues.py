@@ -1,4 +1,5 @@
 from fastapi.testclient import TestClient
+from app.api import deps
 from app.core.config import settings
 from app.tests.utils.utils import create_random_user, user_authentication_headers
 
@@ -53,3 +54,313 @@ def test_read_issues(client: TestClient):
     content = response.json()
     assert len(content) == 1
     assert content[0]["title"] == "Issue 1"
+
+def test_read_issues_cursor_pagination(client: TestClient):
+    user = create_random_user(client)
+    headers = user_authentication_headers(client, user["email"], user["password"])
+
+    p_data = {"name": "Cursor Project", "key": "CUR", "description": "Desc"}
+    project_id = client.post(f"{settings.API_V1_STR}/projects/", headers=headers, json=p_data).json()["id"]
+    for n in range(5):
+        client.post(
+            f"{settings.API_V1_STR}/issues/",
+            headers=headers,
+            json={"title": f"Cursor issue {n}", "project_id": project_id}
+        )
+
+    seen = []
+    params = {"project_id": project_id, "limit": 2, "sort": "-id"}
+    while True:
+        response = client.get(f"{settings.API_V1_STR}/issues/", headers=headers, params=params)
+        assert response.status_code == 200
+        content = response.json()
+        assert content["total"] == 5
+        seen.extend(item["title"] for item in content["items"])
+        if content["next_cursor"] is None:
+            break
+        params["cursor"] = content["next_cursor"]
+
+    assert seen == [f"Cursor issue {n}" for n in reversed(range(5))]
+
+    response = client.get(
+        f"{settings.API_V1_STR}/issues/", headers=headers, params={"project_id": project_id, "cursor": "bogus"}
+    )
+    assert response.status_code == 400
+
+    for url in ("/issues/", f"/comments/issue/{project_id}", f"/projects/{project_id}/members", "/users/"):
+        for limit in (0, -1, 501):
+            response = client.get(f"{settings.API_V1_STR}{url}", headers=headers, params={"limit": limit})
+            assert response.status_code == 422, (url, limit)
+
+def test_read_issues_cursor_pagination_by_activity(client: TestClient):
+    user = create_random_user(client)
+    headers = user_authentication_headers(client, user["email"], user["password"])
+    project_id = client.post(
+        f"{settings.API_V1_STR}/projects/", headers=headers, json={"name": "Active", "key": "ACTIVE"}
+    ).json()["id"]
+    issue_ids = [
+        client.post(
+            f"{settings.API_V1_STR}/issues/", headers=headers, json={"title": f"Active {n}", "project_id": project_id}
+        ).json()["id"]
+        for n in range(5)
+    ]
+    client.post(f"{settings.API_V1_STR}/comments/issue/{issue_ids[1]}", headers=headers, json={"body": "Bump"})
+
+    seen = []
+    params = {"project_id": project_id, "limit": 2, "sort": "-last_activity_at"}
+    for _ in range(5):
+        content = client.get(f"{settings.API_V1_STR}/issues/", headers=headers, params=params).json()
+        seen.extend(item["id"] for item in content["items"])
+        if content["next_cursor"] is None:
+            break
+        params["cursor"] = content["next_cursor"]
+    assert seen == [issue_ids[1], issue_ids[4], issue_ids[3], issue_ids[2], issue_ids[0]]
+
+def test_read_issues_count_modes(client: TestClient):
+    user = create_random_user(client)
+    headers = user_authentication_headers(client, user["email"], user["password"])
+
+    p_data = {"name": "Count Project", "key": "CNT", "description": "Desc"}
+    project_id = client.post(f"{settings.API_V1_STR}/projects/", headers=headers, json=p_data).json()["id"]
+    url = f"{settings.API_V1_STR}/issues/"
+    client.post(url, headers=headers, json={"title": "Count 1", "project_id": project_id})
+
+    assert client.get(url, headers=headers, params={"project_id": project_id}).json()["total"] == 1
+
+    # The memoized total is invalidated by the next write to the project
+    client.post(url, headers=headers, json={"title": "Count 2", "project_id": project_id})
+    content = client.get(url, headers=headers, params={"project_id": project_id, "limit": 1}).json()
+    assert content["total"] == 2
+    assert content["has_more"] is True
+
+    content = client.get(url, headers=headers, params={"count": "none", "limit": 5}).json()
+    assert content["total"] is None
+    assert content["has_more"] is False
+    assert len(content["items"]) == 2
+
+    # No planner statistics on SQLite, so estimate falls back to the exact count
+    content = client.get(url, headers=headers, params={"project_id": project_id, "count": "estimate"}).json()
+    assert content["total"] == 2
+
+def test_update_issue_single_membership_query(client: TestClient, statements):
+    user = create_random_user(client)
+    headers = user_authentication_headers(client, user["email"], user["password"])
+
+    p_data = {"name": "Member Project", "key": "MEM", "description": "Desc"}
+    project_id = client.post(f"{settings.API_V1_STR}/projects/", headers=headers, json=p_data).json()["id"]
+    issue_id = client.post(
+        f"{settings.API_V1_STR}/issues/", headers=headers, json={"title": "Member issue", "project_id": project_id}
+    ).json()["id"]
+
+    deps._memberships.clear()
+    statements.clear()
+    response = client.patch(f"{settings.API_V1_STR}/issues/{issue_id}", headers=headers, json={"priority": "low"})
+    assert response.status_code == 200
+    assert len([s for s in statements if "FROM projectmember" in s]) == 1
+
+    # The next request is served from the process-wide cache
+    statements.clear()
+    client.patch(f"{settings.API_V1_STR}/issues/{issue_id}", headers=headers, json={"priority": "high"})
+    assert not [s for s in statements if "FROM projectmember" in s]
+
+def test_batch_create_and_update_issues(client: TestClient, statements):
+    owner = create_random_user(client)
+    other = create_random_user(client)
+    headers = user_authentication_headers(client, owner["email"], owner["password"])
+    other_headers = user_authentication_headers(client, other["email"], other["password"])
+
+    project_id = client.post(
+        f"{settings.API_V1_STR}/projects/", headers=headers, json={"name": "Batch Project", "key": "BATCH"}
+    ).json()["id"]
+    foreign_id = client.post(
+        f"{settings.API_V1_STR}/projects/", headers=other_headers, json={"name": "Foreign", "key": "FOREIGN"}
+    ).json()["id"]
+
+    statements.clear()
+    response = client.post(f"{settings.API_V1_STR}/issues/batch", headers=headers, json={"items": [
+        {"title": "Batch 1", "project_id": project_id},
+        {"title": "Batch 2", "project_id": foreign_id},
+        {"title": "Batch 3", "project_id": project_id, "priority": "high"},
+    ]})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["status_code"] for r in results] == [200, 403, 200]
+    assert results[2]["issue"]["priority"] == "high"
+    # Both projects resolved with a single membership query
+    assert len([s for s in statements if "FROM projectmember" in s]) == 1
+
+    ids = [results[0]["issue"]["id"], results[2]["issue"]["id"]]
+    statements.clear()
+    response = client.patch(f"{settings.API_V1_STR}/issues/batch", headers=headers, json={"items": [
+        {"id": ids[0], "status": "closed"},
+        {"id": ids[1], "status": "closed"},
+        {"id": 999999, "status": "closed"},
+    ]})
+    results = response.json()["results"]
+    assert [r["status_code"] for r in results] == [200, 200, 404]
+    # Explicit null for a NOT NULL column is rejected up front
+    response = client.patch(
+        f"{settings.API_V1_STR}/issues/batch", headers=headers, json={"items": [{"id": ids[0], "title": None}]}
+    )
+    assert response.status_code == 422
+    response = client.patch(f"{settings.API_V1_STR}/issues/{ids[0]}", headers=headers, json={"status": None})
+    assert response.status_code == 422
+    assert all(r["issue"]["status"] == "closed" and r["issue"]["updated_at"] for r in results[:2])
+    # Both rows updated by one executemany, with nothing fetched back per row
+    updates = [s for s in statements if s.startswith("UPDATE issue ")]
+    assert len(updates) == 1 and "RETURNING" not in updates[0]
+
+    listed = client.get(
+        f"{settings.API_V1_STR}/issues/", headers=headers, params={"project_id": project_id, "status": "closed"}
+    ).json()
+    assert listed["total"] == 2
+
+def test_search_issues(client: TestClient):
+    user = create_random_user(client)
+    headers = user_authentication_headers(client, user["email"], user["password"])
+    project_id = client.post(
+        f"{settings.API_V1_STR}/projects/", headers=headers, json={"name": "Search", "key": "SEARCH"}
+    ).json()["id"]
+
+    def create(title, description=None):
+        return client.post(
+            f"{settings.API_V1_STR}/issues/", headers=headers,
+            json={"title": title, "description": description, "project_id": project_id},
+        ).json()["id"]
+
+    in_title = create("Crash when uploading avatars")
+    in_description = create("Profile page broken", "Uploading a new avatar crashes the page")
+    in_comment = create("Settings are slow")
+    create("Unrelated issue")
+    client.post(
+        f"{settings.API_V1_STR}/comments/issue/{in_comment}", headers=headers,
+        json={"body": "Probably the avatar resize again"},
+    )
+
+    def search(q, **params):
+        return client.get(
+            f"{settings.API_V1_STR}/issues/", headers=headers,
+            params={"project_id": project_id, "q": q, **params},
+        )
+
+    content = search("avatar").json()
+    # Title matches rank above description matches, which rank above comments
+    assert [i["id"] for i in content["items"]] == [in_title, in_description, in_comment]
+    assert content["total"] == 3
+
+    assert [i["id"] for i in search("uploading crash").json()["items"]] == [in_title, in_description]
+    assert [i["id"] for i in search("avatar", sort="-id").json()["items"]] == [in_comment, in_description, in_title]
+    assert search('"avatar* (').json()["total"] == 3
+    assert search("nothing-matches").json()["items"] == []
+
+    client.patch(f"{settings.API_V1_STR}/issues/{in_title}", headers=headers, json={"title": "Crash on login"})
+    assert [i["id"] for i in search("avatar").json()["items"]] == [in_description, in_comment]
+
+    assert search("avatar", cursor="abc").status_code == 400
+    assert client.get(
+        f"{settings.API_V1_STR}/issues/", headers=headers, params={"sort": "relevance"}
+    ).status_code == 400
+
+def test_read_issue_conditional(client: TestClient, statements):
+    user = create_random_user(client)
+    headers = user_authentication_headers(client, user["email"], user["password"])
+    project_id = client.post(
+        f"{settings.API_V1_STR}/projects/", headers=headers, json={"name": "ETag", "key": "ETAG"}
+    ).json()["id"]
+    issue_id = client.post(
+        f"{settings.API_V1_STR}/issues/", headers=headers, json={"title": "Cached", "project_id": project_id}
+    ).json()["id"]
+
+    response = client.get(f"{settings.API_V1_STR}/issues/{issue_id}", headers=headers)
+    etag = response.headers["etag"]
+
+    statements.clear()
+    response = client.get(f"{settings.API_V1_STR}/issues/{issue_id}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+    # Answered from the version columns only
+    assert not any(s.startswith("SELECT issue.id") for s in statements)
+
+    client.patch(f"{settings.API_V1_STR}/issues/{issue_id}", headers=headers, json={"status": "closed"})
+    response = client.get(f"{settings.API_V1_STR}/issues/{issue_id}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["status"] == "closed"
+    assert response.headers["etag"] != etag
+
+    # Non-members get 403, not a 304 that would confirm the version
+    outsider = create_random_user(client)
+    outsider_headers = user_authentication_headers(client, outsider["email"], outsider["password"])
+    response = client.get(
+        f"{settings.API_V1_STR}/issues/{issue_id}", headers={**outsider_headers, "If-None-Match": "*"}
+    )
+    assert response.status_code == 403
+
+def test_list_serialization_matches_response_model(client: TestClient):
+    user = create_random_user(client)
+    headers = user_authentication_headers(client, user["email"], user["password"])
+    project_id = client.post(
+        f"{settings.API_V1_STR}/projects/", headers=headers, json={"name": "Fast", "key": "FASTJSON"}
+    ).json()["id"]
+    issue_id = client.post(
+        f"{settings.API_V1_STR}/issues/", headers=headers,
+        json={"title": "Fast", "description": "ünïcode", "priority": "critical", "project_id": project_id},
+    ).json()["id"]
+    client.patch(f"{settings.API_V1_STR}/issues/{issue_id}", headers=headers, json={"status": "resolved"})
+
+    # The list path skips pydantic; its items must match the validated detail response
+    listed = client.get(
+        f"{settings.API_V1_STR}/issues/", headers=headers, params={"project_id": project_id}
+    ).json()["items"]
+    detail = client.get(f"{settings.API_V1_STR}/issues/{issue_id}", headers=headers).json()
+    assert listed == [detail]
+
+def test_read_issue_detail(client: TestClient, statements):
+    maintainer = create_random_user(client)
+    headers = user_authentication_headers(client, maintainer["email"], maintainer["password"])
+    member = create_random_user(client)
+    member_headers = user_authentication_headers(client, member["email"], member["password"])
+    project_id = client.post(
+        f"{settings.API_V1_STR}/projects/", headers=headers, json={"name": "Detail", "key": "DETAIL"}
+    ).json()["id"]
+    client.post(f"{settings.API_V1_STR}/projects/{project_id}/members", headers=headers, json={"user_id": member["id"]})
+    issue_id = client.post(
+        f"{settings.API_V1_STR}/issues/", headers=headers,
+        json={"title": "Detailed", "project_id": project_id, "assignee_id": member["id"]},
+    ).json()["id"]
+    for n, author_headers in enumerate([headers, member_headers, headers]):
+        client.post(f"{settings.API_V1_STR}/comments/issue/{issue_id}", headers=author_headers, json={"body": f"C{n}"})
+    url = f"{settings.API_V1_STR}/issues/{issue_id}/detail"
+
+    detail = client.get(url, headers=member_headers).json()
+    assert detail["issue"]["title"] == "Detailed" and detail["issue"]["comment_count"] == 3
+    assert detail["reporter"]["email"] == maintainer["email"]
+    assert detail["assignee"]["id"] == member["id"]
+    assert detail["role"] == "member"
+    assert detail["comments"] is None and detail["members"] is None
+
+    statements.clear()
+    detail = client.get(
+        url, headers=headers, params={"include": ["comments", "members"], "comment_limit": 2}
+    ).json()
+    sql = list(statements)
+    assert detail["role"] == "maintainer"
+    assert [(c["body"], c["author"]["id"]) for c in detail["comments"]] == [("C0", maintainer["id"]), ("C1", member["id"])]
+    rest = client.get(
+        f"{settings.API_V1_STR}/comments/issue/{issue_id}", headers=headers,
+        params={"cursor": detail["comments_next_cursor"]},
+    ).json()
+    assert [c["body"] for c in rest] == ["C2"]
+    assert [(m["user_id"], m["role"], m["user"]["email"]) for m in detail["members"]] == [
+        (maintainer["id"], "maintainer", maintainer["email"]), (member["id"], "member", member["email"]),
+    ]
+    assert detail["members_next_cursor"] is None
+    # Users of every section come from one query
+    # Issue, membership (unless cached), comments, members, and every user in one query
+    assert len(sql) <= 5
+    assert len([s for s in sql if s.startswith("SELECT user.")]) == 1
+
+    outsider = create_random_user(client)
+    outsider_headers = user_authentication_headers(client, outsider["email"], outsider["password"])
+    assert client.get(url, headers=outsider_headers).status_code == 403
+    assert client.get(f"{settings.API_V1_STR}/issues/999999/detail", headers=headers).status_code == 404
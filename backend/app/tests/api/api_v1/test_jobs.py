@@ -0,0 +1,139 @@
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db import jobs
+from app.models.job import Job
+from app.tests.conftest import TestingSessionLocal
+from app.tests.utils.utils import create_random_user, user_authentication_headers
+
+@pytest.fixture
+def runner() -> jobs.JobRunner:
+    return jobs.JobRunner(TestingSessionLocal, workers=1)
+
+@pytest.fixture
+def test_handler():
+    calls = []
+    failures = []
+
+    @jobs.handler("test.batch", batch_size=10)
+    def run(db: Session, payloads):
+        calls.append(payloads)
+        if failures:
+            raise RuntimeError(failures.pop())
+
+    yield calls, failures
+    del jobs.HANDLERS["test.batch"]
+
+def test_comment_notifications_run_as_jobs(client: TestClient, db: Session, runner, caplog):
+    reporter = create_random_user(client)
+    reporter_headers = user_authentication_headers(client, reporter["email"], reporter["password"])
+    commenter = create_random_user(client)
+    commenter_headers = user_authentication_headers(client, commenter["email"], commenter["password"])
+    project = client.post(
+        f"{settings.API_V1_STR}/projects/", headers=reporter_headers,
+        json={"name": "Jobs Proj", "key": "JOBS", "description": "D"},
+    ).json()
+    client.post(f"{settings.API_V1_STR}/projects/{project['id']}/members", headers=reporter_headers,
+                json={"user_id": commenter["id"]})
+    issue = client.post(
+        f"{settings.API_V1_STR}/issues/", headers=reporter_headers,
+        json={"title": "Notify me", "project_id": project["id"]},
+    ).json()
+    client.patch(f"{settings.API_V1_STR}/issues/{issue['id']}", headers=reporter_headers,
+                 json={"assignee_id": commenter["id"]})
+    comment = client.post(
+        f"{settings.API_V1_STR}/comments/issue/{issue['id']}", headers=commenter_headers, json={"body": "Mine"}
+    ).json()
+
+    # Enqueued with the writes, run later
+    queued = db.query(Job.kind, Job.payload).filter(Job.status == "pending").all()
+    assert ("notify.comment", {"comment_id": comment["id"]}) in queued
+    with caplog.at_level(logging.INFO, logger="app.notifications"):
+        runner.run_pending()
+    assert db.query(Job).filter(Job.status == "pending").count() == 0
+    messages = [r.getMessage() for r in caplog.records if r.name == "app.notifications"]
+    assert f"notify user {commenter['id']} about issue {issue['id']}: you were assigned 'Notify me'" in messages
+    assert f"notify user {reporter['id']} about issue {issue['id']}: new comment on 'Notify me'" in messages
+    assert not any(m.startswith(f"notify user {commenter['id']} about issue {issue['id']}: new comment")
+                   for m in messages)
+
+def test_jobs_are_batched_and_retried(db: Session, runner, test_handler):
+    calls, failures = test_handler
+    jobs.enqueue(db, "test.batch", [{"n": n} for n in range(3)])
+    db.commit()
+
+    failures.append("flaky")
+    runner.run_pending()
+    assert calls == [[{"n": 0}, {"n": 1}, {"n": 2}]]
+    retried = db.query(Job).filter(Job.kind == "test.batch").all()
+    assert {(j.status, j.attempts) for j in retried} == {("pending", 1)}
+    assert "flaky" in retried[0].last_error
+    assert retried[0].run_after.replace(tzinfo=timezone.utc) > datetime.now(timezone.utc)
+    assert jobs.retry_delay(1) == settings.JOBS_RETRY_BASE and jobs.retry_delay(2) == 2 * settings.JOBS_RETRY_BASE
+
+    # Not due yet
+    runner.run_pending()
+    assert len(calls) == 1
+
+    db.query(Job).filter(Job.kind == "test.batch").update({"run_after": datetime.now(timezone.utc) - timedelta(seconds=1)})
+    db.commit()
+    runner.run_pending()
+    assert len(calls) == 2
+    assert db.query(Job).filter(Job.kind == "test.batch").count() == 0
+
+def test_jobs_fail_after_max_attempts(db: Session, runner, test_handler, monkeypatch):
+    calls, failures = test_handler
+    monkeypatch.setattr(settings, "JOBS_MAX_ATTEMPTS", 1)
+    jobs.enqueue(db, "test.batch", [{"n": 0}])
+    jobs.enqueue(db, "test.unknown", [{}])
+    db.commit()
+    failures.append("broken")
+    runner.run_pending()
+    failed = {j.kind: j for j in db.query(Job).filter(Job.kind.like("test.%"))}
+    assert failed["test.batch"].status == failed["test.unknown"].status == "failed"
+    assert "no handler" in failed["test.unknown"].last_error
+    db.query(Job).filter(Job.kind.like("test.%")).delete(synchronize_session=False)
+    db.commit()
+
+def test_maintenance_jobs(client: TestClient, db: Session, runner):
+    user = create_random_user(client)
+    headers = user_authentication_headers(client, user["email"], user["password"])
+    project = client.post(
+        f"{settings.API_V1_STR}/projects/", headers=headers,
+        json={"name": "Maintained", "key": "MAINT", "description": "D"},
+    ).json()
+    issue = client.post(
+        f"{settings.API_V1_STR}/issues/", headers=headers,
+        json={"title": "Reindexed zebra", "project_id": project["id"]},
+    ).json()
+    jobs.enqueue(db, "search.reindex", [{"issue_id": issue["id"]}])
+    jobs.enqueue(db, "issue_stats.rebuild", [{"project_id": project["id"]}])
+    db.commit()
+    runner.run_pending()
+    assert db.query(Job).filter(Job.kind.in_(["search.reindex", "issue_stats.rebuild"])).count() == 0
+
+    found = client.get(f"{settings.API_V1_STR}/issues/", headers=headers, params={"q": "zebra"}).json()
+    assert [i["id"] for i in found["items"]] == [issue["id"]]
+    stats = client.get(f"{settings.API_V1_STR}/projects/{project['id']}/stats", headers=headers).json()
+    assert stats["total"] == 1
+
+def test_commits_wake_every_idle_worker(db: Session, test_handler, monkeypatch):
+    calls, _ = test_handler
+    monkeypatch.setattr(settings, "JOBS_POLL_INTERVAL", 30)
+    runner = jobs.JobRunner(TestingSessionLocal, workers=3)
+    runner.start()
+    try:
+        for n in range(3):
+            jobs.enqueue(db, "test.batch", [{"n": n}])
+            db.commit()
+            deadline = time.monotonic() + 5
+            while len(calls) <= n and time.monotonic() < deadline:
+                time.sleep(0.01)
+            # Picked up at once rather than at the next poll
+            assert len(calls) == n + 1
+    finally:
+        runner.stop()
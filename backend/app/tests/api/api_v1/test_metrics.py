@@ -0,0 +1,75 @@
+import asyncio
+from fastapi.testclient import TestClient
+from starlette.responses import StreamingResponse
+from app.api.metrics import UNMATCHED, MetricsMiddleware, request_seconds, scrape_allowed
+from app.core.config import settings
+from app.tests.utils.utils import create_random_user, user_authentication_headers
+
+def parse_metrics(text: str) -> dict:
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+def test_metrics(client: TestClient, monkeypatch):
+    user = create_random_user(client)
+    headers = user_authentication_headers(client, user["email"], user["password"])
+    project = client.post(
+        f"{settings.API_V1_STR}/projects/", headers=headers,
+        json={"name": "Metrics Proj", "key": "METRICS", "description": "D"},
+    ).json()
+    for _ in range(2):
+        assert client.get(f"{settings.API_V1_STR}/projects/{project['id']}", headers=headers).status_code == 200
+    assert client.get("/no-such-page").status_code == 404
+
+    # Only scrapers in the allowed networks get an answer
+    assert scrape_allowed("10.1.2.3") and not scrape_allowed("203.0.113.5")
+    assert client.get("/metrics").status_code == 403
+    monkeypatch.setattr(settings, "METRICS_ALLOWED_NETWORKS", ["127.0.0.1/32"])
+    assert client.get("/metrics").status_code == 403
+    monkeypatch.setattr(settings, "METRICS_ALLOWED_NETWORKS", [])
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = parse_metrics(response.text)
+
+    # Labelled by route template, not by path
+    route = f'method="GET",route="{settings.API_V1_STR}/projects/{{id}}"'
+    assert samples[f'http_requests_total{{{route},status="200"}}'] >= 2
+    assert samples[f"http_request_duration_seconds_count{{{route}}}"] >= 2
+    assert samples[f'http_request_duration_seconds_bucket{{{route},le="+Inf"}}'] >= 2
+    assert samples[f"http_request_db_statements_count{{{route}}}"] >= 2
+    assert samples[f"http_request_db_statements_sum{{{route}}}"] >= 1
+    assert samples['http_requests_total{method="GET",route="<unmatched>",status="404"}'] >= 1
+    assert not any("/projects/" + str(project["id"]) in name for name in samples)
+
+    # The scrape itself is in flight
+    assert samples['http_requests_in_progress{method="GET"}'] == 1
+    engine = "async" if settings.ASYNC_DB else "primary"
+    assert samples[f'db_statements_total{{engine="{engine}"}}'] > 0
+    assert 'db_pool_size{engine="primary"}' in samples
+
+def test_streamed_latency_stops_at_response_start():
+    async def chunks():
+        yield b"first"
+        await asyncio.sleep(0.3)
+        yield b"later"
+
+    async def scenario() -> None:
+        app = MetricsMiddleware(StreamingResponse(chunks(), media_type="text/event-stream"))
+        scope = {"type": "http", "method": "TRACE", "path": "/stream", "headers": []}
+
+        async def receive():
+            await asyncio.sleep(1)
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            pass
+
+        await app(scope, receive, send)
+
+    asyncio.run(scenario())
+    buckets, total = request_seconds._values[("TRACE", UNMATCHED)]
+    assert sum(buckets) == 1 and total < 0.2
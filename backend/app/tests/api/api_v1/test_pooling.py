@@ -0,0 +1,46 @@
+import logging
+import anyio
+from anyio import to_thread
+from sqlalchemy.pool import NullPool, QueuePool
+from app.core.config import settings
+from app.db.session import configure_threadpool, engine_options
+
+def test_engine_options(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 7)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 3)
+    options = engine_options("postgresql://u:p@db/issuehub", "test")
+    assert issubclass(options["poolclass"], QueuePool)
+    assert (options["pool_size"], options["max_overflow"]) == (7, 3)
+    assert options["pool_pre_ping"] is False
+
+    monkeypatch.setattr(settings, "DB_POOL_MODE", "pgbouncer")
+    options = engine_options("postgresql+asyncpg://u:p@pgbouncer/issuehub", "test")
+    assert issubclass(options["poolclass"], NullPool)
+    assert "pool_size" not in options
+    connect_args = options["connect_args"]
+    assert connect_args["statement_cache_size"] == connect_args["prepared_statement_cache_size"] == 0
+    assert connect_args["prepared_statement_name_func"]() != connect_args["prepared_statement_name_func"]()
+    assert "connect_args" not in engine_options("postgresql://u:p@pgbouncer/issuehub", "test")
+
+def test_threadpool_follows_pool(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 6)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 2)
+
+    async def configure():
+        threads = configure_threadpool()
+        return threads, to_thread.current_default_thread_limiter().total_tokens
+
+    with caplog.at_level(logging.WARNING, logger="app.db.session"):
+        assert anyio.run(configure) == (8, 8)
+        assert not caplog.records
+
+        monkeypatch.setattr(settings, "THREADPOOL_SIZE", 40)
+        assert anyio.run(configure) == (40, 40)
+        assert "exceeds the 8 pooled connections" in caplog.text
+
+        caplog.clear()
+        monkeypatch.setattr(settings, "THREADPOOL_SIZE", None)
+        monkeypatch.setattr(settings, "WEB_CONCURRENCY", 4)
+        monkeypatch.setattr(settings, "DB_MAX_CONNECTIONS", 20)
+        anyio.run(configure)
+        assert "4 workers x 8 connections = 32 exceeds DB_MAX_CONNECTIONS=20" in caplog.text
@@ -0,0 +1,67 @@
+import logging
+from fastapi.testclient import TestClient
+from app.api.profiler import PROFILE_HEADER, statement_shape
+from app.core.config import settings
+from app.models import User
+from app.tests.utils.utils import create_random_user, user_authentication_headers
+
+def parse_summary(header: str) -> dict:
+    return dict(part.split("=", 1) for part in header.split("; "))
+
+def test_sql_profiler(client: TestClient, db, monkeypatch):
+    user = create_random_user(client)
+    headers = user_authentication_headers(client, user["email"], user["password"])
+    admin = create_random_user(client)
+    db.query(User).filter(User.id == admin["id"]).update({"role": "maintainer"})
+    db.commit()
+    admin_headers = user_authentication_headers(client, admin["email"], admin["password"])
+    project = client.post(
+        f"{settings.API_V1_STR}/projects/", headers=headers,
+        json={"name": "Profiled Proj", "key": "PROFILED", "description": "D"},
+    ).json()
+    batch = {"items": [{"title": f"Profiled {n}", "project_id": project["id"]} for n in range(4)]}
+
+    monkeypatch.setattr(settings, "SQL_PROFILER", "off")
+    response = client.get(f"{settings.API_V1_STR}/projects/{project['id']}", headers=headers)
+    assert PROFILE_HEADER not in response.headers
+
+    monkeypatch.setattr(settings, "SQL_PROFILER", "header")
+    response = client.get(f"{settings.API_V1_STR}/projects/{project['id']}", headers=headers)
+    assert PROFILE_HEADER not in response.headers
+
+    response = client.post(
+        f"{settings.API_V1_STR}/issues/batch", headers={**headers, "X-Debug-SQL": "1"}, json=batch
+    )
+    assert response.status_code == 200
+    summary = parse_summary(response.headers[PROFILE_HEADER])
+    assert int(summary["statements"]) >= 1
+
+    # Profiles hold statement text: admins only
+    assert client.get(f"/debug/requests/{summary['id']}").status_code == 401
+    assert client.get(f"/debug/requests/{summary['id']}", headers=headers).status_code == 403
+    profile = client.get(f"/debug/requests/{summary['id']}", headers=admin_headers).json()
+    assert profile["route"] == f"{settings.API_V1_STR}/issues/batch"
+    assert profile["status"] == 200
+    assert profile["statements"] == len(profile["queries"]) == int(summary["statements"])
+    assert all("Profiled" not in q["parameters"] for q in profile["queries"])  # shapes, not values
+    # SQLite runs one INSERT per issue: flagged as a repeated statement
+    inserts = [r for r in profile["repeated"] if r["statement"].startswith("INSERT INTO issue ")]
+    assert inserts and inserts[0]["count"] == 4
+    assert int(summary["repeated"]) == len(profile["repeated"])
+
+    assert client.get("/debug/requests/unknown", headers=admin_headers).status_code == 404
+    monkeypatch.setattr(settings, "SQL_PROFILER", "off")
+    assert client.get(f"/debug/requests/{summary['id']}", headers=admin_headers).status_code == 404
+
+def test_statement_shape():
+    assert statement_shape("SELECT *\n  FROM issue WHERE id IN (?, ?, ?)") == "SELECT * FROM issue WHERE id IN (?...)"
+    assert statement_shape("SELECT 1 WHERE a IN (%(a_1)s, %(a_2)s)") == statement_shape(
+        "SELECT 1 WHERE a IN (%(a_1)s, %(a_2)s, %(a_3)s)"
+    )
+
+def test_slow_query_log(client: TestClient, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "SLOW_QUERY_MS", 1e-6)
+    with caplog.at_level(logging.WARNING, logger="app.db.instrumentation"):
+        client.get(f"{settings.API_V1_STR}/users/me", headers={"Authorization": "Bearer invalid"})
+        create_random_user(client)
+    assert any("slow query" in r.getMessage() for r in caplog.records)
@@ -1,5 +1,10 @@
+import csv
+import io
+import json
 from fastapi.testclient import TestClient
 from app.core.config import settings
+from app.db.issue_stats import rebuild_issue_stats
+from app.models.issue import Issue
 from app.tests.utils.utils import create_random_user, user_authentication_headers
 
 def test_create_project(client: TestClient):
@@ -31,3 +36,176 @@ def test_read_projects(client: TestClient):
     content = response.json()
     assert len(content) >= 1
     assert content[0]["key"] == "MYPROJ"
+
+def test_export_project(client: TestClient):
+    user = create_random_user(client)
+    headers = user_authentication_headers(client, user["email"], user["password"])
+    project_id = client.post(
+        f"{settings.API_V1_STR}/projects/", headers=headers, json={"name": "Export", "key": "EXPORT"}
+    ).json()["id"]
+    issue_ids = [
+        client.post(
+            f"{settings.API_V1_STR}/issues/", headers=headers,
+            json={"title": f"Export {n}", "description": 'says "hi",\nthen leaves', "project_id": project_id},
+        ).json()["id"]
+        for n in range(3)
+    ]
+    client.post(f"{settings.API_V1_STR}/comments/issue/{issue_ids[0]}", headers=headers, json={"body": "first"})
+
+    response = client.get(f"{settings.API_V1_STR}/projects/{project_id}/export", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [(r["type"], r["id"]) for r in records[:3]] == [("issue", i) for i in issue_ids]
+    assert records[3]["type"] == "comment" and records[3]["body"] == "first"
+
+    response = client.get(
+        f"{settings.API_V1_STR}/projects/{project_id}/export",
+        headers=headers, params={"format": "csv", "resource": "issues", "gzip": True},
+    )
+    assert response.headers["content-encoding"] == "gzip"
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [int(r["id"]) for r in rows] == issue_ids
+    assert rows[0]["description"] == 'says "hi",\nthen leaves'
+
+    response = client.get(
+        f"{settings.API_V1_STR}/projects/{project_id}/export", headers=headers, params={"format": "csv"}
+    )
+    assert response.status_code == 400
+
+    outsider = create_random_user(client)
+    outsider_headers = user_authentication_headers(client, outsider["email"], outsider["password"])
+    response = client.get(f"{settings.API_V1_STR}/projects/{project_id}/export", headers=outsider_headers)
+    assert response.status_code == 403
+
+def test_project_stats(client: TestClient, db):
+    user = create_random_user(client)
+    headers = user_authentication_headers(client, user["email"], user["password"])
+    project_id = client.post(
+        f"{settings.API_V1_STR}/projects/", headers=headers, json={"name": "Stats", "key": "STATS"}
+    ).json()["id"]
+    me = client.get(f"{settings.API_V1_STR}/users/me", headers=headers).json()["id"]
+
+    first = client.post(
+        f"{settings.API_V1_STR}/issues/", headers=headers, json={"title": "One", "project_id": project_id}
+    ).json()["id"]
+    client.post(f"{settings.API_V1_STR}/issues/batch", headers=headers, json={"items": [
+        {"title": "Two", "project_id": project_id, "priority": "high", "assignee_id": me},
+        {"title": "Three", "project_id": project_id, "status": "closed"},
+    ]})
+    client.patch(f"{settings.API_V1_STR}/issues/{first}", headers=headers, json={"status": "in_progress"})
+
+    expected = {
+        "project_id": project_id,
+        "total": 3,
+        "by_status": {"open": 1, "in_progress": 1, "closed": 1},
+        "by_priority": {"medium": 2, "high": 1},
+        "by_assignee": {str(me): 1},
+        "unassigned": 2,
+    }
+    response = client.get(f"{settings.API_V1_STR}/projects/{project_id}/stats", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == expected
+    all_stats = client.get(f"{settings.API_V1_STR}/projects/stats", headers=headers).json()
+    assert all_stats == [expected]
+
+    # Drift from a bulk write is repaired by a rebuild
+    db.query(Issue).filter(Issue.project_id == project_id).update({"status": "resolved"})
+    rebuild_issue_stats(db, [project_id])
+    db.commit()
+    response = client.get(f"{settings.API_V1_STR}/projects/{project_id}/stats", headers=headers)
+    assert response.json()["by_status"] == {"resolved": 3}
+
+def test_read_project_conditional(client: TestClient):
+    user = create_random_user(client)
+    headers = user_authentication_headers(client, user["email"], user["password"])
+    project_id = client.post(
+        f"{settings.API_V1_STR}/projects/", headers=headers, json={"name": "Cached", "key": "CACHED"}
+    ).json()["id"]
+    url = f"{settings.API_V1_STR}/projects/{project_id}"
+
+    etag = client.get(url, headers=headers).headers["etag"]
+    assert client.get(url, headers={**headers, "If-None-Match": f'W/{etag}, "other"'}).status_code == 304
+    client.patch(url, headers=headers, json={"description": "Changed"})
+    assert client.get(url, headers={**headers, "If-None-Match": etag}).status_code == 200
+
+def test_write_statement_counts(client: TestClient, statements):
+    user = create_random_user(client)
+    other = create_random_user(client)
+    headers = user_authentication_headers(client, user["email"], user["password"])
+
+    def write(method, url, **kwargs):
+        statements.clear()
+        response = getattr(client, method)(f"{settings.API_V1_STR}{url}", headers=headers, **kwargs)
+        assert response.status_code == 200
+        return response.json(), [" ".join(s.split()[:3]) for s in statements]
+
+    # Project and creator membership in one transaction, ids and created_at via RETURNING
+    project, sql = write("post", "/projects/", json={"name": "Writes", "key": "WRITES"})
+    assert sql == ["INSERT INTO project", "INSERT INTO projectmember", "INSERT INTO changelog"]
+    assert project["created_at"]
+
+    issue, sql = write("post", "/issues/", json={"title": "Write", "project_id": project["id"]})
+    assert sql == ["SELECT projectmember.id AS", "INSERT INTO issue", "INSERT INTO issuestat", "INSERT INTO changelog"]
+    assert issue["created_at"] and issue["updated_at"] is None
+
+    updated, sql = write("patch", f"/issues/{issue['id']}", json={"status": "closed"})
+    assert sql == ["SELECT issue.id AS", "UPDATE issue SET", "INSERT INTO issuestat", "INSERT INTO changelog"]
+    assert updated["updated_at"]
+
+    comment, sql = write("post", f"/comments/issue/{issue['id']}", json={"body": "Write"})
+    assert sql == [
+        "SELECT issue.project_id AS", "INSERT INTO comment", "UPDATE issue SET", "INSERT INTO changelog", "INSERT INTO job"
+    ]
+    assert comment["created_at"]
+
+    _, sql = write("patch", f"/projects/{project['id']}", json={"description": "Changed"})
+    assert sql == ["SELECT project.id AS", "UPDATE project SET", "INSERT INTO changelog"]
+
+    _, sql = write("post", f"/projects/{project['id']}/members", json={"user_id": other["id"]})
+    assert sql == ["SELECT user.id AS", "INSERT INTO projectmember", "INSERT INTO changelog"]
+
+    response = client.post(
+        f"{settings.API_V1_STR}/projects/", headers=headers, json={"name": "Again", "key": "WRITES"}
+    )
+    assert response.status_code == 400
+
+def test_project_members_without_n_plus_one(client: TestClient, statements):
+    owner = create_random_user(client)
+    headers = user_authentication_headers(client, owner["email"], owner["password"])
+    project_id = client.post(
+        f"{settings.API_V1_STR}/projects/", headers=headers, json={"name": "Members", "key": "MEMBERS"}
+    ).json()["id"]
+    members = [create_random_user(client) for _ in range(4)]
+    for member in members:
+        client.post(f"{settings.API_V1_STR}/projects/{project_id}/members", headers=headers, json={"user_id": member["id"]})
+
+    statements.clear()
+    response = client.get(f"{settings.API_V1_STR}/projects/{project_id}/members", headers=headers)
+    assert response.status_code == 200
+    assert sorted(m["user"]["email"] for m in response.json()) == sorted(m["email"] for m in members)
+    # Members and their users come back in a single query, however many there are
+    assert len([s for s in statements if "FROM projectmember" in s]) == 1
+    assert not any(s.lstrip().startswith("SELECT user.") for s in statements)
+
+    statements.clear()
+    response = client.get(f"{settings.API_V1_STR}/projects/", headers=headers)
+    assert [p["id"] for p in response.json()] == [project_id]
+    assert len(statements) == 1
+
+def test_add_member_twice(client: TestClient):
+    owner = create_random_user(client)
+    headers = user_authentication_headers(client, owner["email"], owner["password"])
+    project_id = client.post(
+        f"{settings.API_V1_STR}/projects/", headers=headers, json={"name": "Twice", "key": "TWICE"}
+    ).json()["id"]
+    member = create_random_user(client)
+    url = f"{settings.API_V1_STR}/projects/{project_id}/members"
+    assert client.post(url, headers=headers, json={"user_id": member["id"]}).status_code == 200
+
+    # Rejected by the unique constraint, leaving the first membership as it was
+    response = client.post(url, headers=headers, json={"user_id": member["id"], "role": "maintainer"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "User is already a member"
+    members = client.get(url, headers=headers).json()
+    assert [(m["user_id"], m["role"]) for m in members] == [(member["id"], "member")]
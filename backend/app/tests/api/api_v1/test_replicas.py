@@ -0,0 +1,57 @@
+import os
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db import replicas
+from app.db.base_class import Base
+from app.models import Project
+from app.tests.utils.utils import create_random_user, user_authentication_headers
+
+REPLICA_PATH = "./test_replica.db"
+
+@pytest.fixture
+def replica_set(monkeypatch):
+    # Two stand-ins: an empty SQLite replica (so reads served by it are easy
+    # to tell apart) and one that cannot be opened. NullPool (the pgbouncer
+    # profile) keeps no aiosqlite connections beyond the test client's loop.
+    monkeypatch.setattr(settings, "DB_POOL_MODE", "pgbouncer")
+    stand_ins = replicas.ReplicaSet.from_urls(
+        [f"sqlite:///{REPLICA_PATH}", "sqlite:////nonexistent/replica.db"], async_db=settings.ASYNC_DB
+    )
+    Base.metadata.create_all(stand_ins.replicas[0].engine)
+    monkeypatch.setattr(replicas, "replica_set", stand_ins)
+    yield stand_ins
+    os.remove(REPLICA_PATH)
+
+def test_read_replica_routing(client: TestClient, replica_set):
+    replica_set.check()
+    healthy, broken = replica_set.replicas
+    assert healthy.healthy and not broken.healthy
+
+    user = create_random_user(client)
+    headers = user_authentication_headers(client, user["email"], user["password"])
+    project = client.post(
+        f"{settings.API_V1_STR}/projects/", headers=headers,
+        json={"name": "Replica Proj", "key": "REPLICA", "description": "D"},
+    ).json()
+
+    # Read-your-writes: pinned to the primary right after writing
+    projects = client.get(f"{settings.API_V1_STR}/projects/", headers=headers).json()
+    assert [p["id"] for p in projects] == [project["id"]]
+
+    # Once the pin expires reads go to the (empty) replica
+    replica_set._pins.clear()
+    assert client.get(f"{settings.API_V1_STR}/projects/", headers=headers).json() == []
+
+    # ... and back to the primary when no replica is healthy
+    healthy.mark_down("test")
+    projects = client.get(f"{settings.API_V1_STR}/projects/", headers=headers).json()
+    assert [p["id"] for p in projects] == [project["id"]]
+    assert healthy.check() and healthy.healthy
+
+def test_replica_sessions_refuse_writes(replica_set):
+    with Session(bind=replica_set.replicas[0].engine, info={"replica": "replica0"}) as db:
+        db.add(Project(name="Nope", key="NOPE"))
+        with pytest.raises(RuntimeError):
+            db.flush()
@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, func
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.changelog import compact_changelog, safe_watermark
+from app.models.change_log import ChangeLog
+from app.models.comment import Comment
+from app.models.issue import Issue
+from app.tests.utils.utils import create_random_user, user_authentication_headers
+
+def test_sync_returns_changes_since_cursor(client: TestClient):
+    user = create_random_user(client)
+    headers = user_authentication_headers(client, user["email"], user["password"])
+    project = client.post(
+        f"{settings.API_V1_STR}/projects/", headers=headers,
+        json={"name": "Sync Proj", "key": "SYNC", "description": "D"},
+    ).json()
+    issue = client.post(
+        f"{settings.API_V1_STR}/issues/", headers=headers,
+        json={"title": "Synced", "project_id": project["id"]},
+    ).json()
+    comment = client.post(
+        f"{settings.API_V1_STR}/comments/issue/{issue['id']}", headers=headers, json={"body": "Hi"}
+    ).json()
+
+    def sync(since, **params):
+        response = client.get(f"{settings.API_V1_STR}/sync/", headers=headers, params={"since": since, **params})
+        assert response.status_code == 200
+        return response.json()
+
+    everything = sync(0)
+    assert [p["id"] for p in everything["projects"]] == [project["id"]]
+    assert [m["user_id"] for m in everything["memberships"]] == [user["id"]]
+    assert [i["id"] for i in everything["issues"]] == [issue["id"]]
+    assert [c["id"] for c in everything["comments"]] == [comment["id"]]
+    assert not everything["has_more"]
+
+    # Two updates of one issue: sent once, as it is now
+    for status in ("in_progress", "resolved"):
+        client.patch(f"{settings.API_V1_STR}/issues/{issue['id']}", headers=headers, json={"status": status})
+    changes = sync(everything["cursor"])
+    assert [(i["id"], i["status"]) for i in changes["issues"]] == [(issue["id"], "resolved")]
+    assert changes["projects"] == changes["comments"] == changes["memberships"] == []
+
+    quiet = sync(changes["cursor"])
+    assert quiet["cursor"] == changes["cursor"] and quiet["issues"] == []
+
+    # Paging
+    first = sync(0, limit=2)
+    assert first["has_more"] and len(first["projects"]) + len(first["memberships"]) == 2
+    assert sync(first["cursor"])["issues"][0]["id"] == issue["id"]
+
+    # A new member is told to fetch the project's older rows
+    other = create_random_user(client)
+    other_headers = user_authentication_headers(client, other["email"], other["password"])
+    before = client.get(f"{settings.API_V1_STR}/sync/", headers=other_headers).json()
+    assert before["issues"] == []
+    client.post(f"{settings.API_V1_STR}/projects/{project['id']}/members", headers=headers,
+                json={"user_id": other["id"]})
+    joined = client.get(
+        f"{settings.API_V1_STR}/sync/", headers=other_headers, params={"since": before["cursor"]}
+    ).json()
+    assert joined["resync_projects"] == [project["id"]]
+    backfill = client.get(
+        f"{settings.API_V1_STR}/sync/", headers=other_headers, params={"project_id": project["id"]}
+    ).json()
+    assert [i["id"] for i in backfill["issues"]] == [issue["id"]]
+
+def test_watermark_waits_for_recent_gaps(client: TestClient, db: Session):
+    now = datetime.now(timezone.utc)
+    top = db.query(func.max(ChangeLog.id)).scalar() or 0
+    try:
+        # top + 1 is missing: maybe a transaction that has not committed yet
+        db.add(ChangeLog(id=top + 2, project_id=0, entity="issue", entity_id=0, changed_at=now))
+        db.flush()
+        assert safe_watermark(db, now) == top
+        # Long enough ago that it must have rolled back
+        later = now + timedelta(seconds=settings.SYNC_SETTLE_SECONDS + 1)
+        assert safe_watermark(db, later) == top + 2
+    finally:
+        db.rollback()
+
+def test_compaction_keeps_latest_entry_per_row(client: TestClient, db: Session):
+    user = create_random_user(client)
+    headers = user_authentication_headers(client, user["email"], user["password"])
+    project = client.post(
+        f"{settings.API_V1_STR}/projects/", headers=headers,
+        json={"name": "Compact Proj", "key": "COMPACT", "description": "D"},
+    ).json()
+    issue = client.post(
+        f"{settings.API_V1_STR}/issues/", headers=headers,
+        json={"title": "Churn", "project_id": project["id"]},
+    ).json()
+    for n in range(3):
+        client.patch(f"{settings.API_V1_STR}/issues/{issue['id']}", headers=headers, json={"title": f"Churn {n}"})
+
+    def entries():
+        return db.query(ChangeLog.id).filter(ChangeLog.entity == "issue", ChangeLog.entity_id == issue["id"]).all()
+
+    try:
+        assert len(entries()) == 4
+        assert compact_changelog(db) == 0  # all too recent
+        assert compact_changelog(db, older_than=0) >= 3
+        assert len(entries()) == 1
+    finally:
+        db.rollback()
+
+def test_deleting_issue_logs_its_comments(client: TestClient, db: Session):
+    user = create_random_user(client)
+    headers = user_authentication_headers(client, user["email"], user["password"])
+    project_id = client.post(
+        f"{settings.API_V1_STR}/projects/", headers=headers, json={"name": "Sync Del", "key": "SYNCDEL"}
+    ).json()["id"]
+    issue_ids = [
+        client.post(
+            f"{settings.API_V1_STR}/issues/", headers=headers, json={"title": f"Doomed {n}", "project_id": project_id}
+        ).json()["id"]
+        for n in range(2)
+    ]
+    comment_ids = [
+        client.post(f"{settings.API_V1_STR}/comments/issue/{issue_id}", headers=headers, json={"body": "Bye"}).json()["id"]
+        for issue_id in issue_ids
+    ]
+    since = client.get(f"{settings.API_V1_STR}/sync/", headers=headers, params={"project_id": project_id}).json()["cursor"]
+
+    # The comments go in the same flush as their issue
+    db.delete(db.get(Issue, issue_ids[0]))
+    db.commit()
+    # The issue row is gone before its comment is deleted
+    db.execute(delete(Issue).where(Issue.id == issue_ids[1]))
+    db.delete(db.get(Comment, comment_ids[1]))
+    db.commit()
+
+    deleted = client.get(
+        f"{settings.API_V1_STR}/sync/", headers=headers, params={"since": since, "project_id": project_id}
+    ).json()["deleted"]
+    assert deleted["issues"] == [issue_ids[0]]
+    assert deleted["comments"] == [comment_ids[0]]
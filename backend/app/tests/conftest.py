@@ -1,20 +1,45 @@
+import os
 from typing import Generator
 import pytest
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+# Minimum bcrypt cost keeps signup/login fast in tests
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+# Tests run queued jobs themselves, on the test database
+os.environ.setdefault("JOBS_IN_PROCESS", "false")
+# Mount /debug/requests; profiling itself still needs the X-Debug-SQL header
+os.environ.setdefault("SQL_PROFILER", "header")
 
 from app.db.base_class import Base
 from app.main import app
-from app.api.deps import get_db
+from app.api.api_v1.api import build_api_router
+from app.api.deps import get_db, get_async_db, get_stream_db
+from app.core.config import settings
+from app.db.instrumentation import instrument_engine
 
 # Use SQLite for testing
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+SQLALCHEMY_ASYNC_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
 )
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# Each TestClient runs its own event loop, so async connections are not pooled
+async_engine = create_async_engine(SQLALCHEMY_ASYNC_DATABASE_URL, poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+# Report the test engines on /metrics in place of the app's
+instrument_engine(engine, "primary")
+instrument_engine(async_engine.sync_engine, "async")
 
 @pytest.fixture(scope="session")
 def db() -> Generator:
@@ -31,9 +56,39 @@ def override_get_db():
     finally:
         db.close()
 
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
 @pytest.fixture(scope="module")
 def client(db) -> Generator: # Request db fixture to ensure tables exist
+    # Runs on aiosqlite when the suite is started with ASYNC_DB=true
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_stream_db] = override_get_db
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
+
+@pytest.fixture(scope="module")
+def async_client(db) -> Generator:
+    async_app = FastAPI()
+    async_app.include_router(build_api_router(async_db=True), prefix=settings.API_V1_STR)
+    async_app.dependency_overrides[get_async_db] = override_get_async_db
+    async_app.dependency_overrides[get_stream_db] = override_get_db
+    with TestClient(async_app) as c:
+        yield c
+
+@pytest.fixture
+def statements() -> Generator:
+    """
+    Collect the SQL statements executed (on either test engine) during a test.
+    """
+    seen = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        seen.append(statement)
+    for target in (engine, async_engine.sync_engine):
+        event.listen(target, "before_cursor_execute", record)
+    yield seen
+    for target in (engine, async_engine.sync_engine):
+        event.remove(target, "before_cursor_execute", record)
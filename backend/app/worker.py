@@ -0,0 +1,38 @@
+"""
+Background job worker, for running jobs outside the API processes:
+
+    PYTHONPATH=. JOBS_IN_PROCESS=false python -m app.worker --workers 4
+
+Set JOBS_IN_PROCESS=false on the API as well so only workers run jobs.
+--once runs the jobs due now and exits (e.g. from cron).
+"""
+import argparse
+import logging
+import signal
+import threading
+
+from app.api import notifications  # noqa: F401  register job handlers
+from app.db import maintenance  # noqa: F401  register job handlers
+from app.core.config import settings
+from app.db.jobs import JobRunner
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run background jobs.")
+    parser.add_argument("--workers", type=int, default=settings.JOBS_WORKERS)
+    parser.add_argument("--once", action="store_true", help="run the jobs due now, then exit")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    runner = JobRunner(workers=args.workers)
+    if args.once:
+        runner.run_pending()
+        return
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+    runner.start()
+    stop.wait()
+    runner.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Before/after benchmark for the composite indexes added in c3f1a9d27b64.
+
+Seeds two identical databases, one without the new indexes and unique
+constraint and one with them, then prints the query plan and the mean time of
+each hot query on both:
+
+    PYTHONPATH=. python -m benchmarks.indexes --issues 200000 --comments 500000
+
+Defaults to throwaway SQLite files (EXPLAIN QUERY PLAN). With --database-uri
+pointing at an empty Postgres database the plans come from EXPLAIN ANALYZE.
+"""
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import MetaData, create_engine, insert, text
+
+from app.db.base_class import Base
+import app.models  # noqa: F401  register tables
+
+NEW_INDEXES = {
+    "ix_projectmember_user_id_project_id",
+    "ix_issue_project_id_status_priority",
+    "ix_issue_assignee_id_status",
+    "ix_comment_issue_id_id",
+}
+NEW_CONSTRAINTS = {"uq_projectmember_project_id_user_id"}
+
+STATUSES = ["open", "in_progress", "resolved", "closed"]
+PRIORITIES = ["low", "medium", "high", "critical"]
+
+# name -> (SQL, parameter factory)
+QUERIES = {
+    "membership lookup": (
+        "SELECT * FROM projectmember WHERE project_id = :project_id AND user_id = :user_id",
+        lambda d: {"project_id": d.member[0], "user_id": d.member[1]},
+    ),
+    "visible projects": (
+        "SELECT project_id FROM projectmember WHERE user_id = :user_id",
+        lambda d: {"user_id": d.member[1]},
+    ),
+    "project issues by status/priority": (
+        "SELECT * FROM issue WHERE project_id = :project_id AND status = :status "
+        "AND priority = :priority ORDER BY id LIMIT 20",
+        lambda d: {"project_id": d.project(), "status": random.choice(STATUSES), "priority": random.choice(PRIORITIES)},
+    ),
+    "project issue count": (
+        "SELECT count(*) FROM issue WHERE project_id = :project_id",
+        lambda d: {"project_id": d.project()},
+    ),
+    "assignee inbox": (
+        "SELECT * FROM issue WHERE assignee_id = :user_id AND status = :status ORDER BY id LIMIT 20",
+        lambda d: {"user_id": d.user(), "status": random.choice(STATUSES)},
+    ),
+    "comment page": (
+        "SELECT * FROM comment WHERE issue_id = :issue_id AND id > :after ORDER BY id LIMIT 20",
+        lambda d: {"issue_id": d.issue(), "after": 0},
+    ),
+}
+
+class Dataset:
+    def __init__(self, users: int, projects: int, issues: int, comments: int, members_per_project: int):
+        self.users, self.projects, self.issues, self.comments = users, projects, issues, comments
+        self.members_per_project = members_per_project
+        self.member = (1, 1)
+
+    def user(self) -> int:
+        return random.randint(1, self.users)
+
+    def project(self) -> int:
+        return random.randint(1, self.projects)
+
+    def issue(self) -> int:
+        return random.randint(1, self.issues)
+
+def build_metadata(with_indexes: bool) -> MetaData:
+    metadata = MetaData()
+    for table in Base.metadata.sorted_tables:
+        copy = table.to_metadata(metadata)
+        if not with_indexes:
+            copy.indexes = {i for i in copy.indexes if i.name not in NEW_INDEXES}
+            for constraint in [c for c in copy.constraints if c.name in NEW_CONSTRAINTS]:
+                copy.constraints.discard(constraint)
+    return metadata
+
+def seed(engine, metadata: MetaData, data: Dataset, chunk: int = 20000) -> None:
+    rng = random.Random(42)
+    now = datetime.now(timezone.utc)
+    tables = metadata.tables
+
+    def bulk(table, rows):
+        with engine.begin() as conn:
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) == chunk:
+                    conn.execute(insert(table), batch)
+                    batch = []
+            if batch:
+                conn.execute(insert(table), batch)
+
+    bulk(tables["user"], (
+        {"id": n, "email": f"user{n}@example.com", "name": f"User {n}", "password_hash": "x",
+         "role": "user", "created_at": now}
+        for n in range(1, data.users + 1)
+    ))
+    bulk(tables["project"], (
+        {"id": n, "name": f"Project {n}", "key": f"P{n}", "created_at": now}
+        for n in range(1, data.projects + 1)
+    ))
+    memberships = set()
+    for project_id in range(1, data.projects + 1):
+        for user_id in rng.sample(range(1, data.users + 1), min(data.members_per_project, data.users)):
+            memberships.add((project_id, user_id))
+    data.member = sorted(memberships)[len(memberships) // 2]
+    bulk(tables["projectmember"], (
+        {"project_id": p, "user_id": u, "role": "member"} for p, u in sorted(memberships)
+    ))
+    bulk(tables["issue"], (
+        {"id": n, "project_id": rng.randint(1, data.projects), "title": f"Issue {n}",
+         "status": rng.choice(STATUSES), "priority": rng.choice(PRIORITIES),
+         "reporter_id": rng.randint(1, data.users), "assignee_id": rng.randint(1, data.users),
+         "created_at": now - timedelta(minutes=data.issues - n)}
+        for n in range(1, data.issues + 1)
+    ))
+    bulk(tables["comment"], (
+        {"issue_id": rng.randint(1, data.issues), "author_id": rng.randint(1, data.users),
+         "body": "comment", "created_at": now}
+        for _ in range(data.comments)
+    ))
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+def explain(conn, sql: str, params: dict) -> str:
+    if conn.dialect.name == "postgresql":
+        rows = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"), params)
+        return "\n".join(r[0] for r in rows)
+    rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params)
+    return "\n".join(r[-1] for r in rows)
+
+def measure(engine, data: Dataset, repeat: int) -> dict:
+    results = {}
+    with engine.connect() as conn:
+        for name, (sql, params) in QUERIES.items():
+            random.seed(7)
+            plan = explain(conn, sql, params(data))
+            started = time.perf_counter()
+            for _ in range(repeat):
+                conn.execute(text(sql), params(data)).fetchall()
+            results[name] = {"plan": plan, "ms": (time.perf_counter() - started) / repeat * 1000}
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-uri", default=None, help="empty database to seed (default: SQLite)")
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--projects", type=int, default=500)
+    parser.add_argument("--issues", type=int, default=200000)
+    parser.add_argument("--comments", type=int, default=500000)
+    parser.add_argument("--members-per-project", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    data = Dataset(args.users, args.projects, args.issues, args.comments, args.members_per_project)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, with_indexes in (("before", False), ("after", True)):
+            uri = args.database_uri or f"sqlite:///{tmp}/{label}.db"
+            engine = create_engine(uri)
+            metadata = build_metadata(with_indexes)
+            metadata.drop_all(engine)
+            metadata.create_all(engine)
+            started = time.perf_counter()
+            seed(engine, metadata, data)
+            print(f"seeded {label} in {time.perf_counter() - started:.1f}s")
+            results[label] = measure(engine, data, args.repeat)
+            if args.database_uri:
+                metadata.drop_all(engine)
+            engine.dispose()
+
+    for name in QUERIES:
+        before, after = results["before"][name], results["after"][name]
+        print(f"\n== {name}: {before['ms']:.3f} ms -> {after['ms']:.3f} ms "
+              f"({before['ms'] / max(after['ms'], 1e-9):.1f}x)")
+        print("  before: " + before["plan"].replace("\n", "\n          "))
+        print("  after:  " + after["plan"].replace("\n", "\n          "))
+
+if __name__ == "__main__":
+    main()
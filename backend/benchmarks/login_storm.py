@@ -0,0 +1,97 @@
+"""
+Login storm benchmark: does the rest of the API stay responsive?
+
+Measures GET /projects/ latency at rest, then again while `--concurrency`
+clients hammer /auth/login, and reports login throughput and shed (503) logins:
+
+    PYTHONPATH=. python -m benchmarks.login_storm --concurrency 64 --duration 10
+
+Pass --app-dir with a checkout of an older commit to get the "before" numbers.
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+import httpx
+from sqlalchemy import create_engine
+
+from benchmarks.server import run_server
+
+API = "/api/v1"
+EMAIL, PASSWORD = "storm@example.com", "storm-password"
+
+def summarize(latencies: list) -> str:
+    latencies = sorted(latencies)
+    if not latencies:
+        return "no samples"
+    return (f"p50 {statistics.median(latencies) * 1000:7.1f} ms  "
+            f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:7.1f} ms  "
+            f"max {latencies[-1] * 1000:7.1f} ms  ({len(latencies)} samples)")
+
+async def probe(client: httpx.AsyncClient, headers: dict, until: float) -> list:
+    latencies = []
+    while time.perf_counter() < until:
+        started = time.perf_counter()
+        await client.get(f"{API}/projects/", headers=headers)
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0.02)
+    return latencies
+
+async def storm(base_url: str, concurrency: int, until: float) -> dict:
+    counts = {"ok": 0, "shed": 0, "other": 0}
+
+    async def worker() -> None:
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+            while time.perf_counter() < until:
+                response = await client.post(
+                    f"{API}/auth/login", data={"username": EMAIL, "password": PASSWORD}
+                )
+                key = {200: "ok", 503: "shed"}.get(response.status_code, "other")
+                counts[key] += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return counts
+
+async def run(base_url: str, args) -> None:
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        await client.post(f"{API}/auth/signup", json={"email": EMAIL, "password": PASSWORD})
+        token = (await client.post(
+            f"{API}/auth/login", data={"username": EMAIL, "password": PASSWORD}
+        )).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        await client.post(f"{API}/projects/", headers=headers, json={"name": "Storm", "key": "STORM"})
+
+        idle = await probe(client, headers, time.perf_counter() + args.duration / 2)
+        print(f"idle   /projects/: {summarize(idle)}")
+
+        until = time.perf_counter() + args.duration
+        started = time.perf_counter()
+        busy, counts = await asyncio.gather(
+            probe(client, headers, until), storm(base_url, args.concurrency, until)
+        )
+        elapsed = time.perf_counter() - started
+        print(f"storm  /projects/: {summarize(busy)}")
+        print(f"logins: {counts['ok'] / elapsed:.1f}/s ok, {counts['shed']} shed (503), "
+              f"{counts['other']} other errors")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--app-dir", default=None, help="backend checkout to run (default: this one)")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_uri = f"sqlite:///{tmp}/storm.db"
+        from app.db.base_class import Base
+        import app.models  # noqa: F401  register tables
+        Base.metadata.create_all(create_engine(database_uri))
+        env = {"SQLALCHEMY_DATABASE_URI": database_uri}
+        with run_server(env, args.port, app_dir=args.app_dir) as base_url:
+            asyncio.run(run(base_url, args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Search latency against issue count.
+
+For each size, seeds a fresh database with random issues and comments, then
+times `q=` searches through the full-text index (the query read_issues runs)
+next to the unindexed LIKE '%term%' scan they replace:
+
+    PYTHONPATH=. python -m benchmarks.search --sizes 1000 10000 100000
+
+Defaults to throwaway SQLite files (FTS5). With --database-uri pointing at an
+empty Postgres database the tsvector/GIN index is measured instead.
+"""
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine, insert, or_
+from sqlalchemy.orm import Session
+
+from app.db.base_class import Base
+from app.db.search import search_issues
+from app.models import Comment, Issue, Project, User
+
+VOCABULARY = [
+    "login", "logout", "avatar", "upload", "crash", "timeout", "slow", "button", "layout",
+    "mobile", "email", "password", "reset", "token", "export", "import", "search", "filter",
+    "sorting", "pagination", "dashboard", "chart", "report", "billing", "invoice", "payment",
+    "webhook", "integration", "permission", "project", "member", "comment", "notification",
+    "database", "migration", "cache", "memory", "leak", "error", "warning", "broken", "missing",
+]
+# Common, medium and rare terms (by how many documents they appear in)
+TERMS = ["error", "avatar upload", "zeppelin"]
+
+def words(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(VOCABULARY) for _ in range(n))
+
+def seed(engine, issues: int, comments_per_issue: int, chunk: int = 5000) -> None:
+    rng = random.Random(42)
+    now = datetime.now(timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(insert(User.__table__), [
+            {"id": 1, "email": "bench@example.com", "name": "Bench", "password_hash": "x",
+             "role": "user", "created_at": now},
+        ])
+        conn.execute(insert(Project.__table__), [{"id": 1, "name": "Bench", "key": "B", "created_at": now}])
+    for start in range(1, issues + 1, chunk):
+        ids = range(start, min(start + chunk, issues + 1))
+        rows = [
+            {"id": n, "project_id": 1, "title": words(rng, 5), "description": words(rng, 40),
+             "status": "open", "priority": "medium", "reporter_id": 1, "created_at": now}
+            for n in ids
+        ]
+        # A rare term in about one issue in ten thousand
+        for row in rows:
+            if rng.random() < 0.0001:
+                row["description"] += " zeppelin"
+        with engine.begin() as conn:
+            conn.execute(insert(Issue.__table__), rows)
+            conn.execute(insert(Comment.__table__), [
+                {"issue_id": n, "author_id": 1, "body": words(rng, 20), "created_at": now}
+                for n in ids for _ in range(comments_per_issue)
+            ])
+
+def like_scan(query, q: str):
+    for term in q.split():
+        pattern = f"%{term}%"
+        query = query.filter(or_(Issue.title.ilike(pattern), Issue.description.ilike(pattern)))
+    return query
+
+def measure(engine, repeat: int) -> dict:
+    results = {}
+    with Session(engine) as db:
+        for term in TERMS:
+            timings = {}
+            for label in ("index", "like"):
+                started = time.perf_counter()
+                for _ in range(repeat):
+                    query = db.query(Issue).filter(Issue.project_id == 1)
+                    if label == "index":
+                        query, rank = search_issues(query, term)
+                        query = query.order_by(rank.desc(), Issue.id)
+                    else:
+                        query = like_scan(query, term).order_by(Issue.id)
+                    query.limit(20).all()
+                timings[label] = (time.perf_counter() - started) / repeat * 1000
+            results[term] = timings
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-uri", default=None, help="empty database to seed (default: SQLite)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--comments-per-issue", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'issues':>8}  {'term':<14}{'index ms':>10}{'LIKE ms':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            engine = create_engine(args.database_uri or f"sqlite:///{tmp}/search-{size}.db")
+            Base.metadata.drop_all(engine)
+            Base.metadata.create_all(engine)
+            seed(engine, size, args.comments_per_issue)
+            for term, timings in measure(engine, args.repeat).items():
+                print(f"{size:>8}  {term:<14}{timings['index']:>10.2f}{timings['like']:>10.2f}")
+            if args.database_uri:
+                Base.metadata.drop_all(engine)
+            engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Per-item cost of serializing an issue list page.
+
+Builds detached Issue rows in memory and times one IssueListResponse page
+through each path:
+
+    PYTHONPATH=. python -m benchmarks.serialization --items 100 1000
+
+  response_model  what FastAPI does for a response_model: validate the ORM
+                  rows into schema instances, then dump them to JSON bytes
+  model_dump      validate, model_dump(mode="json"), json.dumps (FastAPI
+                  before its dump_json fast path)
+  fast            app.api.serialization: per-schema extractor + orjson
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+from pydantic import TypeAdapter
+
+from app.api.serialization import FastJSONResponse, dump_many
+from app.models import Issue
+from app.schemas import issue as issue_schema
+
+def make_issues(n: int):
+    now = datetime.now(timezone.utc)
+    return [
+        Issue(
+            id=i, project_id=1, title=f"Issue {i} with a reasonably long title",
+            description="Steps to reproduce: open the page, click the button, watch it fail. " * 3,
+            status="open", priority="medium", reporter_id=1, assignee_id=2 if i % 2 else None,
+            created_at=now - timedelta(minutes=i), updated_at=now if i % 3 else None,
+        )
+        for i in range(n)
+    ]
+
+def page(items):
+    return {"items": items, "total": len(items), "skip": 0, "limit": len(items),
+            "has_more": False, "next_cursor": None}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    adapter = TypeAdapter(issue_schema.IssueListResponse)
+    paths = {
+        "response_model": lambda rows: adapter.dump_json(adapter.validate_python(page(rows), from_attributes=True)),
+        "model_dump": lambda rows: json.dumps(
+            adapter.validate_python(page(rows), from_attributes=True).model_dump(mode="json")
+        ).encode(),
+        "fast": lambda rows: FastJSONResponse(page(dump_many(issue_schema.Issue, rows))).body,
+    }
+
+    print(f"{'items':>6}  {'path':<16}{'us/item':>9}{'vs response_model':>20}")
+    for n in args.items:
+        rows = make_issues(n)
+        assert json.loads(paths["fast"](rows)) == json.loads(paths["response_model"](rows))
+        timings = {}
+        for name, serialize in paths.items():
+            serialize(rows)
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                serialize(rows)
+            timings[name] = (time.perf_counter() - started) / args.repeat / n * 1e6
+        for name, us in timings.items():
+            print(f"{n:>6}  {name:<16}{us:>9.2f}{timings['response_model'] / us:>19.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Run the API under uvicorn in a subprocess for HTTP benchmarks.
+"""
+import contextlib
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, Iterator, Optional
+
+import httpx
+
+@contextlib.contextmanager
+def run_server(
+    env: Dict[str, str],
+    port: int,
+    app_dir: Optional[str] = None,
+    workers: int = 1,
+) -> Iterator[str]:
+    """
+    Start `app.main:app` with extra environment `env`; yields the base URL.
+
+    `app_dir` runs another checkout of the backend (e.g. a git worktree of
+    the previous commit) for before/after comparisons.
+    """
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        env=dict(os.environ, **env),
+        cwd=app_dir,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(200):
+            try:
+                httpx.get(f"{base_url}/health")
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+        yield base_url
+    finally:
+        server.terminate()
+        server.wait()
@@ -0,0 +1,8 @@
+"""
+Benchmark suite covering every api_v1 endpoint on a seeded dataset.
+
+    PYTHONPATH=. python -m benchmarks.suite --scale small --output results.json
+    PYTHONPATH=. python -m benchmarks.suite --scale small --baseline results.json
+
+See `python -m benchmarks.suite --help` for the options.
+"""
@@ -0,0 +1,146 @@
+"""
+Seed a dataset, benchmark every api_v1 endpoint and compare with a baseline.
+
+    PYTHONPATH=. python -m benchmarks.suite --scale small --output baseline.json
+    PYTHONPATH=. python -m benchmarks.suite --scale small --baseline baseline.json
+
+The dataset is generated once per database (default: a SQLite file per scale
+in the temp directory) and reused while it has users; --reseed starts over.
+Write scenarios add rows, so compare runs on freshly seeded databases when
+exact SQL counts or latencies of large lists matter. Exits with status 1 when
+--baseline is given and a scenario regressed.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, replace
+
+from benchmarks.suite.dataset import SCALES
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=None, help="dataset seed (default: the scale's)")
+    parser.add_argument("--database-uri", default=None)
+    parser.add_argument("--reseed", action="store_true", help="drop and regenerate the dataset")
+    parser.add_argument("--async-db", action="store_true", help="run the app in async mode")
+    parser.add_argument("--mode", choices=["inprocess", "http"], default="inprocess")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers in http mode")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--sql-samples", type=int, default=10, help="requests per scenario for SQL counts")
+    parser.add_argument("--scenario", action="append", dest="scenarios",
+                        help="scenario name prefix to run (repeatable; default: all)")
+    parser.add_argument("--no-writes", action="store_true", help="skip scenarios that write")
+    parser.add_argument("--output", default=None, help="write results JSON here")
+    parser.add_argument("--baseline", default=None, help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="allowed p95/throughput change before flagging (fraction)")
+    args = parser.parse_args()
+
+    spec = SCALES[args.scale]
+    if args.seed is not None:
+        spec = replace(spec, seed=args.seed)
+    database_uri = args.database_uri or (
+        f"sqlite:///{tempfile.gettempdir()}/issuehub-bench-{args.scale}-{spec.seed}.db"
+    )
+    # Settings are read when app modules are imported, so configure first
+    os.environ["SQLALCHEMY_DATABASE_URI"] = database_uri
+    os.environ["ASYNC_DB"] = str(args.async_db).lower()
+
+    from sqlalchemy import func, inspect, select
+
+    from app.db.base_class import Base
+    from app.db.session import engine
+    from app.main import app
+    from app.models import User
+    from benchmarks.server import run_server
+    from benchmarks.suite import dataset, runner, scenarios
+    from benchmarks.suite.compare import describe_baseline, regressions
+
+    # Any import above that built the settings early would point the engine elsewhere
+    if engine.url.render_as_string(hide_password=False) != database_uri:
+        sys.exit(
+            f"engine uses {engine.url.render_as_string(hide_password=True)}, not {database_uri}: "
+            "settings were read before the environment was configured"
+        )
+
+    missing = scenarios.uncovered_routes(app.openapi())
+    if missing:
+        print("routes without a scenario: " + ", ".join(f"{m} {p}" for m, p in sorted(missing)))
+
+    if args.reseed:
+        Base.metadata.drop_all(engine)
+    seeded = False
+    if inspect(engine).has_table(User.__tablename__):
+        with engine.connect() as conn:
+            seeded = bool(conn.scalar(select(func.count()).select_from(User.__table__)))
+    if seeded:
+        print(f"reusing dataset in {engine.url.render_as_string(hide_password=True)}")
+    else:
+        print(f"seeding {args.scale} dataset {asdict(spec)}")
+        started = time.perf_counter()
+        dataset.generate(engine, spec)
+        print(f"  {'total':<12} {time.perf_counter() - started:7.1f}s")
+    fixture = dataset.load_fixture(engine, spec)
+    chosen = scenarios.select(args.scenarios, include_writes=not args.no_writes)
+
+    async def run(base_url):
+        return await runner.run(
+            chosen, fixture, base_url, args.requests, args.concurrency, args.sql_samples, spec.seed
+        )
+
+    print(runner.format_header())
+    if args.mode == "http":
+        env = {"SQLALCHEMY_DATABASE_URI": database_uri, "ASYNC_DB": os.environ["ASYNC_DB"]}
+        with run_server(env, args.port, workers=args.workers) as base_url:
+            results = asyncio.run(run(base_url))
+    else:
+        results = asyncio.run(run(None))
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "dataset": {"scale": args.scale, **asdict(spec)},
+            "dialect": engine.dialect.name,
+            "async_db": args.async_db,
+            "mode": args.mode,
+            "workers": args.workers if args.mode == "http" else None,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+        },
+        "scenarios": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for note in describe_baseline(report, baseline):
+            print(f"note: {note}")
+        found = regressions(report, baseline, args.threshold)
+        for line in found:
+            print(f"REGRESSION {line}")
+        if found:
+            sys.exit(1)
+        print(f"no regressions against {args.baseline} (threshold {args.threshold:.0%})")
+
+if __name__ == "__main__":
+    main()
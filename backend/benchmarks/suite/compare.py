@@ -0,0 +1,39 @@
+"""
+Compare a results file against a stored baseline.
+"""
+from typing import List
+
+SQL_TOLERANCE = 0.5  # statements per request; write scenarios vary slightly
+
+def regressions(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """
+    Human-readable regressions of `current` against `baseline`: p95 latency
+    up or throughput down by more than `threshold` (a fraction), more SQL
+    statements per request, or errors where the baseline had none.
+    """
+    found = []
+    for name, base in baseline["scenarios"].items():
+        result = current["scenarios"].get(name)
+        if result is None:
+            continue
+        if base["p95_ms"] and result["p95_ms"] > base["p95_ms"] * (1 + threshold):
+            found.append(f"{name}: p95 {base['p95_ms']:.1f} -> {result['p95_ms']:.1f} ms")
+        if base["rps"] and result["rps"] < base["rps"] * (1 - threshold):
+            found.append(f"{name}: throughput {base['rps']:.1f} -> {result['rps']:.1f} req/s")
+        if result["sql_per_request"] > base["sql_per_request"] + SQL_TOLERANCE:
+            found.append(
+                f"{name}: SQL per request {base['sql_per_request']:.1f} -> {result['sql_per_request']:.1f}"
+            )
+        if result["errors"] and not base["errors"]:
+            found.append(f"{name}: {result['errors']} errors {result['statuses']}")
+    return found
+
+def describe_baseline(current: dict, baseline: dict) -> List[str]:
+    """
+    Notes on settings that make the two runs not directly comparable.
+    """
+    notes = []
+    for key in ("dataset", "mode", "dialect", "async_db", "concurrency", "requests"):
+        if current["meta"].get(key) != baseline["meta"].get(key):
+            notes.append(f"{key} differs: baseline {baseline['meta'].get(key)!r}, now {current['meta'].get(key)!r}")
+    return notes
@@ -0,0 +1,168 @@
+"""
+Reproducible seeded datasets, loaded with bulk Core inserts.
+
+The same `DatasetSpec` (including `seed`) always produces the same rows, so
+results from different commits are comparable. User 1 is the benchmark user:
+it maintains the first `bench_projects` projects and signs in with
+BENCH_PASSWORD, like every other generated user.
+"""
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Iterator, List
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.db.base_class import Base
+from app.db.issue_activity import rebuild_issue_activity
+from app.db.issue_stats import rebuild_issue_stats
+from app.models import Comment, Issue, IssueStat, Project, ProjectMember, User
+from app.models.issue import IssuePriority, IssueStatus
+from app.models.project import Role
+
+BENCH_PASSWORD = "bench-password"
+
+WORDS = [
+    "login", "logout", "avatar", "upload", "crash", "timeout", "slow", "button", "layout",
+    "mobile", "email", "password", "reset", "token", "export", "import", "search", "filter",
+    "sorting", "pagination", "dashboard", "chart", "report", "billing", "invoice", "payment",
+    "webhook", "integration", "permission", "project", "member", "comment", "notification",
+    "database", "migration", "cache", "memory", "leak", "error", "warning", "broken", "missing",
+]
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    users: int
+    projects: int
+    issues: int
+    comments: int
+    members_per_project: int = 20
+    bench_projects: int = 20
+    seed: int = 42
+
+SCALES: Dict[str, DatasetSpec] = {
+    "tiny": DatasetSpec(users=200, projects=20, issues=5_000, comments=10_000, members_per_project=10),
+    "small": DatasetSpec(users=2_000, projects=500, issues=50_000, comments=150_000),
+    "medium": DatasetSpec(users=10_000, projects=2_000, issues=250_000, comments=1_000_000),
+    "large": DatasetSpec(users=10_000, projects=5_000, issues=1_000_000, comments=5_000_000),
+}
+
+@dataclass
+class Fixture:
+    """
+    Ids the scenarios draw from: the benchmark user's projects, some of their
+    issues, and another user to add as a member.
+    """
+    user_id: int
+    email: str
+    project_ids: List[int]
+    issue_ids: List[int]
+    other_user_ids: List[int]
+
+def _chunks(rows: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _bulk_insert(engine: Engine, table, rows: Iterable[dict], chunk: int = 10_000) -> None:
+    statement = insert(table)
+    for batch in _chunks(rows, chunk):
+        with engine.begin() as conn:
+            conn.execute(statement, batch)
+
+def _words(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choices(WORDS, k=n))
+
+def generate(engine: Engine, spec: DatasetSpec, log: Callable[[str], None] = print) -> None:
+    """
+    Create the schema on an empty database and load `spec` into it.
+    """
+    from app.core.security import get_password_hash
+
+    Base.metadata.create_all(engine)
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+
+    rng = random.Random(spec.seed)
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    password_hash = get_password_hash(BENCH_PASSWORD)
+    statuses = [s.value for s in IssueStatus]
+    priorities = [p.value for p in IssuePriority]
+
+    def timed(label: str, table, rows: Iterable[dict]) -> None:
+        started = time.perf_counter()
+        _bulk_insert(engine, table, rows)
+        log(f"  {label:<12} {time.perf_counter() - started:7.1f}s")
+
+    timed("users", User.__table__, (
+        {"id": n, "email": f"user{n}@bench.example.com", "name": f"User {n}",
+         "password_hash": password_hash, "role": "user", "created_at": now}
+        for n in range(1, spec.users + 1)
+    ))
+    timed("projects", Project.__table__, (
+        {"id": n, "name": f"Project {n}", "key": f"P{n}", "description": _words(rng, 12), "created_at": now}
+        for n in range(1, spec.projects + 1)
+    ))
+
+    def memberships() -> Iterator[dict]:
+        for project_id in range(1, spec.projects + 1):
+            members = set(rng.sample(range(2, spec.users + 1), min(spec.members_per_project, spec.users - 1)))
+            if project_id <= spec.bench_projects:
+                yield {"project_id": project_id, "user_id": 1, "role": Role.MAINTAINER.value}
+            for user_id in sorted(members):
+                yield {"project_id": project_id, "user_id": user_id, "role": Role.MEMBER.value}
+    timed("memberships", ProjectMember.__table__, memberships())
+
+    timed("issues", Issue.__table__, (
+        {"id": n, "project_id": rng.randint(1, spec.projects), "title": _words(rng, 6),
+         "description": _words(rng, 40), "status": rng.choice(statuses), "priority": rng.choice(priorities),
+         "reporter_id": rng.randint(1, spec.users),
+         "assignee_id": rng.randint(1, spec.users) if rng.random() < 0.5 else None,
+         "created_at": now - timedelta(seconds=spec.issues - n)}
+        for n in range(1, spec.issues + 1)
+    ))
+    timed("comments", Comment.__table__, (
+        {"id": n, "issue_id": rng.randint(1, spec.issues), "author_id": rng.randint(1, spec.users),
+         "body": _words(rng, 20), "created_at": now}
+        for n in range(1, spec.comments + 1)
+    ))
+
+    started = time.perf_counter()
+    with Session(engine) as db:
+        rebuild_issue_stats(db)
+        rebuild_issue_activity(db)
+        db.commit()
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            # Explicit ids leave the sequences behind; new rows must not collide
+            for table in (User, Project, ProjectMember, Issue, Comment, IssueStat):
+                name = table.__tablename__
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('\"{name}\"', 'id'), "
+                    f"coalesce((SELECT max(id) FROM \"{name}\"), 1))"
+                ))
+        conn.execute(text("ANALYZE"))
+    log(f"  {'stats':<12} {time.perf_counter() - started:7.1f}s")
+
+def load_fixture(engine: Engine, spec: DatasetSpec) -> Fixture:
+    with engine.connect() as conn:
+        project_ids = list(conn.scalars(
+            select(ProjectMember.project_id).where(ProjectMember.user_id == 1).order_by(ProjectMember.project_id)
+        ))
+        issue_ids = list(conn.scalars(
+            select(Issue.id).where(Issue.project_id.in_(project_ids)).order_by(Issue.id).limit(1000)
+        ))
+        other_user_ids = list(range(2, spec.users + 1))
+    return Fixture(
+        user_id=1, email="user1@bench.example.com", project_ids=project_ids,
+        issue_ids=issue_ids, other_user_ids=other_user_ids,
+    )
@@ -0,0 +1,172 @@
+"""
+Drive scenarios against the app and collect latency, throughput and SQL counts.
+
+Requests go either in-process through httpx's ASGI transport or over HTTP to a
+uvicorn server (benchmarks.server). SQL statements are always counted in
+process, in a separate sequential pass, by listening on the app's engines.
+"""
+import asyncio
+import contextlib
+import random
+import time
+from typing import Dict, Iterator, List, Optional
+
+import httpx
+from sqlalchemy import event
+
+from benchmarks.suite.dataset import BENCH_PASSWORD, Fixture
+from benchmarks.suite.scenarios import API, Request, Scenario
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def _in_process_app():
+    from app.main import app
+    return app
+
+def client_for(base_url: Optional[str], concurrency: int) -> httpx.AsyncClient:
+    """
+    Client for `base_url`, or for the app in this process when it is None.
+    """
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    if base_url is None:
+        transport = httpx.ASGITransport(app=_in_process_app())
+        return httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60)
+    return httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60)
+
+async def login(client: httpx.AsyncClient, fixture: Fixture) -> Dict[str, str]:
+    response = await client.post(
+        f"{API}/auth/login", data={"username": fixture.email, "password": BENCH_PASSWORD}
+    )
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+async def send(client: httpx.AsyncClient, request: Request, headers: Dict[str, str]) -> httpx.Response:
+    return await client.request(
+        request.method, API + request.url, params=request.params or None, json=request.json,
+        data=request.data, headers=headers if request.authenticated else None,
+    )
+
+async def drive(
+    client: httpx.AsyncClient,
+    headers: Dict[str, str],
+    scenario: Scenario,
+    fixture: Fixture,
+    requests: int,
+    concurrency: int,
+    seed: int,
+) -> dict:
+    """
+    Send `requests` requests of `scenario` from `concurrency` workers.
+    """
+    rng = random.Random(f"{seed}:{scenario.name}")
+    planned = [scenario.build(fixture, rng, n) for n in range(requests)]
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    errors = 0
+
+    async def worker(offset: int) -> None:
+        nonlocal errors
+        for request in planned[offset::concurrency]:
+            started = time.perf_counter()
+            try:
+                response = await send(client, request, headers)
+                status = response.status_code
+            except httpx.TransportError:
+                status = 0
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+            if status not in scenario.ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": _percentile(latencies, 0.50) * 1000,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+    }
+
+@contextlib.contextmanager
+def count_statements() -> Iterator[List[int]]:
+    """
+    Count statements executed on the app's engines; yields a one-item list
+    holding the running count.
+    """
+    from app.db import session
+
+    engines = [session.engine]
+    if session.async_engine is not None:
+        engines.append(session.async_engine.sync_engine)
+    counter = [0]
+
+    def before_cursor_execute(*args) -> None:
+        counter[0] += 1
+
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+async def statements_per_request(scenario: Scenario, fixture: Fixture, samples: int, seed: int) -> float:
+    """
+    Average SQL statements per request, measured one request at a time in
+    process so that nothing else runs on the engines meanwhile.
+
+    The requests are sent once untimed first so that in-process caches are
+    warm whichever mode drove the timed pass; reads repeat the same requests,
+    writes get fresh ones so they are not rejected as duplicates.
+    """
+    rng = random.Random(f"{seed}:{scenario.name}:sql")
+    warmup = [scenario.build(fixture, rng, n) for n in range(samples)]
+    counted = [scenario.build(fixture, rng, samples + n) for n in range(samples)] if scenario.write else warmup
+    async with client_for(None, 1) as client:
+        headers = await login(client, fixture)
+        for request in warmup:
+            await send(client, request, headers)
+        with count_statements() as counter:
+            for request in counted:
+                await send(client, request, headers)
+    return counter[0] / samples
+
+async def run(
+    scenarios: List[Scenario],
+    fixture: Fixture,
+    base_url: Optional[str],
+    requests: int,
+    concurrency: int,
+    sql_samples: int,
+    seed: int,
+    log=print,
+) -> Dict[str, dict]:
+    results = {}
+    async with client_for(base_url, concurrency) as client:
+        headers = await login(client, fixture)
+        for scenario in scenarios:
+            # One untimed request so connection setup and caches are not
+            # attributed to the first scenario
+            await send(client, scenario.build(fixture, random.Random(seed), requests), headers)
+            result = await drive(client, headers, scenario, fixture, requests, concurrency, seed)
+            result["sql_per_request"] = await statements_per_request(scenario, fixture, sql_samples, seed)
+            results[scenario.name] = result
+            log(format_row(scenario.name, result))
+    return results
+
+def format_header() -> str:
+    return (f"{'scenario':<24}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'sql/req':>9}{'errors':>8}")
+
+def format_row(name: str, r: dict) -> str:
+    return (f"{name:<24}{r['rps']:>9.1f}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}"
+            f"{r['sql_per_request']:>9.1f}{r['errors']:>8}")
@@ -0,0 +1,125 @@
+"""
+One scenario per api_v1 route.
+
+A scenario turns (fixture, rng, n) into the request to send; `n` counts the
+scenario's requests so writes can generate unique values. `uncovered_routes`
+lists routes without a scenario so new endpoints cannot be left out silently.
+"""
+import random
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from benchmarks.suite.dataset import BENCH_PASSWORD, Fixture
+
+API = "/api/v1"
+
+@dataclass
+class Request:
+    method: str
+    url: str
+    json: Optional[object] = None
+    data: Optional[Dict[str, str]] = None
+    params: Dict[str, object] = field(default_factory=dict)
+    authenticated: bool = True
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    route: Tuple[str, str]  # (method, path template) of the endpoint it drives
+    build: Callable[[Fixture, random.Random, int], Request]
+    write: bool = False
+    ok: Tuple[int, ...] = (200,)  # statuses that are not errors
+
+def _project(f: Fixture, rng: random.Random) -> int:
+    return rng.choice(f.project_ids)
+
+def _issue(f: Fixture, rng: random.Random) -> int:
+    return rng.choice(f.issue_ids)
+
+SCENARIOS: List[Scenario] = [
+    # auth
+    Scenario("auth.login", ("POST", "/auth/login"), lambda f, rng, n: Request(
+        "POST", "/auth/login", data={"username": f.email, "password": BENCH_PASSWORD}, authenticated=False)),
+    Scenario("auth.signup", ("POST", "/auth/signup"), lambda f, rng, n: Request(
+        "POST", "/auth/signup", json={"email": f"signup{n}-{rng.random():.12f}@bench.example.com",
+                                      "password": BENCH_PASSWORD}, authenticated=False), write=True),
+    # users
+    Scenario("users.me", ("GET", "/users/me"), lambda f, rng, n: Request("GET", "/users/me")),
+    Scenario("users.list", ("GET", "/users/"), lambda f, rng, n: Request("GET", "/users/", params={"limit": 50})),
+    # projects
+    Scenario("projects.list", ("GET", "/projects/"), lambda f, rng, n: Request("GET", "/projects/")),
+    Scenario("projects.create", ("POST", "/projects/"), lambda f, rng, n: Request(
+        "POST", "/projects/", json={"name": f"Bench {n}", "key": f"B{n}-{rng.randrange(10**9)}"}), write=True),
+    Scenario("projects.stats", ("GET", "/projects/stats"), lambda f, rng, n: Request("GET", "/projects/stats")),
+    Scenario("projects.read", ("GET", "/projects/{id}"), lambda f, rng, n: Request(
+        "GET", f"/projects/{_project(f, rng)}")),
+    Scenario("projects.update", ("PATCH", "/projects/{id}"), lambda f, rng, n: Request(
+        "PATCH", f"/projects/{_project(f, rng)}", json={"description": f"Updated {n}"}), write=True),
+    Scenario("projects.add_member", ("POST", "/projects/{id}/members"), lambda f, rng, n: Request(
+        "POST", f"/projects/{_project(f, rng)}/members", json={"user_id": rng.choice(f.other_user_ids)}),
+        write=True, ok=(200, 400)),  # 400: already a member
+    Scenario("projects.members", ("GET", "/projects/{id}/members"), lambda f, rng, n: Request(
+        "GET", f"/projects/{_project(f, rng)}/members", params={"limit": 50})),
+    Scenario("projects.my_membership", ("GET", "/projects/{id}/my-membership"), lambda f, rng, n: Request(
+        "GET", f"/projects/{_project(f, rng)}/my-membership")),
+    Scenario("projects.project_stats", ("GET", "/projects/{id}/stats"), lambda f, rng, n: Request(
+        "GET", f"/projects/{_project(f, rng)}/stats")),
+    Scenario("projects.export", ("GET", "/projects/{id}/export"), lambda f, rng, n: Request(
+        "GET", f"/projects/{_project(f, rng)}/export", params={"resource": "issues"})),
+    # issues
+    Scenario("issues.list", ("GET", "/issues/"), lambda f, rng, n: Request(
+        "GET", "/issues/", params={"project_id": _project(f, rng), "limit": 50})),
+    Scenario("issues.list_all", ("GET", "/issues/"), lambda f, rng, n: Request(
+        "GET", "/issues/", params={"limit": 50, "status": "open"})),
+    Scenario("issues.search", ("GET", "/issues/"), lambda f, rng, n: Request(
+        "GET", "/issues/", params={"q": "avatar upload", "limit": 20})),
+    Scenario("issues.create", ("POST", "/issues/"), lambda f, rng, n: Request(
+        "POST", "/issues/", json={"title": f"Bench issue {n}", "project_id": _project(f, rng)}), write=True),
+    Scenario("issues.batch_create", ("POST", "/issues/batch"), lambda f, rng, n: Request(
+        "POST", "/issues/batch", json={"items": [
+            {"title": f"Batch issue {n}.{i}", "project_id": _project(f, rng)} for i in range(20)
+        ]}), write=True),
+    Scenario("issues.batch_update", ("PATCH", "/issues/batch"), lambda f, rng, n: Request(
+        "PATCH", "/issues/batch", json={"items": [
+            {"id": _issue(f, rng), "priority": rng.choice(["low", "high"])} for _ in range(20)
+        ]}), write=True),
+    Scenario("issues.read", ("GET", "/issues/{id}"), lambda f, rng, n: Request(
+        "GET", f"/issues/{_issue(f, rng)}")),
+    Scenario("issues.detail", ("GET", "/issues/{id}/detail"), lambda f, rng, n: Request(
+        "GET", f"/issues/{_issue(f, rng)}/detail", params={"include": ["comments", "members"]})),
+    Scenario("issues.update", ("PATCH", "/issues/{id}"), lambda f, rng, n: Request(
+        "PATCH", f"/issues/{_issue(f, rng)}", json={"status": rng.choice(["open", "in_progress"])}), write=True),
+    # comments
+    Scenario("comments.list", ("GET", "/comments/issue/{issue_id}"), lambda f, rng, n: Request(
+        "GET", f"/comments/issue/{_issue(f, rng)}")),
+    Scenario("comments.create", ("POST", "/comments/issue/{issue_id}"), lambda f, rng, n: Request(
+        "POST", f"/comments/issue/{_issue(f, rng)}", json={"body": f"Bench comment {n}"}), write=True),
+    # sync (seeded rows bypass the change log, so this is mostly the no-churn refresh)
+    Scenario("sync.changes", ("GET", "/sync/"), lambda f, rng, n: Request("GET", "/sync/", params={"limit": 100})),
+]
+
+# Event streams stay open until the client leaves: nothing to time per request
+UNTIMED_ROUTES = {
+    ("GET", "/projects/{id}/events"),
+    ("GET", "/issues/{id}/events"),
+}
+
+def uncovered_routes(openapi: dict) -> Set[Tuple[str, str]]:
+    """
+    (method, path) of API operations in the `openapi` schema, relative to
+    API, that no scenario drives. Read from the schema because the routes of
+    included routers are not listed flat on the app.
+    """
+    covered = {s.route for s in SCENARIOS}
+    present = {
+        (method.upper(), path[len(API):])
+        for path, operations in openapi["paths"].items() if path.startswith(API)
+        for method in operations
+    }
+    return present - covered - UNTIMED_ROUTES
+
+def select(names: Optional[List[str]], include_writes: bool) -> List[Scenario]:
+    chosen = [s for s in SCENARIOS if include_writes or not s.write]
+    if names:
+        chosen = [s for s in chosen if any(s.name.startswith(n) for n in names)]
+    return chosen
@@ -0,0 +1,113 @@
+"""
+Throughput comparison of the sync (threadpool) and async (asyncio engine) modes.
+
+Starts the API under uvicorn once per mode against the same seeded database and
+drives it with concurrent HTTP clients for a fixed duration:
+
+    PYTHONPATH=. python -m benchmarks.sync_vs_async --concurrency 64 --duration 10
+
+Defaults to a throwaway SQLite file; pass --database-uri to point both runs at
+Postgres instead.
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.server import run_server
+
+API = "/api/v1"
+
+def seed(base_url: str, issues: int) -> dict:
+    """
+    Create a user, a project and `issues` issues with one comment each.
+    """
+    with httpx.Client(base_url=base_url, timeout=30) as client:
+        client.post(f"{API}/auth/signup", json={"email": "bench@example.com", "password": "bench-password"})
+        token = client.post(
+            f"{API}/auth/login", data={"username": "bench@example.com", "password": "bench-password"}
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        project_id = client.post(f"{API}/projects/", headers=headers, json={"name": "Bench", "key": "BENCH"}).json()["id"]
+        issue_ids = []
+        for n in range(issues):
+            issue = client.post(
+                f"{API}/issues/", headers=headers, json={"title": f"Issue {n}", "project_id": project_id}
+            ).json()
+            client.post(f"{API}/comments/issue/{issue['id']}", headers=headers, json={"body": "bench"})
+            issue_ids.append(issue["id"])
+    return {"headers": headers, "project_id": project_id, "issue_ids": issue_ids}
+
+async def drive(base_url: str, fixture: dict, concurrency: int, duration: float) -> dict:
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    paths = [f"{API}/issues/?project_id={fixture['project_id']}&limit=20"]
+    for issue_id in fixture["issue_ids"][:20]:
+        paths.append(f"{API}/issues/{issue_id}")
+        paths.append(f"{API}/comments/issue/{issue_id}")
+
+    async def worker(offset: int) -> None:
+        nonlocal errors
+        limits = httpx.Limits(max_connections=1)
+        async with httpx.AsyncClient(base_url=base_url, headers=fixture["headers"], limits=limits, timeout=30) as client:
+            n = offset
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.get(paths[n % len(paths)])
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    errors += 1
+                n += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000,
+    }
+
+def run_mode(async_db: bool, database_uri: str, port: int, args) -> dict:
+    env = {"SQLALCHEMY_DATABASE_URI": database_uri, "ASYNC_DB": str(async_db).lower()}
+    with run_server(env, port) as base_url:
+        fixture = seed(base_url, args.issues) if not async_db else args.fixture
+        args.fixture = fixture
+        return asyncio.run(drive(base_url, fixture, args.concurrency, args.duration))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-uri", default=None)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--issues", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_uri = args.database_uri or f"sqlite:///{tmp}/bench.db"
+        if args.database_uri is None:
+            from sqlalchemy import create_engine
+            from app.db.base_class import Base
+            import app.models  # noqa: F401  register tables
+            Base.metadata.create_all(create_engine(database_uri))
+
+        results = {}
+        for async_db in (False, True):
+            mode = "async" if async_db else "sync"
+            results[mode] = run_mode(async_db, database_uri, args.port, args)
+            r = results[mode]
+            print(
+                f"{mode:>5}: {r['rps']:8.1f} req/s  p50 {r['p50_ms']:7.1f} ms  "
+                f"p95 {r['p95_ms']:7.1f} ms  ({r['requests']} requests, {r['errors']} errors)"
+            )
+
+if __name__ == "__main__":
+    main()
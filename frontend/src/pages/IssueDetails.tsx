@@ -35,8 +35,6 @@ interface Comment {
     author_id: number;
     created_at: string;
     author?: User;
-    // Backend comment schema might not nest author yet, but we can fetch it or just show ID for now.
-    // Actually, standard practice is to include author info. Let's assume standard behavior or just show email if available.
 }
 
 export default function IssueDetails() {
@@ -60,8 +58,7 @@ export default function IssueDetails() {
     // Project Member State (for permission checks)
     const [projectMemberRole, setProjectMemberRole] = useState<string | null>(null);
     const [allUsers, setAllUsers] = useState<any[]>([]);
-    const [userSkip, setUserSkip] = useState(0);
-    const [hasMoreUsers, setHasMoreUsers] = useState(true);
+    const [membersCursor, setMembersCursor] = useState<string | null>(null);
 
     // Assignee State
     const [assigneeLoading, setAssigneeLoading] = useState(false);
@@ -73,32 +70,15 @@ export default function IssueDetails() {
         try {
             if (!id) return;
 
-            const iRes = await api.get(`/issues/${id}`);
-            setIssue(iRes.data);
-            setStatus(iRes.data.status);
-
-            // Fetch all users for assignee dropdown (with pagination)
-            try {
-                const usersRes = await api.get(`/users/?skip=0&limit=10`);
-                setAllUsers(usersRes.data);
-                setHasMoreUsers(usersRes.data.length === 10);
-                setUserSkip(10);
-            } catch (err) {
-                console.error("Failed to fetch users", err);
-            }
-
-            // Check current user's role using dedicated endpoint
-            if (user) {
-                try {
-                    const myMembershipRes = await api.get(`/projects/${iRes.data.project_id}/my-membership`);
-                    setProjectMemberRole(myMembershipRes.data.role);
-                } catch (err) {
-                    console.error("Failed to fetch user membership", err);
-                }
-            }
-
-            const cRes = await api.get(`/comments/issue/${id}`);
-            setComments(cRes.data);
+            // Issue, people, comments, our role and the assignable members in one request
+            const res = await api.get(`/issues/${id}/detail?include=comments&include=members&comment_limit=100`);
+            const detail = res.data;
+            setIssue({ ...detail.issue, reporter: detail.reporter });
+            setStatus(detail.issue.status);
+            setProjectMemberRole(detail.role);
+            setComments(detail.comments);
+            setAllUsers(detail.members.map((member: any) => member.user));
+            setMembersCursor(detail.members_next_cursor);
         } catch (error) {
             console.error("Failed to fetch data", error);
         } finally {
@@ -111,12 +91,13 @@ export default function IssueDetails() {
     }, [id, user]);
 
     const loadMoreUsers = async () => {
-        if (!hasMoreUsers) return;
+        if (!membersCursor || !issue) return;
         try {
-            const usersRes = await api.get(`/users/?skip=${userSkip}&limit=10`);
-            setAllUsers(prev => [...prev, ...usersRes.data]);
-            setHasMoreUsers(usersRes.data.length === 10);
-            setUserSkip(prev => prev + 10);
+            const membersRes = await api.get(`/projects/${issue.project_id}/members`, {
+                params: { cursor: membersCursor, limit: 100 },
+            });
+            setAllUsers(prev => [...prev, ...membersRes.data.map((member: any) => member.user)]);
+            setMembersCursor(membersRes.headers['x-next-cursor'] || null);
         } catch (err) {
             console.error("Failed to load more users", err);
         }
@@ -151,9 +132,9 @@ export default function IssueDetails() {
         try {
             await api.post(`/comments/issue/${id}`, { body: newComment });
             setNewComment('');
-            // Refresh comments
-            const cRes = await api.get(`/comments/issue/${id}`);
-            setComments(cRes.data);
+            // Refresh comments (with their authors)
+            const res = await api.get(`/issues/${id}/detail?include=comments&comment_limit=100`);
+            setComments(res.data.comments);
         } catch (err) {
             console.error(err);
         } finally {
@@ -304,7 +285,9 @@ export default function IssueDetails() {
                                                             <Avatar className="h-6 w-6">
                                                                 <AvatarFallback className="text-xs">U</AvatarFallback>
                                                             </Avatar>
-                                                            <span className="text-sm font-medium">User {comment.author_id}</span>
+                                                            <span className="text-sm font-medium">
+                                                                {comment.author?.name || comment.author?.email || `User ${comment.author_id}`}
+                                                            </span>
                                                         </div>
                                                         <span className="text-xs text-muted-foreground">
                                                             {new Date(comment.created_at).toLocaleDateString()}
@@ -350,7 +333,9 @@ export default function IssueDetails() {
                                                 <Avatar className="h-6 w-6">
                                                     <AvatarFallback className="text-xs">R</AvatarFallback>
                                                 </Avatar>
-                                                <span className="text-sm">User {issue.reporter_id}</span>
+                                                <span className="text-sm">
+                                                    {issue.reporter?.name || issue.reporter?.email || `User ${issue.reporter_id}`}
+                                                </span>
                                             </div>
                                         </div>
                                         {projectMemberRole?.toLowerCase() === 'maintainer' && (
@@ -371,7 +356,7 @@ export default function IssueDetails() {
                                                                 {user.name || user.email}
                                                             </SelectItem>
                                                         ))}
-                                                        {hasMoreUsers && (
+                                                        {membersCursor && (
                                                             <div className="p-2 border-t">
                                                                 <Button
                                                                     variant="ghost"